@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import HTTPException, Request, Response
+from typing import Any, Optional
+import hashlib
+
+# Clients may reuse a stored response but must revalidate it first
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def resource_etag(*parts: Any) -> str:
+    """Strong ETag for a representation fully determined by the given parts"""
+    payload = "\x1f".join("" if part is None else str(part) for part in parts)
+    return f'"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
+
+
+def version_etag(kind: str, resource_id: int, version: int) -> str:
+    """Strong ETag for one row, naming its version so If-Match can be checked in the UPDATE"""
+    return f'"{kind}-{resource_id}-v{version}"'
+
+
+def if_match_version(request: Request, kind: str, resource_id: int) -> Optional[int]:
+    """
+    The row version an If-Match header requires, or None when any version will do.
+
+    If-Match uses strong comparison, so weak tags and tags for other resources
+    can never match and fail with 412 straight away.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None or if_match.strip() == "*":
+        return None
+    prefix = f'"{kind}-{resource_id}-v'
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith(prefix) and tag.endswith('"') and tag[len(prefix):-1].isdigit():
+            return int(tag[len(prefix):-1])
+    raise HTTPException(status_code=412, detail="If-Match does not name a version of this resource")
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC timestamp as an HTTP date"""
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Whether the client's cached copy is still current.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    it is absent, compared at the one-second resolution of HTTP dates.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    """ETag, Last-Modified and Cache-Control headers for a revalidatable response"""
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
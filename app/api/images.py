@@ -0,0 +1,99 @@
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+from typing import Optional
+import hashlib
+import os
+import re
+
+# Names that never point at different bytes: content-addressed uploads and
+# their variants, plus legacy uploads named with a random hex suffix
+_IMMUTABLE_NAME = re.compile(r"(?:[0-9a-f]{64}(?:_[a-z]+)?|.+_[0-9a-f]{16})\.[A-Za-z0-9]+")
+_CONTENT_ADDRESSED_NAME = re.compile(r"([0-9a-f]{64})\.[A-Za-z0-9]+")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = os.getenv("IMAGE_CACHE_CONTROL", "public, max-age=3600")
+# When set, e.g. to "/internal-uploads/", the file is handed to the reverse proxy
+# with X-Accel-Redirect so it is sent by the proxy's own sendfile
+IMAGE_ACCEL_REDIRECT_PREFIX = os.getenv("IMAGE_ACCEL_REDIRECT_PREFIX")
+
+_ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def image_etag(filename: str, stat_result: os.stat_result) -> str:
+    """Strong ETag for a stored image"""
+    match = _CONTENT_ADDRESSED_NAME.fullmatch(filename)
+    if match:
+        # The name is the SHA-256 of the bytes
+        return f'"{match.group(1)}"'
+    etag_base = f"{filename}-{stat_result.st_size}-{stat_result.st_mtime_ns}"
+    return f'"{hashlib.sha256(etag_base.encode()).hexdigest()[:32]}"'
+
+
+def image_cache_control(filename: str) -> str:
+    """Cache policy for a stored image based on whether its name can ever be reused"""
+    return IMMUTABLE_CACHE_CONTROL if _IMMUTABLE_NAME.fullmatch(filename) else DEFAULT_CACHE_CONTROL
+
+
+class ImageFileResponse(FileResponse):
+    """
+    FileResponse that hands whole-file bodies to the server for zero-copy delivery.
+
+    When the ASGI server advertises the zerocopysend extension the open file
+    descriptor is passed down and the server sends it with sendfile(2);
+    otherwise, and for Range requests, the regular chunked path is used.
+    """
+    zerocopy: bool = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.zerocopy = _ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if not self.zerocopy or send_header_only:
+            await super()._handle_simple(send, send_header_only)
+            return
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        with open(self.path, "rb") as file:
+            await send({"type": _ZEROCOPY_EXTENSION, "file": file, "more_body": False})
+
+
+class ImageFiles(StaticFiles):
+    """
+    Serve uploaded images with cache headers suited to never-changing names.
+
+    Adds a strong ETag, a long-lived immutable Cache-Control for
+    content-addressed and randomized names, answers If-None-Match and
+    If-Modified-Since with 304, and supports Range requests.
+    """
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        filename = os.path.basename(full_path)
+        headers = {
+            "etag": image_etag(filename, stat_result),
+            "cache-control": image_cache_control(filename),
+        }
+        accel_path = self._accel_redirect_path(full_path)
+        if accel_path is not None:
+            headers["x-accel-redirect"] = accel_path
+
+        response = ImageFileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        if accel_path is not None:
+            # The proxy reads and sends the file itself, only the headers are needed here
+            accel_headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+            return Response(status_code=status_code, headers=accel_headers)
+        return response
+
+    def _accel_redirect_path(self, full_path) -> Optional[str]:
+        if not IMAGE_ACCEL_REDIRECT_PREFIX or self.directory is None:
+            return None
+        relative = os.path.relpath(full_path, os.path.realpath(self.directory))
+        return IMAGE_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative.replace(os.sep, "/")
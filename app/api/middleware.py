@@ -0,0 +1,180 @@
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional
+import time
+
+from app.db.diagnostics import DIAGNOSTICS_HEADER, diagnostics_requested, report_diagnostics, start_diagnostics
+from app.services.metrics import HTTP_REQUEST_DB_TIME, HTTP_REQUEST_DURATION, HTTP_REQUEST_QUERIES, start_request_stats
+
+
+class RequestBodyTooLarge(HTTPException):
+    """Raised while a request body is still arriving once it passes the size limit"""
+    def __init__(self, max_body_size: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Request body exceeds the maximum size of {max_body_size} bytes",
+        )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized multipart uploads before they are buffered.
+
+    Requests that declare a Content-Length over the limit are answered with 413
+    without reading the body. Chunked or mis-declared bodies are counted as
+    they stream in and aborted as soon as they cross the limit, before the
+    form parser spools the rest to disk. path_limits overrides the limit for
+    specific paths.
+    """
+    def __init__(self, app: ASGIApp, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = self.path_limits.get(scope["path"].rstrip("/"), self.max_body_size)
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body_size:
+            await self._reject(scope, receive, send, max_body_size)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    raise RequestBodyTooLarge(max_body_size)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send, max_body_size)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, max_body_size: int) -> None:
+        error = RequestBodyTooLarge(max_body_size)
+        response = JSONResponse({"detail": error.detail}, status_code=error.status_code, headers={"Connection": "close"})
+        await response(scope, receive, send)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, SQL statement count and SQL time for every HTTP request.
+
+    Requests are labelled with the matched route template rather than the raw
+    path, so ids in URLs do not create new series; anything outside the API
+    routes, such as static uploads, shares one label.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request_stats()
+        status_code = 500
+        started = time.perf_counter()
+
+        async def timed_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            route = scope.get("route")
+            route_label = getattr(route, "path_format", None) or "other"
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, route_label, str(status_code)).observe(time.perf_counter() - started)
+            HTTP_REQUEST_QUERIES.labels(method, route_label).observe(stats.queries)
+            HTTP_REQUEST_DB_TIME.labels(method, route_label).observe(stats.db_seconds)
+
+
+class QueryDiagnosticsMiddleware:
+    """
+    Turn on query diagnostics for requests that ask for them.
+
+    A request opts in by sending the X-Query-Diagnostics header with the
+    configured DIAGNOSTICS_TOKEN, or every request is diagnosed when
+    DB_DIAGNOSTICS is set. Slow statements are logged as they run; statements
+    repeated past the N+1 threshold are logged when the request finishes, and
+    the counts are returned in X-Query-Count and X-Repeated-Queries headers.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not diagnostics_requested(Headers(scope=scope).get(DIAGNOSTICS_HEADER)):
+            await self.app(scope, receive, send)
+            return
+
+        diagnostics = start_diagnostics(f"{scope['method']} {scope['path']}")
+
+        async def annotated_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Query-Count"] = str(diagnostics.queries)
+                headers["X-Repeated-Queries"] = str(len(diagnostics.repeated()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, annotated_send)
+        finally:
+            report_diagnostics(diagnostics)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pin a client's reads to the primary for a short while after it writes.
+
+    Successful non-GET responses set a cookie holding the time until which
+    get_read_session skips the replicas, so a client that just changed
+    something reads it back even while the replicas lag behind.
+    """
+    def __init__(self, app: ASGIApp, cookie_name: str, max_age: int):
+        self.app = app
+        self.cookie_name = cookie_name
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def pinning_send(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.max_age
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{self.cookie_name}={until:.3f}; Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, pinning_send)
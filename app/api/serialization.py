@@ -0,0 +1,67 @@
+from fastapi.responses import ORJSONResponse
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from app.schemas.adoption import Adoption, AdoptionRead
+from app.schemas.animal import Animal, AnimalRead, image_url, image_variant_urls
+from app.services.projection import parse_fields, source_columns
+
+# Plain fields of each read schema, in the order the schema serializes them
+_ANIMAL_FIELDS = tuple(AnimalRead.model_fields)
+_ADOPTION_FIELDS = tuple(AdoptionRead.model_fields)
+
+# Computed AnimalRead fields and the column each one is built from
+_ANIMAL_DERIVED = {"image_url": "image_path", "image_variants": "image_path"}
+_ANIMAL_BUILDERS = {"image_url": image_url, "image_variants": image_variant_urls}
+
+ANIMAL_RESPONSE_FIELDS = _ANIMAL_FIELDS + tuple(_ANIMAL_DERIVED)
+ADOPTION_RESPONSE_FIELDS = _ADOPTION_FIELDS
+
+
+def animal_projection(fields: Optional[str]) -> Tuple[Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]]:
+    """Parse an animal `fields` parameter into (response fields, columns to select)"""
+    requested = parse_fields(fields, ANIMAL_RESPONSE_FIELDS)
+    if requested is None:
+        return None, None
+    return requested, source_columns(requested, _ANIMAL_DERIVED)
+
+
+def adoption_projection(fields: Optional[str]) -> Tuple[Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]]:
+    """Parse an adoption `fields` parameter into (response fields, columns to select)"""
+    requested = parse_fields(fields, ADOPTION_RESPONSE_FIELDS)
+    return requested, requested
+
+
+def animal_payload(animal: Animal, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """AnimalRead-shaped dict for a row loaded from the database, without re-validating it"""
+    if fields is not None:
+        return {
+            field: _ANIMAL_BUILDERS[field](animal.image_path) if field in _ANIMAL_BUILDERS else getattr(animal, field)
+            for field in fields
+        }
+    payload = {field: getattr(animal, field) for field in _ANIMAL_FIELDS}
+    payload["image_url"] = image_url(animal.image_path)
+    payload["image_variants"] = image_variant_urls(animal.image_path)
+    return payload
+
+
+def adoption_payload(adoption: Adoption, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """AdoptionRead-shaped dict for a row loaded from the database, without re-validating it"""
+    return {field: getattr(adoption, field) for field in fields or _ADOPTION_FIELDS}
+
+
+def animals_response(animals: Iterable[Animal], fields: Optional[Sequence[str]] = None) -> ORJSONResponse:
+    return ORJSONResponse([animal_payload(animal, fields) for animal in animals])
+
+
+def animal_page_response(animals: Iterable[Animal], next_cursor: Optional[str],
+                         fields: Optional[Sequence[str]] = None) -> ORJSONResponse:
+    return ORJSONResponse({"items": [animal_payload(animal, fields) for animal in animals], "next_cursor": next_cursor})
+
+
+def adoptions_response(adoptions: Iterable[Adoption], fields: Optional[Sequence[str]] = None) -> ORJSONResponse:
+    return ORJSONResponse([adoption_payload(adoption, fields) for adoption in adoptions])
+
+
+def adoption_page_response(adoptions: Iterable[Adoption], next_cursor: Optional[str],
+                           fields: Optional[Sequence[str]] = None) -> ORJSONResponse:
+    return ORJSONResponse({"items": [adoption_payload(adoption, fields) for adoption in adoptions], "next_cursor": next_cursor})
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import List, Optional, Union
 from sqlmodel import Session
-
-from app.db.database import get_session
-from app.schemas.adoption import AdoptionCreate, AdoptionRead, AdoptionUpdate, Adoption, HousingSituation, HomeOwnership
-from app.services.adoption_service import AdoptionService
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.conditional import if_match_version, version_etag
+from app.api.serialization import adoption_page_response, adoption_payload, adoption_projection, adoptions_response
+from app.db.database import engine, get_async_session, get_read_session, get_session, reads_from_primary
+from app.schemas.adoption import (
+    AdoptionBatchReview, AdoptionBatchReviewResult, AdoptionCreate, AdoptionRead, AdoptionUpdate, AdoptionPage, Adoption,
+    HousingSituation, HomeOwnership,
+)
+from app.services.adoption_service import AdoptionService, AsyncAdoptionService
+from app.services.export_service import EXPORT_BATCH_SIZE, EXPORT_FORMATS, serialize_rows
+from app.services.pagination import MAX_PAGE_SIZE
 from app.schemas.animal import Animal
 
 router = APIRouter()
@@ -13,51 +22,100 @@ router = APIRouter()
 @router.post("/", response_model=AdoptionRead)
 async def create_adoption_application(
     adoption: AdoptionCreate,
-    session: Session = Depends(get_session)
+    idempotency_key: Optional[str] = Header(
+        None, max_length=255, description="Client-chosen key; retries with the same key return the original application"
+    ),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Submit a new adoption application"""
+    service = AsyncAdoptionService(session)
+    return await service.create_adoption(adoption, idempotency_key)
+
+
+@router.post("/batch-review", response_model=AdoptionBatchReviewResult)
+def review_adoption_applications(
+    review: AdoptionBatchReview,
+    session: Session = Depends(get_session)
+):
+    """Approve or reject many pending adoption applications in one transaction"""
     service = AdoptionService(session)
-    return service.create_adoption(adoption)
+    return service.review_adoptions(review.decisions)
+
+
+@router.get("/export")
+def export_adoption_applications(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    animal_id: Optional[int] = Query(None, description="Filter by animal ID"),
+    status: Optional[str] = Query(None, description="Filter by application status")
+):
+    """Stream every matching adoption application as NDJSON or CSV"""
+    def rows():
+        # The stream outlives the request dependencies, so it owns its session
+        with Session(engine) as session:
+            service = AdoptionService(session)
+            yield from serialize_rows(service.stream_adoptions(animal_id, status, EXPORT_BATCH_SIZE), AdoptionRead, format)
+    
+    return StreamingResponse(
+        rows(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="adoptions.{format}"'},
+    )
 
 
 @router.get("/{adoption_id}", response_model=AdoptionRead)
 def get_adoption_application(
     adoption_id: int, 
-    session: Session = Depends(get_session)
+    request: Request,
+    session: Session = Depends(get_read_session)
 ):
-    """Get a specific adoption application by ID"""
+    """Get a specific adoption application by ID, with its version as the ETag"""
     service = AdoptionService(session)
-    return service.get_adoption(adoption_id)
+    # Clients reading their own writes skip the cache, which other workers invalidate slightly later
+    if reads_from_primary(request):
+        adoption = service.get_adoption(adoption_id)
+    else:
+        adoption = service.get_cached_adoption(adoption_id)
+    return ORJSONResponse(adoption_payload(adoption), headers={"ETag": version_etag("adoption", adoption.id, adoption.version)})
 
 
-@router.get("/", response_model=List[AdoptionRead])
+@router.get("/", response_model=Union[List[AdoptionRead], AdoptionPage])
 def get_adoption_applications(
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Rows per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor; pass an empty value to start cursor pagination"),
     animal_id: Optional[int] = Query(None, description="Filter by animal ID"),
     status: Optional[str] = Query(None, description="Filter by application status"),
-    session: Session = Depends(get_session)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,full_name,status"),
+    session: Session = Depends(get_read_session)
 ):
     """Get a list of adoption applications with optional filtering"""
     service = AdoptionService(session)
+    # Only the requested columns are selected
+    response_fields, columns = adoption_projection(fields)
     
     if animal_id is not None:
-        return service.get_adoptions_by_animal(animal_id)
+        return adoptions_response(service.get_adoptions_by_animal(animal_id, columns), response_fields)
     elif status is not None:
-        return service.get_adoptions_by_status(status)
+        return adoptions_response(service.get_adoptions_by_status(status, columns), response_fields)
+    elif cursor is not None:
+        items, next_cursor = service.get_adoptions_page(cursor, limit, columns)
+        return adoption_page_response(items, next_cursor, response_fields)
     else:
-        return service.get_adoptions(skip, limit)
+        return adoptions_response(service.get_adoptions(skip, limit, columns), response_fields)
 
 
 @router.put("/{adoption_id}", response_model=AdoptionRead)
 def update_adoption_application(
     adoption_id: int,
     adoption: AdoptionUpdate,
+    request: Request,
     session: Session = Depends(get_session)
 ):
-    """Update an existing adoption application"""
+    """Update an existing adoption application; send If-Match with its ETag to update only that version"""
     service = AdoptionService(session)
-    return service.update_adoption(adoption_id, adoption)
+    expected_version = if_match_version(request, "adoption", adoption_id)
+    updated = service.update_adoption(adoption_id, adoption, expected_version)
+    return ORJSONResponse(adoption_payload(updated), headers={"ETag": version_etag("adoption", updated.id, updated.version)})
 
 
 @router.delete("/{adoption_id}", response_model=dict)
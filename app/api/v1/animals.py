@@ -1,22 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
-from fastapi.responses import JSONResponse
-from typing import List, Optional
-import shutil
-import os
-from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from typing import List, Optional, Union
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import UploadFile as FormFile
+from zipfile import BadZipFile, ZipFile
+import anyio
 
-from app.db.database import get_session
-from app.schemas.animal import AnimalCreate, AnimalRead, AnimalUpdate, Animal
-from app.services.animal_service import AnimalService
+from app.api.conditional import (
+    if_match_version, is_not_modified, not_modified, resource_etag, validator_headers, version_etag,
+)
+from app.api.serialization import animal_page_response, animal_payload, animal_projection, animals_response
+from app.db.database import engine, get_async_session, get_read_session, get_session, reads_from_primary
+from app.schemas.animal import AnimalCreate, AnimalRead, AnimalUpdate, AnimalPage, Animal, BulkImportResult
+from app.services.animal_service import AnimalService, AsyncAnimalService
+from app.services.bulk_import_service import (
+    AnimalBulkImporter, BULK_IMPORT_BATCH_SIZE, BULK_IMPORT_FORMATS, BULK_IMPORT_MAX_BATCH_SIZE, detect_format, iter_rows,
+)
+from app.services.export_service import EXPORT_BATCH_SIZE, EXPORT_FORMATS, serialize_rows
+from app.services.pagination import MAX_PAGE_SIZE
+from app.services.image_storage import UPLOAD_CHUNK_SIZE, save_image_upload
 
 router = APIRouter()
 
-# Configuration for file uploads
-UPLOAD_DIRECTORY = Path("uploads/animals")
-# Create the directory if it doesn't exist
-os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
-
 
 @router.post("/", response_model=AnimalRead)
 async def create_animal(
@@ -28,26 +34,16 @@ async def create_animal(
     health_status: str = Form(...),
     description: str = Form(...),
     image: Optional[UploadFile] = File(None),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Create a new animal record with optional image upload"""
     # Initialize the service
-    service = AnimalService(session)
+    service = AsyncAnimalService(session)
     
     # Handle image upload if provided
     image_path = None
     if image:
-        # Create a unique filename
-        file_extension = os.path.splitext(image.filename)[1]
-        unique_filename = f"{name}_{os.urandom(8).hex()}{file_extension}"
-        file_path = UPLOAD_DIRECTORY / unique_filename
-        
-        # Save the file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-            
-        # Store the relative path instead of full path
-        image_path = f"uploads/animals/{unique_filename}"
+        image_path = await save_image_upload(image)
 
     # Create the animal record
     animal_data = {
@@ -62,43 +58,158 @@ async def create_animal(
     }
     
     new_animal = AnimalCreate(**animal_data)
-    return service.create_animal(new_animal)
+    return await service.create_animal(new_animal)
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_animals(
+    request: Request,
+    batch_size: int = Query(BULK_IMPORT_BATCH_SIZE, ge=1, le=BULK_IMPORT_MAX_BATCH_SIZE, description="Rows per INSERT and commit"),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the content type when omitted"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Import many animals from a streamed CSV or NDJSON body.
+
+    Send the rows as the raw request body, or as a multipart form with the
+    rows in `file` and an optional zip of images in `images`, referenced by
+    an `image` column. Rows are validated as they arrive and the response
+    reports every row that could not be imported.
+    """
+    service = AsyncAnimalService(session)
+    content_type = request.headers.get("content-type", "")
+    
+    if not content_type.startswith("multipart/form-data"):
+        import_format = format or detect_format(content_type)
+        if import_format not in BULK_IMPORT_FORMATS:
+            raise HTTPException(status_code=415, detail="Bulk import expects text/csv or application/x-ndjson")
+        importer = AnimalBulkImporter(service, batch_size)
+        return await importer.run(iter_rows(request.stream(), import_format))
+    
+    async with request.form() as form:
+        rows_file = form.get("file")
+        if not isinstance(rows_file, FormFile):
+            raise HTTPException(status_code=400, detail="Multipart bulk import needs the rows in a 'file' field")
+        import_format = format or detect_format(rows_file.content_type, rows_file.filename)
+        if import_format not in BULK_IMPORT_FORMATS:
+            raise HTTPException(status_code=415, detail="Bulk import expects a CSV or NDJSON file")
+        
+        images = None
+        images_file = form.get("images")
+        if isinstance(images_file, FormFile):
+            try:
+                images = await anyio.to_thread.run_sync(ZipFile, images_file.file)
+            except BadZipFile:
+                raise HTTPException(status_code=400, detail="The 'images' field must be a zip archive")
+        
+        async def chunks():
+            while chunk := await rows_file.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+        
+        importer = AnimalBulkImporter(service, batch_size, images)
+        return await importer.run(iter_rows(chunks(), import_format))
+
+
+@router.get("/export")
+def export_animals(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    type: Optional[str] = Query(None, description="Filter by animal type"),
+    is_adopted: Optional[bool] = Query(None, description="Filter by adoption status")
+):
+    """Stream every matching animal as NDJSON or CSV"""
+    def rows():
+        # The stream outlives the request dependencies, so it owns its session
+        with Session(engine) as session:
+            service = AnimalService(session)
+            yield from serialize_rows(service.stream_animals(type, is_adopted, EXPORT_BATCH_SIZE), AnimalRead, format)
+    
+    return StreamingResponse(
+        rows(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="animals.{format}"'},
+    )
 
 
 @router.get("/{animal_id}", response_model=AnimalRead)
 def get_animal(
     animal_id: int, 
-    session: Session = Depends(get_session)
+    request: Request,
+    session: Session = Depends(get_read_session)
 ):
-    """Get a specific animal by ID"""
+    """Get a specific animal by ID, answering conditional requests with 304"""
     service = AnimalService(session)
-    return service.get_animal(animal_id)
+    
+    # Clients reading their own writes skip the cache, which other workers invalidate slightly later
+    if not reads_from_primary(request):
+        animal = service.get_cached_animal(animal_id)
+        etag = version_etag("animal", animal.id, animal.version)
+        if is_not_modified(request, etag, animal.updated_at):
+            return not_modified(etag, animal.updated_at)
+        return ORJSONResponse(animal_payload(animal), headers=validator_headers(etag, animal.updated_at))
+    
+    # Revalidation only needs the version and updated_at, not the row
+    version, updated_at = service.get_animal_validators(animal_id)
+    etag = version_etag("animal", animal_id, version)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
+    
+    animal = service.get_animal(animal_id)
+    etag = version_etag("animal", animal.id, animal.version)
+    return ORJSONResponse(animal_payload(animal), headers=validator_headers(etag, animal.updated_at))
 
 
-@router.get("/", response_model=List[AnimalRead])
+@router.get("/", response_model=Union[List[AnimalRead], AnimalPage])
 def get_animals(
+    request: Request,
     skip: int = 0, 
-    limit: int = 100, 
-    session: Session = Depends(get_session),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Rows per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor; pass an empty value to start cursor pagination"),
+    session: Session = Depends(get_read_session),
     name: Optional[str] = Query(None, description="Filter by animal name"),
     type: Optional[str] = Query(None, description="Filter by animal type"),
     breed: Optional[str] = Query(None, description="Filter by animal breed"),
-    is_adopted: Optional[bool] = Query(None, description="Filter by adoption status")
+    is_adopted: Optional[bool] = Query(None, description="Filter by adoption status"),
+    q: Optional[str] = Query(None, description="Free-text search across name, breed and description"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,type,image_url")
 ):
-    """Get a list of animals with optional filtering"""
+    """Get a list of animals with optional filtering, answering conditional requests with 304"""
     service = AnimalService(session)
+    # Only the columns behind the requested fields are selected
+    response_fields, columns = animal_projection(fields)
+    
+    # The watermark is read before the rows, so a concurrent write can only
+    # make the ETag older than the body, never newer
+    change_id, updated_at = service.get_animals_watermark()
+    etag = resource_etag("animals", change_id, request.url.query)
+    # Lists revalidate by ETag only; the watermark time is not specific to their rows
+    if is_not_modified(request, etag, None):
+        return not_modified(etag, updated_at)
+    
+    # Rows come straight from the database, so the responses below skip
+    # re-validating them through AnimalRead
     
     # If any search parameters are provided, use search method
-    if any([name, type, breed, is_adopted is not None]):
-        return service.search_animals(name, type, breed, is_adopted)
+    if any([name, type, breed, q, is_adopted is not None]):
+        animals = service.search_animals(name, type, breed, is_adopted, skip, limit, q, columns)
+        response = animals_response(animals, response_fields)
+    
+    # Cursor pagination returns a page envelope with the cursor for the next page
+    elif cursor is not None:
+        items, next_cursor = service.get_animals_page(cursor, limit, columns)
+        response = animal_page_response(items, next_cursor, response_fields)
     
     # Otherwise, get all animals with pagination
-    return service.get_animals(skip, limit)
+    else:
+        response = animals_response(service.get_animals(skip, limit, columns), response_fields)
+    
+    response.headers.update(validator_headers(etag, updated_at))
+    return response
 
 
 @router.put("/{animal_id}", response_model=AnimalRead)
 async def update_animal(
     animal_id: int,
+    request: Request,
     name: Optional[str] = Form(None),
     type: Optional[str] = Form(None),
     age: Optional[float] = Form(None),
@@ -108,27 +219,17 @@ async def update_animal(
     description: Optional[str] = Form(None),
     image: Optional[UploadFile] = File(None),
     is_adopted: Optional[bool] = Form(None),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Update an existing animal record"""
+    """Update an existing animal record; send If-Match with its ETag to update only that version"""
     # Initialize the service
-    service = AnimalService(session)
+    service = AsyncAnimalService(session)
+    expected_version = if_match_version(request, "animal", animal_id)
     
     # Handle image upload if provided
     image_path = None
     if image:
-        # Create a unique filename
-        file_extension = os.path.splitext(image.filename)[1]
-        name_part = name or f"animal_{animal_id}" 
-        unique_filename = f"{name_part}_{os.urandom(8).hex()}{file_extension}"
-        file_path = UPLOAD_DIRECTORY / unique_filename
-        
-        # Save the file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-            
-        # Store the relative path instead of full path
-        image_path = f"uploads/animals/{unique_filename}"
+        image_path = await save_image_upload(image)
 
     # Update the animal record
     update_data = {
@@ -150,7 +251,9 @@ async def update_animal(
     update_data = {k: v for k, v in update_data.items() if v is not None}
     
     animal_update = AnimalUpdate(**update_data)
-    return service.update_animal(animal_id, animal_update)
+    animal = await service.update_animal(animal_id, animal_update, expected_version)
+    etag = version_etag("animal", animal.id, animal.version)
+    return ORJSONResponse(animal_payload(animal), headers=validator_headers(etag, animal.updated_at))
 
 
 @router.delete("/{animal_id}", response_model=dict)
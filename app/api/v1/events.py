@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+
+from app.services.change_feed import get_change_feed, stream_changes
+
+router = APIRouter()
+
+
+@router.get("")
+async def stream_change_events(
+    entity: Optional[List[Literal["animal", "adoption"]]] = Query(None, description="Only stream changes to these entities"),
+    last_event_id: Optional[int] = Header(None, ge=0, description="Resume after this event; sent by EventSource on reconnect"),
+):
+    """Stream animal and adoption changes as Server-Sent Events"""
+    feed = get_change_feed()
+    # Subscribing before the response starts lets a full worker still answer 503
+    subscription = feed.subscribe()
+    return StreamingResponse(
+        stream_changes(feed, subscription, last_event_id, entity),
+        media_type="text/event-stream",
+        # Proxies must neither cache nor buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.v1 import animals, adoptions, statistics
+from app.api.v1 import animals, adoptions, events, statistics
 
 api_router = APIRouter()
 api_router.include_router(animals.router, prefix="/animals", tags=["animals"])
 api_router.include_router(adoptions.router, prefix="/adoptions", tags=["adoptions"])
 api_router.include_router(statistics.router, prefix="/statistics", tags=["statistics"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
 
 # Additional routers will be included here as the application grows
\ No newline at end of file
@@ -1,28 +1,42 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import date
+from typing import Literal, Optional
 
-from app.db.database import get_session
-from app.services.statistics_service import StatisticsService
+from app.db.database import get_async_read_session
+from app.services.statistics_service import AsyncStatisticsService
 
 router = APIRouter()
 
 @router.get("/")
-async def get_shelter_statistics(session: Session = Depends(get_session)):
+async def get_shelter_statistics(session: AsyncSession = Depends(get_async_read_session)):
     """Get shelter statistics summary"""
-    service = StatisticsService(session)
-    return service.get_summary_statistics()
+    service = AsyncStatisticsService(session)
+    return await service.get_summary_statistics()
 
 @router.get("/adoptions")
-async def get_adoption_statistics(session: Session = Depends(get_session)):
+async def get_adoption_statistics(session: AsyncSession = Depends(get_async_read_session)):
     """Get detailed adoption statistics"""
-    service = StatisticsService(session)
-    return service.get_adoption_statistics()
+    service = AsyncStatisticsService(session)
+    return await service.get_adoption_statistics()
 
 @router.get("/animal-types")
-async def get_animal_type_distribution(session: Session = Depends(get_session)):
+async def get_animal_type_distribution(session: AsyncSession = Depends(get_async_read_session)):
     """Get distribution of animals by type"""
-    service = StatisticsService(session)
-    return service.get_animal_type_distribution()
+    service = AsyncStatisticsService(session)
+    return await service.get_animal_type_distribution()
+
+@router.get("/trends")
+async def get_trends(
+    granularity: Literal["day", "week", "month"] = Query("day", description="Length of each period"),
+    start: Optional[date] = Query(None, alias="from", description="First day, rounded down to its period"),
+    end: Optional[date] = Query(None, alias="to", description="Last day, today by default"),
+    animal_type: Optional[str] = Query(None, description="Only count animals of this type"),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    """Get intakes, applications, approvals and rejections per day, week or month"""
+    service = AsyncStatisticsService(session)
+    return await service.get_trends(granularity, start, end, animal_type)
 
 @router.get("/fallback")
 async def get_fallback_statistics():
@@ -0,0 +1,113 @@
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import hmac
+import logging
+import os
+import re
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Diagnose every request, or only those sending DIAGNOSTICS_HEADER with DIAGNOSTICS_TOKEN
+DB_DIAGNOSTICS = os.getenv("DB_DIAGNOSTICS", "false").lower() in ("1", "true", "yes")
+DIAGNOSTICS_HEADER = "x-query-diagnostics"
+DIAGNOSTICS_TOKEN = os.getenv("DIAGNOSTICS_TOKEN")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+# A statement shape run more often than this in one request is reported as N+1
+REPEATED_QUERY_THRESHOLD = int(os.getenv("REPEATED_QUERY_THRESHOLD", 3))
+
+_MAX_PARAMETERS_LENGTH = 500
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists vary in length between calls of the same query
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*\)")
+
+
+class QueryDiagnostics:
+    """Statements seen while handling one request"""
+    def __init__(self, label: str):
+        self.label = label
+        self.shapes: Counter = Counter()
+        self.origins: Dict[str, str] = {}
+        self.slow: List[Dict[str, Any]] = []
+
+    @property
+    def queries(self) -> int:
+        return sum(self.shapes.values())
+
+    def repeated(self, threshold: int = REPEATED_QUERY_THRESHOLD) -> Dict[str, int]:
+        """Statement shapes run more than threshold times, most frequent first"""
+        return {shape: count for shape, count in self.shapes.most_common() if count > threshold}
+
+
+_diagnostics: ContextVar[Optional[QueryDiagnostics]] = ContextVar("query_diagnostics", default=None)
+
+
+def diagnostics_requested(header_value: Optional[str]) -> bool:
+    """Whether a request asked for diagnostics with a valid token, or they are always on"""
+    if DB_DIAGNOSTICS:
+        return True
+    if not DIAGNOSTICS_TOKEN or not header_value:
+        return False
+    return hmac.compare_digest(header_value.encode(), DIAGNOSTICS_TOKEN.encode())
+
+
+def start_diagnostics(label: str) -> QueryDiagnostics:
+    diagnostics = QueryDiagnostics(label)
+    _diagnostics.set(diagnostics)
+    return diagnostics
+
+
+def statement_shape(statement: str) -> str:
+    """A statement with whitespace and variable-length placeholder lists normalized"""
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def service_caller() -> str:
+    """The innermost service method on the current stack, e.g. AnimalService.search_animals"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.services.") and module != "app.services.async_adapter":
+            owner = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            return f"{type(owner).__name__}.{name}" if owner is not None else f"{module}.{name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _format_parameters(parameters: Any) -> str:
+    text = repr(parameters)
+    if len(text) > _MAX_PARAMETERS_LENGTH:
+        text = text[:_MAX_PARAMETERS_LENGTH] + "..."
+    return text
+
+
+def diagnose_query(statement: str, parameters: Any, duration: float) -> None:
+    """Record a statement for the current request's diagnostics, logging it when slow"""
+    diagnostics = _diagnostics.get()
+    if diagnostics is None:
+        return
+
+    shape = statement_shape(statement)
+    diagnostics.shapes[shape] += 1
+    if shape not in diagnostics.origins:
+        diagnostics.origins[shape] = service_caller()
+
+    duration_ms = duration * 1000
+    if duration_ms >= SLOW_QUERY_THRESHOLD_MS:
+        caller = service_caller()
+        diagnostics.slow.append({"caller": caller, "duration_ms": round(duration_ms, 2), "statement": shape})
+        logger.warning(
+            "Slow query (%.1f ms) from %s during %s: %s; parameters=%s",
+            duration_ms, caller, diagnostics.label, shape, _format_parameters(parameters),
+        )
+
+
+def report_diagnostics(diagnostics: QueryDiagnostics) -> None:
+    """Log the statement shapes a request repeated often enough to look like N+1 queries"""
+    for shape, count in diagnostics.repeated().items():
+        logger.warning(
+            "Possible N+1 during %s: the same statement ran %d times from %s: %s",
+            diagnostics.label, count, diagnostics.origins.get(shape, "unknown"), shape,
+        )
@@ -0,0 +1,85 @@
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector, REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Dict
+import time
+
+from app.db.diagnostics import diagnose_query
+from app.services.metrics import DB_POOL_CHECKOUT_TIMEOUTS, DB_POOL_CHECKOUT_WAIT, record_query
+
+
+class _TimedCheckout:
+    """Pool mixin that measures how long each checkout waits for a connection"""
+    def _do_get(self):
+        name = self._orig_logging_name or "default"
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(name).inc()
+            raise
+        DB_POOL_CHECKOUT_WAIT.labels(name).observe(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolCollector(Collector):
+    """Report the occupancy of every instrumented engine's pool at scrape time"""
+    def __init__(self):
+        self.engines: Dict[str, Engine] = {}
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections currently in use", labels=["engine"])
+        idle = GaugeMetricFamily("db_pool_idle", "Open connections waiting in the pool", labels=["engine"])
+        capacity = GaugeMetricFamily(
+            "db_pool_capacity", "Most connections the pool will open, pool_size plus max_overflow", labels=["engine"],
+        )
+        saturation = GaugeMetricFamily(
+            "db_pool_saturation_ratio", "Connections in use as a fraction of capacity", labels=["engine"],
+        )
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            limit = pool.size() + max(pool._max_overflow, 0)
+            in_use = pool.checkedout()
+            checked_out.add_metric([name], in_use)
+            idle.add_metric([name], pool.checkedin())
+            capacity.add_metric([name], limit)
+            saturation.add_metric([name], in_use / limit if limit else 0.0)
+        yield from (checked_out, idle, capacity, saturation)
+
+
+POOL_COLLECTOR = PoolCollector()
+REGISTRY.register(POOL_COLLECTOR)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Time every statement the engine runs, feed query diagnostics and report its pool on /metrics"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        record_query(name, duration)
+        diagnose_query(statement, parameters, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(context):
+        # Failed statements never reach after_cursor_execute
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    POOL_COLLECTOR.engines[name] = engine
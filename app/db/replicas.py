@@ -0,0 +1,65 @@
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import List, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    """One read replica with the sync and async engines that reach it"""
+    def __init__(self, name: str, engine: Engine, async_engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+        self.checked_at: Optional[float] = None
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replicas, skipping those that fail a health check.
+
+    A replica is probed with SELECT 1 at most once per health_check_seconds;
+    between probes its last result is reused. pick returns None when no
+    replica is configured or healthy, and the caller falls back to the primary.
+    """
+    def __init__(self, replicas: List[Replica], health_check_seconds: float = 5.0):
+        self.replicas = replicas
+        self.health_check_seconds = health_check_seconds
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Replica]:
+        """The next healthy replica, or None to use the primary; may block on a probe"""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+            if self.is_healthy(replica):
+                return replica
+        return None
+
+    def is_healthy(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if replica.checked_at is not None and now - replica.checked_at < self.health_check_seconds:
+            return replica.healthy
+        replica.checked_at = now
+        try:
+            with replica.engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+        except SQLAlchemyError as exc:
+            if replica.healthy:
+                logger.warning("Read replica %s failed its health check, using the primary: %s", replica.name, exc)
+            replica.healthy = False
+        else:
+            if not replica.healthy:
+                logger.info("Read replica %s is healthy again", replica.name)
+            replica.healthy = True
+        return replica.healthy
@@ -0,0 +1,135 @@
+from sqlalchemy import case, column, func, literal, literal_column, or_, table, text
+from sqlalchemy.engine import Engine
+from typing import List, Optional
+import re
+
+from app.schemas.animal import Animal
+
+# Relative weight of each searchable column when ranking free-text matches
+SEARCH_WEIGHTS = {"name": 10.0, "breed": 5.0, "description": 1.0}
+
+# External-content FTS5 table that mirrors the searchable animal columns
+animal_fts = table("animal_fts", column("rowid"))
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_animal_name_trgm ON animal USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_animal_breed_trgm ON animal USING gin (breed gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_animal_description_trgm ON animal USING gin (description gin_trgm_ops)",
+]
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS animal_fts USING fts5(
+        name, breed, description,
+        content='animal', content_rowid='id',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS animal_fts_ai AFTER INSERT ON animal BEGIN
+        INSERT INTO animal_fts(rowid, name, breed, description)
+        VALUES (new.id, new.name, new.breed, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS animal_fts_ad AFTER DELETE ON animal BEGIN
+        INSERT INTO animal_fts(animal_fts, rowid, name, breed, description)
+        VALUES ('delete', old.id, old.name, old.breed, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS animal_fts_au AFTER UPDATE OF name, breed, description ON animal BEGIN
+        INSERT INTO animal_fts(animal_fts, rowid, name, breed, description)
+        VALUES ('delete', old.id, old.name, old.breed, old.description);
+        INSERT INTO animal_fts(rowid, name, breed, description)
+        VALUES (new.id, new.name, new.breed, new.description);
+    END""",
+]
+
+
+def create_search_indexes(engine: Engine) -> None:
+    """Create the text search indexes for the database backend in use"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            for statement in _POSTGRES_DDL:
+                conn.execute(text(statement))
+        elif engine.dialect.name == "sqlite":
+            existed = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'animal_fts'")
+            ).first()
+            for statement in _SQLITE_DDL:
+                conn.execute(text(statement))
+            # Index any animals that were stored before the FTS table existed
+            if not existed:
+                conn.execute(text("INSERT INTO animal_fts(animal_fts) VALUES ('rebuild')"))
+
+
+def _tokens(value: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(value.lower())
+
+
+def _fts_terms(value: str, columns: Optional[str] = None) -> List[str]:
+    """Turn user input into FTS5 prefix terms, optionally scoped to columns"""
+    scope = f"{{{columns}}} : " if columns else ""
+    return [f'{scope}"{token}"*' for token in _tokens(value)]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_text_search(query, dialect: str, name: Optional[str] = None,
+                      breed: Optional[str] = None, q: Optional[str] = None):
+    """
+    Add text predicates and relevance ordering to an animal select.
+
+    `name` and `breed` match their own column, `q` matches name, breed and
+    description. Every term also matches as a prefix so the same query serves
+    type-ahead. Results come back best match first.
+    """
+    if dialect == "sqlite":
+        terms = []
+        if name:
+            terms += _fts_terms(name, "name")
+        if breed:
+            terms += _fts_terms(breed, "breed")
+        if q:
+            terms += _fts_terms(q)
+        if not terms:
+            # Input without any word characters can never match a token
+            return query.where(literal(False))
+        weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS.values())
+        return (
+            query.join(animal_fts, animal_fts.c.rowid == Animal.id)
+            .where(literal_column("animal_fts").op("MATCH")(" AND ".join(terms)))
+            .order_by(text(f"bm25(animal_fts, {weights})"), Animal.id)
+        )
+
+    if dialect == "postgresql":
+        # ILIKE and the word-similarity operator are both served by the trigram indexes
+        score = literal(0.0)
+        fields = []
+        if name:
+            fields.append((name, [Animal.name]))
+            # Boost names that start with the typed text for type-ahead
+            score = score + case((Animal.name.ilike(f"{_escape_like(name)}%"), 1.0), else_=0.0)
+        if breed:
+            fields.append((breed, [Animal.breed]))
+        if q:
+            fields.append((q, [Animal.name, Animal.breed, Animal.description]))
+        for term, columns in fields:
+            query = query.where(or_(*[
+                predicate
+                for col in columns
+                for predicate in (col.ilike(f"%{_escape_like(term)}%"), literal(term).op("<%")(col))
+            ]))
+            for col in columns:
+                score = score + SEARCH_WEIGHTS[col.key] * func.word_similarity(term, col)
+        return query.order_by(score.desc(), Animal.id)
+
+    # Other backends have no text index, fall back to plain substring matching
+    if name:
+        query = query.where(Animal.name.contains(name))
+    if breed:
+        query = query.where(Animal.breed.contains(breed))
+    if q:
+        query = query.where(or_(
+            Animal.name.contains(q), Animal.breed.contains(q), Animal.description.contains(q)
+        ))
+    return query.order_by(Animal.id)
@@ -1,5 +1,7 @@
-from sqlmodel import SQLModel, Field, Relationship
-from typing import Optional
+from sqlmodel import SQLModel, Field, Index, Relationship
+from sqlalchemy import text
+from sqlalchemy.orm import declared_attr
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -36,9 +38,26 @@ class AdoptionBase(SQLModel):
 
 class Adoption(AdoptionBase, table=True):
     """Adoption model for database storage"""
+    # Shaped around the per-animal, per-status and paginated lookups; created by migrations
+    __table_args__ = (
+        Index("ix_adoption_animal_id_status", "animal_id", "status"),
+        Index("ix_adoption_status_created_at", "status", "created_at", "id"),
+        Index("ix_adoption_created_at_id", "created_at", "id"),
+        # At most one approved application per animal
+        Index("uq_adoption_animal_id_approved", "animal_id", unique=True,
+              postgresql_where=text("status = 'Approved'"), sqlite_where=text("status = 'Approved'")),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     status: str = "Pending"  # Pending, Approved, Rejected
+    # When the application was approved or rejected; daily statistics count decisions on this day
+    decided_at: Optional[datetime] = None
+    # Bumped on every write; ORM updates only apply to the version they loaded
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.__table__.c.version}
 
 
 class AdoptionCreate(AdoptionBase):
@@ -51,6 +70,13 @@ class AdoptionRead(AdoptionBase):
     id: int
     created_at: datetime
     status: str
+    version: int
+
+
+class AdoptionPage(SQLModel):
+    """Schema for a cursor-paginated page of adoption applications"""
+    items: List[AdoptionRead]
+    next_cursor: Optional[str] = None
 
 
 class AdoptionUpdate(SQLModel):
@@ -65,4 +91,36 @@ class AdoptionUpdate(SQLModel):
     previous_pet_experience: Optional[str] = None
     adoption_reason: Optional[str] = None
     animal_id: Optional[int] = None
-    status: Optional[str] = None
\ No newline at end of file
+    status: Optional[str] = None
+
+class ReviewDecision(str, Enum):
+    """What staff decided about one adoption application"""
+    APPROVE = "approve"
+    REJECT = "reject"
+
+
+class AdoptionReviewItem(SQLModel):
+    """One decision in a batch review"""
+    adoption_id: int
+    decision: ReviewDecision
+
+
+class AdoptionBatchReview(SQLModel):
+    """Decisions to apply together in one transaction"""
+    # Keeps the IN lists of the set-based updates to a sensible size
+    decisions: List[AdoptionReviewItem] = Field(min_length=1, max_length=500)
+
+
+class AdoptionReviewOutcome(SQLModel):
+    """What happened to one decision of a batch review"""
+    adoption_id: int
+    decision: ReviewDecision
+    outcome: str  # approved, rejected, not_found, skipped, conflict
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class AdoptionBatchReviewResult(SQLModel):
+    """Per-decision outcomes, plus the applications rejected because another one for the same animal was approved"""
+    items: List[AdoptionReviewOutcome]
+    auto_rejected: List[int]
@@ -1,7 +1,73 @@
-from sqlmodel import SQLModel, Field
-from typing import Optional
+from sqlmodel import SQLModel, Field, Index
+from sqlalchemy.orm import declared_attr
+from typing import Dict, List, Optional
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 from pydantic import computed_field
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Public origin the API is served from; image URLs are built on top of it
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000").rstrip("/")
+
+# Resized derivatives of every uploaded image, keyed by name with their longest edge in pixels
+IMAGE_VARIANTS = {"thumbnail": 160, "card": 480, "full": 1280}
+
+
+def _has_encoder(fmt: str) -> bool:
+    from PIL import Image
+    # Plugins only register a writer when Pillow was built with its codec
+    Image.init()
+    return fmt.upper() in Image.SAVE
+
+
+def _variant_formats(configured: str) -> List[str]:
+    """Configured variant formats that the installed Pillow can encode"""
+    formats = []
+    for fmt in (fmt.strip().lower() for fmt in configured.split(",")):
+        if not fmt:
+            continue
+        if _has_encoder(fmt):
+            formats.append(fmt)
+        else:
+            # Every job for it would fail, so the format is left out of the URLs as well
+            logger.warning("Pillow cannot encode %s; skipping that image variant format", fmt)
+    return formats
+
+
+# AVIF needs a Pillow built with libavif; add it with IMAGE_VARIANT_FORMATS=webp,avif
+IMAGE_VARIANT_FORMATS = _variant_formats(os.getenv("IMAGE_VARIANT_FORMATS", "webp"))
+
+
+def variant_paths(image_path: str) -> Dict[str, Dict[str, str]]:
+    """Relative paths of every variant of a stored image as {variant: {format: path}}"""
+    stem = Path(image_path).stem
+    return {
+        variant: {fmt: f"uploads/animals/variants/{stem}_{variant}.{fmt}" for fmt in IMAGE_VARIANT_FORMATS}
+        for variant in IMAGE_VARIANTS
+    }
+
+
+def image_url(image_path: Optional[str]) -> Optional[str]:
+    """Public URL of a stored image"""
+    if not image_path:
+        return None
+    return f"{PUBLIC_BASE_URL}/{image_path}"
+
+
+# Cached per path; the returned mapping is shared, so callers must not modify it
+@lru_cache(maxsize=4096)
+def image_variant_urls(image_path: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """Public URLs of the resized variants of a stored image as {variant: {format: url}}"""
+    if not image_path:
+        return None
+    return {
+        variant: {fmt: f"{PUBLIC_BASE_URL}/{path}" for fmt, path in paths.items()}
+        for variant, paths in variant_paths(image_path).items()
+    }
 
 
 class AnimalBase(SQLModel):
@@ -17,11 +83,25 @@ class AnimalBase(SQLModel):
 
 class Animal(AnimalBase, table=True):
     """Animal model for database storage"""
+    # Shaped around the list, search and statistics predicates; created by migrations
+    __table_args__ = (
+        Index("ix_animal_created_at_id", "created_at", "id"),
+        Index("ix_animal_type_is_adopted_created_at", "type", "is_adopted", "created_at", "id"),
+        Index("ix_animal_is_adopted_created_at", "is_adopted", "created_at", "id"),
+        Index("ix_animal_image_path", "image_path"),
+        Index("ix_animal_updated_at", "updated_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     image_path: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_adopted: bool = False
+    # Bumped on every write; ORM updates only apply to the version they loaded
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.__table__.c.version}
 
 
 class AnimalCreate(AnimalBase):
@@ -35,15 +115,23 @@ class AnimalRead(AnimalBase):
     image_path: Optional[str] = None
     created_at: datetime
     is_adopted: bool
+    version: int
     
     @computed_field
     def image_url(self) -> Optional[str]:
         """Get the full URL for the image"""
-        if not self.image_path:
-            return None
-        # Return the complete URL path that can be used by the frontend
-        # This assumes your API is running on localhost:8000
-        return f"http://localhost:8000/{self.image_path}"
+        return image_url(self.image_path)
+
+    @computed_field
+    def image_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Get URLs of the resized variants as {variant: {format: url}}"""
+        return image_variant_urls(self.image_path)
+
+
+class AnimalPage(SQLModel):
+    """Schema for a cursor-paginated page of animals"""
+    items: List[AnimalRead]
+    next_cursor: Optional[str] = None
 
 
 class AnimalUpdate(SQLModel):
@@ -57,3 +145,17 @@ class AnimalUpdate(SQLModel):
     description: Optional[str] = None
     image_path: Optional[str] = None
     is_adopted: Optional[bool] = None
+
+
+class BulkImportError(SQLModel):
+    """Validation or storage problems found in one row of a bulk import"""
+    row: int
+    errors: List[str]
+
+
+class BulkImportResult(SQLModel):
+    """Outcome of a bulk animal import"""
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
+    errors_truncated: bool = False
@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field, Index
+from typing import Optional
+from datetime import datetime
+
+
+class ChangeEvent(SQLModel, table=True):
+    """A committed change to an animal or adoption application, streamed to clients by the change feed"""
+    # The id doubles as the SSE event id clients resume from; created_at drives pruning
+    __table_args__ = (
+        Index("ix_change_event_created_at", "created_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str = Field(max_length=32)  # animal, adoption
+    entity_id: int
+    action: str = Field(max_length=32)  # created, updated, adopted, deleted, approved, rejected
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, Field
+
+
+class ShelterCounter(SQLModel, table=True):
+    """Running total kept up to date by the animal and adoption services"""
+    __tablename__ = "shelter_counter"
+
+    key: str = Field(primary_key=True)
+    value: int = 0
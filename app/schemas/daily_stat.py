@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel, Field
+from datetime import date
+
+
+class DailyStat(SQLModel, table=True):
+    """Per-day, per-animal-type activity kept up to date by the animal and adoption services"""
+    __tablename__ = "daily_stat"
+
+    day: date = Field(primary_key=True)
+    animal_type: str = Field(primary_key=True)
+    intakes: int = 0
+    applications: int = 0
+    approvals: int = 0
+    rejections: int = 0
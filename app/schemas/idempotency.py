@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field, Index
+from typing import Optional
+from datetime import datetime
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Idempotency-Key sent with a create request, and the resource that request created"""
+    __tablename__ = "idempotency_key"
+    # Expired keys are pruned by created_at
+    __table_args__ = (
+        Index("ix_idempotency_key_created_at", "created_at"),
+    )
+
+    scope: str = Field(primary_key=True, max_length=64)
+    key: str = Field(primary_key=True, max_length=255)
+    request_hash: str = Field(max_length=64)
+    resource_id: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field, Index
+from typing import Optional
+from datetime import datetime
+
+
+class Job(SQLModel, table=True):
+    """Background work recorded in the same transaction as the change that needs it"""
+    # Workers look for the next due job by status and run_at
+    __table_args__ = (
+        Index("ix_job_status_run_at", "status", "run_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(max_length=64)
+    payload: str  # JSON
+    status: str = "queued"  # queued, running, dead
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime = Field(default_factory=datetime.utcnow)
+    # A running job whose lease has passed is assumed abandoned and claimed again
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
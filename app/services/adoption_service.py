@@ -1,38 +1,168 @@
-from sqlmodel import Session, select
-from typing import List, Optional
+from sqlmodel import Session, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from collections import Counter
+from datetime import datetime
+from typing import Any, Collection, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 from fastapi import HTTPException
 
-from app.schemas.adoption import Adoption, AdoptionCreate, AdoptionUpdate
+from app.schemas.adoption import (
+    Adoption, AdoptionBatchReviewResult, AdoptionCreate, AdoptionReviewItem, AdoptionReviewOutcome, AdoptionUpdate,
+    ReviewDecision,
+)
 from app.schemas.animal import Animal
+from app.schemas.idempotency import IdempotencyKey
+from app.services.async_adapter import AsyncServiceAdapter
+from app.services.change_feed import (
+    ADOPTED, ADOPTION, ANIMAL, APPROVED, CREATED, DELETED, REJECTED, UPDATED, record_changes,
+)
+from app.services.concurrency import check_version, commit_versioned, flush_versioned
+from app.services.counter_service import (
+    CounterService, adopted_counts, adoption_counts, merge_counts, status_change_counts,
+)
+from app.services.daily_stat_service import DailyStatService, application_stats, decision_stats, merge_stats
+from app.services.entity_cache import adoption_cache
+from app.services.idempotency_service import IdempotencyService, request_fingerprint
+from app.services.job_queue import enqueue_many
+from app.services.jobs import NOTIFY_APPLICANT
+from app.services.pagination import apply_keyset, page_size, split_page
+from app.services.projection import select_columns
+
+# Idempotency-Key namespace for POST /adoptions/
+CREATE_ADOPTION_SCOPE = "adoptions.create"
+
+ADOPTION_STATUSES = ("Pending", "Approved", "Rejected")
+# Applications with these statuses keep their animal marked adopted
+_HOLDING_STATUSES = ("Pending", "Approved")
+
+# The type of an application's animal, for RETURNING clauses that feed the daily statistics
+_ANIMAL_TYPE = select(Animal.type).where(Animal.id == Adoption.animal_id).scalar_subquery()
 
 
 class AdoptionService:
     def __init__(self, session: Session):
         self.session = session
+        self.counters = CounterService(session)
+        self.daily_stats = DailyStatService(session)
 
-    def create_adoption(self, adoption: AdoptionCreate) -> Adoption:
-        """Create a new adoption application"""
-        # Verify that the animal exists
-        animal = self.session.get(Animal, adoption.animal_id)
-        if not animal:
-            raise HTTPException(status_code=404, detail=f"Animal with ID {adoption.animal_id} not found")
-        
-        # Check if animal is already adopted
-        if animal.is_adopted:
+    def create_adoption(self, adoption: AdoptionCreate, idempotency_key: Optional[str] = None) -> Adoption:
+        """
+        Create a new adoption application, reserving its animal.
+
+        The animal is claimed with one conditional UPDATE, so of several
+        concurrent applications for the same animal exactly one succeeds and
+        none waits on a row lock held by the others. With an idempotency key,
+        a retry of a request that already succeeded returns the same
+        application instead of creating another.
+        """
+        record = None
+        if idempotency_key is not None:
+            idempotency = IdempotencyService(self.session)
+            fingerprint = request_fingerprint(adoption.model_dump(mode="json"))
+            record = idempotency.find(CREATE_ADOPTION_SCOPE, idempotency_key, fingerprint)
+            if record is not None:
+                return self._replay(record)
+            try:
+                record = idempotency.claim(CREATE_ADOPTION_SCOPE, idempotency_key, fingerprint)
+            except IntegrityError:
+                # A concurrent request with the same key got there first
+                self.session.rollback()
+                record = idempotency.find(CREATE_ADOPTION_SCOPE, idempotency_key, fingerprint)
+                if record is None:
+                    raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+                return self._replay(record)
+
+        # Mark animal as adopted immediately, unless another application already has
+        reserved = self._reserve_animals([adoption.animal_id])
+        if not reserved:
+            self.session.rollback()
+            if self.session.get(Animal, adoption.animal_id) is None:
+                raise HTTPException(status_code=404, detail=f"Animal with ID {adoption.animal_id} not found")
             raise HTTPException(status_code=400, detail=f"Animal with ID {adoption.animal_id} is already adopted")
 
         # Create the adoption application
         db_adoption = Adoption.model_validate(adoption.model_dump())
         self.session.add(db_adoption)
+        self.session.flush()
+        if record is not None:
+            record.resource_id = db_adoption.id
+            self.session.add(record)
         
-        # Mark animal as adopted immediately
-        animal.is_adopted = True
-        self.session.add(animal)
-        
+        self.counters.increment(merge_counts(adoption_counts(db_adoption), adopted_counts()))
+        self.daily_stats.increment(application_stats(db_adoption, reserved[adoption.animal_id]))
+        record_changes(self.session, [(ADOPTION, db_adoption.id, CREATED), (ANIMAL, adoption.animal_id, ADOPTED)])
         self.session.commit()
         self.session.refresh(db_adoption)
         return db_adoption
 
+    def _replay(self, record: IdempotencyKey) -> Adoption:
+        if record.resource_id is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        return self.get_adoption(record.resource_id)
+
+    def _reserve_animals(self, animal_ids: Collection[int]) -> Dict[int, str]:
+        """Mark animals adopted unless they already are, in one statement; returns {id: type} of the ones that changed"""
+        if not animal_ids:
+            return {}
+        reserved = self.session.execute(
+            update(Animal)
+            .where(Animal.id.in_(animal_ids), Animal.is_adopted == False)
+            .values(is_adopted=True, updated_at=datetime.utcnow(), version=Animal.version + 1)
+            .returning(Animal.id, Animal.type)
+        ).all()
+        return dict(reserved)
+
+    def _release_animals(self, animal_ids: Collection[int]) -> Set[int]:
+        """Mark animals available again once no pending or approved application holds them"""
+        if not animal_ids:
+            return set()
+        holders = select(Adoption.id).where(
+            Adoption.animal_id == Animal.id, Adoption.status.in_(_HOLDING_STATUSES)
+        )
+        released = self.session.execute(
+            update(Animal)
+            .where(Animal.id.in_(animal_ids), Animal.is_adopted == True, ~holders.exists())
+            .values(is_adopted=False, updated_at=datetime.utcnow(), version=Animal.version + 1)
+            .returning(Animal.id)
+        ).scalars().all()
+        return set(released)
+
+    def _reject_pending(self, adoption_ids: Collection[int] = (),
+                        animal_ids: Collection[int] = ()) -> List[Tuple[int, int, str]]:
+        """Reject the pending applications with the given ids or for the given animals; returns (id, animal_id, animal type)"""
+        conditions = []
+        if adoption_ids:
+            conditions.append(Adoption.id.in_(adoption_ids))
+        if animal_ids:
+            conditions.append(Adoption.animal_id.in_(animal_ids))
+        if not conditions:
+            return []
+        return self.session.execute(
+            update(Adoption)
+            .where(Adoption.status == "Pending", or_(*conditions))
+            .values(status="Rejected", decided_at=datetime.utcnow(), version=Adoption.version + 1)
+            .returning(Adoption.id, Adoption.animal_id, _ANIMAL_TYPE)
+        ).all()
+
+    def _notify_applicants(self, decisions: Sequence[Tuple[int, str]]) -> None:
+        """Queue notifications of (adoption_id, status) decisions, sent once the transaction commits"""
+        enqueue_many(self.session, NOTIFY_APPLICANT, [
+            {"adoption_id": adoption_id, "status": status} for adoption_id, status in decisions
+        ])
+
+    def _transition(self, adoption: Adoption, status: str) -> Optional[str]:
+        """
+        Decide an application that still has the status it was read with.
+
+        Returns the type of its animal, or None if the application changed meanwhile.
+        """
+        return self.session.execute(
+            update(Adoption)
+            .where(Adoption.id == adoption.id, Adoption.status == adoption.status)
+            .values(status=status, decided_at=datetime.utcnow(), version=Adoption.version + 1)
+            .returning(_ANIMAL_TYPE)
+        ).scalar()
+
     def get_adoption(self, adoption_id: int) -> Adoption:
         """Get a single adoption application by ID"""
         adoption = self.session.get(Adoption, adoption_id)
@@ -40,78 +170,374 @@ class AdoptionService:
             raise HTTPException(status_code=404, detail=f"Adoption application with ID {adoption_id} not found")
         return adoption
 
-    def get_adoptions(self, skip: int = 0, limit: int = 100) -> List[Adoption]:
-        """Get multiple adoption applications with pagination"""
+    def get_cached_adoption(self, adoption_id: int) -> Adoption:
+        """Get a single adoption application by ID through the entity cache, as a detached copy for reads only"""
+        values = adoption_cache.load(adoption_id, lambda: self.get_adoption(adoption_id).model_dump())
+        return Adoption.model_construct(**values)
+
+    def get_adoptions(self, skip: int = 0, limit: int = 100, columns: Optional[Sequence[str]] = None) -> List[Adoption]:
+        """Get multiple adoption applications with pagination, loading only the given columns if any"""
+        limit = page_size(limit)
         adoptions = self.session.exec(
-            select(Adoption).offset(skip).limit(limit)
+            select_columns(Adoption, columns).offset(skip).limit(limit)
         ).all()
         return adoptions
 
-    def get_adoptions_by_animal(self, animal_id: int) -> List[Adoption]:
+    def get_adoptions_page(self, cursor: Optional[str] = None, limit: int = 100,
+                           columns: Optional[Sequence[str]] = None) -> Tuple[List[Adoption], Optional[str]]:
+        """Get a page of adoption applications after the given cursor, plus the cursor for the next page"""
+        limit = page_size(limit)
+        adoptions = self.session.exec(
+            apply_keyset(select_columns(Adoption, columns), Adoption, cursor, limit)
+        ).all()
+        return split_page(adoptions, limit)
+
+    def get_adoptions_by_animal(self, animal_id: int, columns: Optional[Sequence[str]] = None) -> List[Adoption]:
         """Get all adoption applications for a specific animal"""
         adoptions = self.session.exec(
-            select(Adoption).where(Adoption.animal_id == animal_id)
+            select_columns(Adoption, columns).where(Adoption.animal_id == animal_id)
         ).all()
         return adoptions
 
-    def get_adoptions_by_status(self, status: str) -> List[Adoption]:
+    def get_adoptions_by_status(self, status: str, columns: Optional[Sequence[str]] = None) -> List[Adoption]:
         """Get all adoption applications with a specific status"""
         adoptions = self.session.exec(
-            select(Adoption).where(Adoption.status == status)
+            select_columns(Adoption, columns).where(Adoption.status == status)
         ).all()
         return adoptions
 
-    def update_adoption(self, adoption_id: int, adoption_update: AdoptionUpdate) -> Adoption:
-        """Update an existing adoption application"""
+    def stream_adoptions(self, animal_id: Optional[int] = None, status: Optional[str] = None,
+                         batch_size: int = 1000) -> Iterator[Mapping[str, Any]]:
+        """Stream every matching adoption application row from a server-side cursor, batch_size rows per fetch"""
+        query = select(*Adoption.__table__.columns).order_by(Adoption.id)
+        if animal_id is not None:
+            query = query.where(Adoption.animal_id == animal_id)
+        if status is not None:
+            query = query.where(Adoption.status == status)
+        
+        result = self.session.execute(query.execution_options(yield_per=batch_size))
+        for row in result:
+            yield row._mapping
+
+    def update_adoption(self, adoption_id: int, adoption_update: AdoptionUpdate,
+                        expected_version: Optional[int] = None) -> Adoption:
+        """
+        Update an existing adoption application, optionally only if it is still at expected_version.
+
+        Changes of status or animal go through the same reservation rules as
+        creating, approving and rejecting: an application can only come to
+        hold an animal nobody else holds, approving it rejects the animal's
+        other pending applications, and an animal no application holds any
+        more is released.
+        """
+        resource = f"Adoption application with ID {adoption_id}"
         db_adoption = self.get_adoption(adoption_id)
+        check_version(resource, db_adoption.version, expected_version)
+        previous_counts = adoption_counts(db_adoption, -1)
+        previous_status, previous_animal_id = db_adoption.status, db_adoption.animal_id
+        previous_decided_at = db_adoption.decided_at
         
         update_data = adoption_update.model_dump(exclude_unset=True)
+        status = update_data.get("status") or previous_status
+        animal_id = update_data.get("animal_id") or previous_animal_id
+        if status not in ADOPTION_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Status must be one of {', '.join(ADOPTION_STATUSES)}")
         for key, value in update_data.items():
             setattr(db_adoption, key, value)
-            
+        db_adoption.status, db_adoption.animal_id = status, animal_id
+        if status != previous_status:
+            db_adoption.decided_at = datetime.utcnow() if status in ("Approved", "Rejected") else None
+        moved = animal_id != previous_animal_id
+        holds, held = status in _HOLDING_STATUSES, previous_status in _HOLDING_STATUSES
+
+        reserved: Dict[int, str] = {}
+        if holds:
+            # Claimed before the application row is written, as on create
+            with self.session.no_autoflush:
+                reserved = self._reserve_animals([animal_id])
+            if not reserved and (moved or not held):
+                self.session.rollback()
+                if self.session.get(Animal, animal_id) is None:
+                    raise HTTPException(status_code=404, detail=f"Animal with ID {animal_id} not found")
+                raise HTTPException(status_code=400, detail=f"Animal with ID {animal_id} is already adopted")
+        
         self.session.add(db_adoption)
-        self.session.commit()
+        flush_versioned(self.session, resource, expected_version)
+        released = self._release_animals([previous_animal_id]) if held and (moved or not holds) else set()
+        auto_rejected = []
+        if status == "Approved" and previous_status != "Approved":
+            # As on approval, other applications for the animal can no longer succeed
+            auto_rejected = self._reject_pending(animal_ids=[animal_id])
+        
+        self.counters.increment(merge_counts(
+            previous_counts, adoption_counts(db_adoption),
+            status_change_counts("Pending", "Rejected", len(auto_rejected)),
+            adopted_counts(len(reserved) - len(released)),
+        ))
+        if (status, animal_id) != (previous_status, previous_animal_id):
+            types = dict(self.session.exec(
+                select(Animal.id, Animal.type).where(Animal.id.in_({previous_animal_id, animal_id}))
+            ).all())
+            previous = Adoption.model_construct(
+                created_at=db_adoption.created_at, status=previous_status, decided_at=previous_decided_at,
+            )
+            self.daily_stats.increment(merge_stats(
+                application_stats(previous, types.get(previous_animal_id, ""), -1),
+                application_stats(db_adoption, types.get(animal_id, "")),
+                decision_stats("Rejected", types.get(animal_id, ""), len(auto_rejected)),
+            ))
+        
+        decided = [(adoption_id, status)] if status != previous_status and status in ("Approved", "Rejected") else []
+        self._notify_applicants(decided + [(rejected_id, "Rejected") for rejected_id, _, _ in auto_rejected])
+        action = {"Approved": APPROVED, "Rejected": REJECTED}.get(status) if decided else UPDATED
+        record_changes(self.session, [(ADOPTION, adoption_id, action)]
+                       + [(ADOPTION, rejected_id, REJECTED) for rejected_id, _, _ in auto_rejected]
+                       + [(ANIMAL, reserved_id, ADOPTED) for reserved_id in reserved]
+                       + [(ANIMAL, released_id, UPDATED) for released_id in released])
+        commit_versioned(self.session, resource, expected_version)
         self.session.refresh(db_adoption)
         return db_adoption
 
     def delete_adoption(self, adoption_id: int) -> None:
-        """Delete an adoption application"""
+        """Delete an adoption application, releasing its animal if nothing else holds it"""
         adoption = self.get_adoption(adoption_id)
         self.session.delete(adoption)
-        self.session.commit()
+        self.session.flush()
+        counts = adoption_counts(adoption, -1)
+        animal_type = self.session.exec(select(Animal.type).where(Animal.id == adoption.animal_id)).first()
+        if animal_type is not None:
+            self.daily_stats.increment(application_stats(adoption, animal_type, -1))
+        changes = [(ADOPTION, adoption_id, DELETED)]
+        if adoption.status != "Rejected" and self._release_animals([adoption.animal_id]):
+            counts = merge_counts(counts, adopted_counts(-1))
+            changes.append((ANIMAL, adoption.animal_id, UPDATED))
+        self.counters.increment(counts)
+        record_changes(self.session, changes)
+        commit_versioned(self.session, f"Adoption application with ID {adoption_id}")
         
     def approve_adoption(self, adoption_id: int) -> Adoption:
-        """Approve an adoption application and mark the animal as adopted"""
+        """
+        Approve a pending adoption application and mark the animal as adopted.
+
+        Only a Pending application can be approved, and a unique index allows
+        one approved application per animal, so concurrent approvals for the
+        same animal cannot both succeed. The animal's other pending
+        applications are rejected in the same transaction.
+        """
         adoption = self.get_adoption(adoption_id)
+        if adoption.status != "Pending":
+            raise HTTPException(
+                status_code=400,
+                detail=f"Adoption application with ID {adoption_id} is {adoption.status}, not Pending",
+            )
         
-        # Get the animal
-        animal = self.session.get(Animal, adoption.animal_id)
-        if not animal:
-            raise HTTPException(status_code=404, detail=f"Animal with ID {adoption.animal_id} not found")
-            
-        # Check if animal is already adopted
-        if animal.is_adopted:
+        try:
+            animal_type = self._transition(adoption, "Approved")
+        except IntegrityError:
+            self.session.rollback()
             raise HTTPException(status_code=400, detail=f"Animal with ID {adoption.animal_id} is already adopted")
-            
-        # Update adoption status
-        adoption.status = "Approved"
-        
-        # Mark animal as adopted
-        animal.is_adopted = True
+        if animal_type is None:
+            self.session.rollback()
+            raise HTTPException(status_code=409, detail=f"Adoption application with ID {adoption_id} was changed by another request; retry")
         
-        # Save changes
-        self.session.add(adoption)
-        self.session.add(animal)
+        # Other applications for the animal can no longer succeed
+        auto_rejected = self._reject_pending(animal_ids=[adoption.animal_id])
+        # The animal is normally still reserved by this application
+        adopted = self._reserve_animals([adoption.animal_id])
+        counts = merge_counts(
+            status_change_counts("Pending", "Approved"),
+            status_change_counts("Pending", "Rejected", len(auto_rejected)),
+            adopted_counts(len(adopted)),
+        )
+        self.counters.increment(counts)
+        self.daily_stats.increment(merge_stats(
+            decision_stats("Approved", animal_type),
+            decision_stats("Rejected", animal_type, len(auto_rejected)),
+        ))
+        self._notify_applicants([(adoption_id, "Approved")] + [(rejected_id, "Rejected") for rejected_id, _, _ in auto_rejected])
+        record_changes(self.session, [(ADOPTION, adoption_id, APPROVED)]
+                       + [(ADOPTION, rejected_id, REJECTED) for rejected_id, _, _ in auto_rejected]
+                       + [(ANIMAL, animal_id, ADOPTED) for animal_id in adopted])
         self.session.commit()
         self.session.refresh(adoption)
         
         return adoption
         
     def reject_adoption(self, adoption_id: int) -> Adoption:
-        """Reject an adoption application"""
+        """Reject an adoption application, releasing its animal if nothing else holds it"""
         adoption = self.get_adoption(adoption_id)
-        adoption.status = "Rejected"
-        self.session.add(adoption)
+        if adoption.status == "Rejected":
+            return adoption
+        
+        previous_status, previous_decided_at = adoption.status, adoption.decided_at
+        animal_type = self._transition(adoption, "Rejected")
+        if animal_type is None:
+            self.session.rollback()
+            raise HTTPException(status_code=409, detail=f"Adoption application with ID {adoption_id} was changed by another request; retry")
+        
+        released = self._release_animals([adoption.animal_id])
+        counts = merge_counts(
+            status_change_counts(previous_status, "Rejected"),
+            adopted_counts(-len(released)),
+        )
+        self.counters.increment(counts)
+        # Rejecting an approved application takes back its approval
+        self.daily_stats.increment(merge_stats(
+            decision_stats(previous_status, animal_type, -1, previous_decided_at) if previous_decided_at else {},
+            decision_stats("Rejected", animal_type),
+        ))
+        self._notify_applicants([(adoption_id, "Rejected")])
+        record_changes(self.session, [(ADOPTION, adoption_id, REJECTED)]
+                       + [(ANIMAL, animal_id, UPDATED) for animal_id in released])
         self.session.commit()
         self.session.refresh(adoption)
-        return adoption
\ No newline at end of file
+        return adoption
+
+    def review_adoptions(self, decisions: Sequence[AdoptionReviewItem]) -> AdoptionBatchReviewResult:
+        """
+        Approve and reject many pending applications in one transaction.
+
+        The work is a fixed number of set-based statements whatever the batch
+        size: one read of the applications, then one UPDATE each to approve,
+        reject, reserve and release, one upsert each for the counters and the
+        daily statistics, one INSERT queueing the applicant notifications and
+        one recording the change events. Approving an application rejects the other pending
+        applications for its animal. Decisions that cannot apply are reported
+        per item instead of failing the batch.
+        """
+        repeated = sorted(adoption_id for adoption_id, count in Counter(
+            decision.adoption_id for decision in decisions
+        ).items() if count > 1)
+        if repeated:
+            raise HTTPException(status_code=400, detail=f"Adoption applications listed more than once: {repeated}")
+
+        other = aliased(Adoption)
+        animal_taken = select(other.id).where(other.animal_id == Adoption.animal_id, other.status == "Approved").exists()
+        snapshot = {
+            row.id: row for row in self.session.execute(
+                select(Adoption.id, Adoption.animal_id, Adoption.status, animal_taken.label("animal_taken"))
+                .where(Adoption.id.in_([decision.adoption_id for decision in decisions]))
+            )
+        }
+
+        outcomes: Dict[int, AdoptionReviewOutcome] = {}
+        to_approve: Dict[int, int] = {}  # animal_id -> adoption_id
+        to_reject: List[int] = []
+        for decision in decisions:
+            row = snapshot.get(decision.adoption_id)
+            outcome = AdoptionReviewOutcome(adoption_id=decision.adoption_id, decision=decision.decision, outcome="conflict")
+            outcomes[decision.adoption_id] = outcome
+            if row is None:
+                outcome.outcome = "not_found"
+                outcome.detail = f"Adoption application with ID {decision.adoption_id} not found"
+            elif row.status != "Pending":
+                outcome.outcome, outcome.status = "skipped", row.status
+                outcome.detail = f"Adoption application with ID {row.id} is {row.status}, not Pending"
+            elif decision.decision is ReviewDecision.REJECT:
+                to_reject.append(row.id)
+            elif row.animal_taken:
+                outcome.detail = f"Animal with ID {row.animal_id} is already adopted"
+            elif row.animal_id in to_approve:
+                outcome.detail = f"Application {to_approve[row.animal_id]} for animal {row.animal_id} is approved in this batch"
+            else:
+                to_approve[row.animal_id] = row.id
+
+        approved: List[Tuple[int, int, str]] = []
+        if to_approve:
+            try:
+                approved = self.session.execute(
+                    update(Adoption)
+                    .where(Adoption.id.in_(to_approve.values()), Adoption.status == "Pending")
+                    .values(status="Approved", decided_at=datetime.utcnow(), version=Adoption.version + 1)
+                    .returning(Adoption.id, Adoption.animal_id, _ANIMAL_TYPE)
+                ).all()
+            except IntegrityError:
+                # Another request approved an application for one of these animals meanwhile
+                self.session.rollback()
+                raise HTTPException(status_code=409, detail="Adoption applications were changed by another request; retry")
+
+        approved_animals = {animal_id for _, animal_id, _ in approved}
+        rejected = self._reject_pending(to_reject, approved_animals)
+        adopted = self._reserve_animals(approved_animals)
+        released = self._release_animals({animal_id for _, animal_id, _ in rejected} - approved_animals)
+        self.counters.increment(merge_counts(
+            status_change_counts("Pending", "Approved", len(approved)),
+            status_change_counts("Pending", "Rejected", len(rejected)),
+            adopted_counts(len(adopted) - len(released)),
+        ))
+        self.daily_stats.increment(merge_stats(
+            *(decision_stats("Approved", animal_type) for _, _, animal_type in approved),
+            *(decision_stats("Rejected", animal_type) for _, _, animal_type in rejected),
+        ))
+        self._notify_applicants(
+            [(adoption_id, "Approved") for adoption_id, _, _ in approved]
+            + [(adoption_id, "Rejected") for adoption_id, _, _ in rejected]
+        )
+        record_changes(
+            self.session,
+            [(ADOPTION, adoption_id, APPROVED) for adoption_id, _, _ in approved]
+            + [(ADOPTION, adoption_id, REJECTED) for adoption_id, _, _ in rejected]
+            + [(ANIMAL, animal_id, ADOPTED) for animal_id in sorted(adopted)]
+            + [(ANIMAL, animal_id, UPDATED) for animal_id in sorted(released)],
+        )
+        self.session.commit()
+
+        for adoption_id, _, _ in approved:
+            outcomes[adoption_id].outcome, outcomes[adoption_id].status = "approved", "Approved"
+        explicit = set(to_reject)
+        auto_rejected = []
+        for adoption_id, _, _ in rejected:
+            if adoption_id in explicit:
+                outcomes[adoption_id].outcome, outcomes[adoption_id].status = "rejected", "Rejected"
+            else:
+                auto_rejected.append(adoption_id)
+                if adoption_id in outcomes:
+                    outcomes[adoption_id].status = "Rejected"
+        for outcome in outcomes.values():
+            if outcome.outcome == "conflict" and outcome.detail is None:
+                outcome.detail = f"Adoption application with ID {outcome.adoption_id} was changed by another request"
+
+        return AdoptionBatchReviewResult(items=list(outcomes.values()), auto_rejected=sorted(auto_rejected))
+
+
+class AsyncAdoptionService(AsyncServiceAdapter):
+    """AdoptionService for `async def` routes using an AsyncSession"""
+    service_class = AdoptionService
+
+    async def create_adoption(self, adoption: AdoptionCreate, idempotency_key: Optional[str] = None) -> Adoption:
+        return await self._call("create_adoption", adoption, idempotency_key)
+
+    async def get_adoption(self, adoption_id: int) -> Adoption:
+        return await self._call("get_adoption", adoption_id)
+
+    async def get_cached_adoption(self, adoption_id: int) -> Adoption:
+        return await self._call("get_cached_adoption", adoption_id)
+
+    async def get_adoptions(self, skip: int = 0, limit: int = 100, columns: Optional[Sequence[str]] = None) -> List[Adoption]:
+        return await self._call("get_adoptions", skip, limit, columns)
+
+    async def get_adoptions_page(self, cursor: Optional[str] = None, limit: int = 100,
+                                 columns: Optional[Sequence[str]] = None) -> Tuple[List[Adoption], Optional[str]]:
+        return await self._call("get_adoptions_page", cursor, limit, columns)
+
+    async def get_adoptions_by_animal(self, animal_id: int, columns: Optional[Sequence[str]] = None) -> List[Adoption]:
+        return await self._call("get_adoptions_by_animal", animal_id, columns)
+
+    async def get_adoptions_by_status(self, status: str, columns: Optional[Sequence[str]] = None) -> List[Adoption]:
+        return await self._call("get_adoptions_by_status", status, columns)
+
+    async def update_adoption(self, adoption_id: int, adoption_update: AdoptionUpdate,
+                              expected_version: Optional[int] = None) -> Adoption:
+        return await self._call("update_adoption", adoption_id, adoption_update, expected_version)
+
+    async def delete_adoption(self, adoption_id: int) -> None:
+        return await self._call("delete_adoption", adoption_id)
+
+    async def approve_adoption(self, adoption_id: int) -> Adoption:
+        return await self._call("approve_adoption", adoption_id)
+
+    async def reject_adoption(self, adoption_id: int) -> Adoption:
+        return await self._call("reject_adoption", adoption_id)
+
+    async def review_adoptions(self, decisions: Sequence[AdoptionReviewItem]) -> AdoptionBatchReviewResult:
+        return await self._call("review_adoptions", decisions)
@@ -1,13 +1,30 @@
-from sqlmodel import Session, select
-from typing import List, Optional
+from sqlmodel import Session, select, insert
+from datetime import datetime
+from typing import Any, Iterator, List, Mapping, Optional, Sequence, Tuple
 from fastapi import HTTPException
 
+from app.schemas.adoption import Adoption
 from app.schemas.animal import Animal, AnimalCreate, AnimalUpdate
+from app.schemas.change_event import ChangeEvent
+from app.db.search import apply_text_search
+from app.services.async_adapter import AsyncServiceAdapter
+from app.services.change_feed import ADOPTED, ANIMAL, CREATED, DELETED, UPDATED, record_change, record_changes
+from app.services.concurrency import check_version, commit_versioned
+from app.services.counter_service import CounterService, animal_counts, merge_counts
+from app.services.daily_stat_service import DailyStatService, application_stats, intake_stats, merge_stats
+from app.services.entity_cache import animal_cache
+from app.services.image_storage import IMAGE_RELEASE_GRACE_SECONDS
+from app.services.job_queue import enqueue, enqueue_many
+from app.services.jobs import GENERATE_IMAGE_VARIANTS, RELEASE_IMAGE
+from app.services.pagination import apply_keyset, page_size, split_page
+from app.services.projection import select_columns
 
 
 class AnimalService:
     def __init__(self, session: Session):
         self.session = session
+        self.counters = CounterService(session)
+        self.daily_stats = DailyStatService(session)
 
     def create_animal(self, animal: AnimalCreate) -> Animal:
         """Create a new animal record"""
@@ -18,10 +35,37 @@ class AnimalService:
         db_animal = Animal(**animal_data)
         
         self.session.add(db_animal)
+        self.session.flush()
+        self.counters.increment(animal_counts(db_animal))
+        self.daily_stats.increment(intake_stats(db_animal))
+        record_change(self.session, ANIMAL, db_animal.id, CREATED)
+        # Resized variants are produced in the background once the record is committed
+        if db_animal.image_path:
+            enqueue(self.session, GENERATE_IMAGE_VARIANTS, {"image_path": db_animal.image_path})
         self.session.commit()
         self.session.refresh(db_animal)
         return db_animal
 
+    def create_animals_bulk(self, animals: List[AnimalCreate]) -> int:
+        """Insert many animals with one multi-row INSERT and a single commit"""
+        if not animals:
+            return 0
+        
+        # Build full rows, including defaults such as created_at, without per-row ORM state
+        rows = [
+            Animal.model_validate(animal.model_dump()).model_dump(exclude={"id"})
+            for animal in animals
+        ]
+        animal_ids = self.session.execute(insert(Animal).returning(Animal.id), rows).scalars().all()
+        inserted = [Animal.model_construct(**row) for row in rows]
+        self.counters.increment(merge_counts(*(animal_counts(animal) for animal in inserted)))
+        self.daily_stats.increment(merge_stats(*(intake_stats(animal) for animal in inserted)))
+        image_paths = sorted({row["image_path"] for row in rows if row["image_path"]})
+        enqueue_many(self.session, GENERATE_IMAGE_VARIANTS, [{"image_path": path} for path in image_paths])
+        record_changes(self.session, [(ANIMAL, animal_id, CREATED) for animal_id in animal_ids])
+        self.session.commit()
+        return len(rows)
+
     def get_animal(self, animal_id: int) -> Animal:
         """Get a single animal by ID"""
         animal = self.session.get(Animal, animal_id)
@@ -29,59 +73,205 @@ class AnimalService:
             raise HTTPException(status_code=404, detail=f"Animal with ID {animal_id} not found")
         return animal
 
-    def get_animals(self, skip: int = 0, limit: int = 100) -> List[Animal]:
-        """Get multiple animals with pagination"""
+    def get_cached_animal(self, animal_id: int) -> Animal:
+        """
+        Get a single animal by ID through the entity cache.
+
+        Returns a detached copy, so it suits reads only; changes go through
+        get_animal, which checks against the current row.
+        """
+        values = animal_cache.load(animal_id, lambda: self.get_animal(animal_id).model_dump())
+        return Animal.model_construct(**values)
+
+    def get_animal_validators(self, animal_id: int) -> Tuple[int, datetime]:
+        """Get an animal's (version, updated_at) for revalidation, without loading the row"""
+        validators = self.session.exec(
+            select(Animal.version, Animal.updated_at).where(Animal.id == animal_id)
+        ).first()
+        if validators is None:
+            raise HTTPException(status_code=404, detail=f"Animal with ID {animal_id} not found")
+        return validators
+
+    def get_animals_watermark(self) -> Tuple[Optional[int], Optional[datetime]]:
+        """
+        Get (id, time) of the latest change event, which moves whenever any animal list could change.
+
+        Every write to animals records a change event in its own transaction,
+        so this one primary-key lookup stands in for aggregating the animal
+        table. It also moves on changes outside a given list's filters; those
+        lists just revalidate once more than strictly needed.
+        """
+        latest = self.session.exec(
+            select(ChangeEvent.id, ChangeEvent.created_at).order_by(ChangeEvent.id.desc()).limit(1)
+        ).first()
+        return tuple(latest) if latest is not None else (None, None)
+
+    def get_animals(self, skip: int = 0, limit: int = 100, columns: Optional[Sequence[str]] = None) -> List[Animal]:
+        """Get multiple animals with pagination, loading only the given columns if any"""
+        limit = page_size(limit)
         animals = self.session.exec(
-            select(Animal).offset(skip).limit(limit)
+            select_columns(Animal, columns).offset(skip).limit(limit)
         ).all()
         return animals
 
-    def update_animal(self, animal_id: int, animal_update: AnimalUpdate) -> Animal:
-        """Update an existing animal"""
+    def get_animals_page(self, cursor: Optional[str] = None, limit: int = 100,
+                         columns: Optional[Sequence[str]] = None) -> Tuple[List[Animal], Optional[str]]:
+        """Get a page of animals after the given cursor, plus the cursor for the next page"""
+        limit = page_size(limit)
+        animals = self.session.exec(
+            apply_keyset(select_columns(Animal, columns), Animal, cursor, limit)
+        ).all()
+        return split_page(animals, limit)
+
+    def stream_animals(self, animal_type: Optional[str] = None, is_adopted: Optional[bool] = None,
+                       batch_size: int = 1000) -> Iterator[Mapping[str, Any]]:
+        """Stream every matching animal row from a server-side cursor, batch_size rows per fetch"""
+        query = select(*Animal.__table__.columns).order_by(Animal.id)
+        if animal_type:
+            query = query.where(Animal.type == animal_type)
+        if is_adopted is not None:
+            query = query.where(Animal.is_adopted == is_adopted)
+        
+        result = self.session.execute(query.execution_options(yield_per=batch_size))
+        for row in result:
+            yield row._mapping
+
+    def update_animal(self, animal_id: int, animal_update: AnimalUpdate,
+                      expected_version: Optional[int] = None) -> Animal:
+        """Update an existing animal, optionally only if it is still at expected_version"""
         db_animal = self.get_animal(animal_id)
+        check_version(f"Animal with ID {animal_id}", db_animal.version, expected_version)
+        previous_counts = animal_counts(db_animal, -1)
+        previous_stats = intake_stats(db_animal, -1)
+        previous_image_path = db_animal.image_path
+        previous_type = db_animal.type
+        was_adopted = db_animal.is_adopted
         
         update_data = animal_update.model_dump(exclude_unset=True)
+        applications = []
+        if update_data.get("type", previous_type) != previous_type:
+            # Read before the changes below, which a query would otherwise flush early
+            applications = self.session.exec(
+                select(Adoption.created_at, Adoption.status, Adoption.decided_at).where(Adoption.animal_id == animal_id)
+            ).all()
         for key, value in update_data.items():
             setattr(db_animal, key, value)
             
         # Always update the updated_at timestamp when changes are made
-        from datetime import datetime
         db_animal.updated_at = datetime.utcnow()
         
         self.session.add(db_animal)
-        self.session.commit()
+        self.counters.increment(merge_counts(previous_counts, animal_counts(db_animal)))
+        # Statistics are attributed to the animal's current type, so a change of
+        # type moves its intake and all of its applications, as a backfill would
+        self.daily_stats.increment(merge_stats(
+            previous_stats, intake_stats(db_animal),
+            *(application_stats(application, previous_type, -1) for application in applications),
+            *(application_stats(application, db_animal.type) for application in applications),
+        ))
+        if previous_image_path != db_animal.image_path:
+            if db_animal.image_path:
+                enqueue(self.session, GENERATE_IMAGE_VARIANTS, {"image_path": db_animal.image_path})
+            self._release_image_later(previous_image_path)
+        record_change(self.session, ANIMAL, animal_id, ADOPTED if db_animal.is_adopted and not was_adopted else UPDATED)
+        commit_versioned(self.session, f"Animal with ID {animal_id}", expected_version)
         self.session.refresh(db_animal)
         return db_animal
 
     def delete_animal(self, animal_id: int) -> None:
         """Delete an animal"""
         animal = self.get_animal(animal_id)
+        image_path = animal.image_path
         self.session.delete(animal)
-        self.session.commit()
+        self.counters.increment(animal_counts(animal, -1))
+        self.daily_stats.increment(intake_stats(animal, -1))
+        self._release_image_later(image_path)
+        record_change(self.session, ANIMAL, animal_id, DELETED)
+        commit_versioned(self.session, f"Animal with ID {animal_id}")
+
+    def _release_image_later(self, image_path: Optional[str]) -> None:
+        """Queue removal of an image that may have lost its last reference"""
+        if image_path:
+            # Waiting out the grace period lets a concurrent upload of the same content claim it first
+            enqueue(self.session, RELEASE_IMAGE, {"image_path": image_path}, delay_seconds=IMAGE_RELEASE_GRACE_SECONDS)
         
     def search_animals(self, name: Optional[str] = None, animal_type: Optional[str] = None, 
-                       breed: Optional[str] = None, is_adopted: Optional[bool] = None) -> List[Animal]:
-        """Search animals by various criteria"""
-        query = select(Animal)
+                       breed: Optional[str] = None, is_adopted: Optional[bool] = None,
+                       skip: int = 0, limit: int = 100, q: Optional[str] = None,
+                       columns: Optional[Sequence[str]] = None) -> List[Animal]:
+        """Search animals by various criteria, best text matches first"""
+        query = select_columns(Animal, columns)
         
-        if name:
-            query = query.where(Animal.name.contains(name))
         if animal_type:
             query = query.where(Animal.type == animal_type)
-        if breed:
-            query = query.where(Animal.breed.contains(breed))
         if is_adopted is not None:  # Checking None specifically because it's a boolean
             query = query.where(Animal.is_adopted == is_adopted)
+        
+        if name or breed or q:
+            dialect = self.session.get_bind().dialect.name
+            query = apply_text_search(query, dialect, name=name, breed=breed, q=q)
+        else:
+            query = query.order_by(Animal.created_at, Animal.id)
             
-        return self.session.exec(query).all()
+        limit = page_size(limit)
+        return self.session.exec(query.offset(skip).limit(limit)).all()
         
     def mark_as_adopted(self, animal_id: int) -> Animal:
         """Mark an animal as adopted"""
         animal = self.get_animal(animal_id)
+        previous_counts = animal_counts(animal, -1)
         animal.is_adopted = True
-        from datetime import datetime
         animal.updated_at = datetime.utcnow()
         self.session.add(animal)
-        self.session.commit()
+        self.counters.increment(merge_counts(previous_counts, animal_counts(animal)))
+        record_change(self.session, ANIMAL, animal_id, ADOPTED)
+        commit_versioned(self.session, f"Animal with ID {animal_id}")
         self.session.refresh(animal)
-        return animal
\ No newline at end of file
+        return animal
+
+
+class AsyncAnimalService(AsyncServiceAdapter):
+    """AnimalService for `async def` routes using an AsyncSession"""
+    service_class = AnimalService
+
+    async def create_animal(self, animal: AnimalCreate) -> Animal:
+        return await self._call("create_animal", animal)
+
+    async def create_animals_bulk(self, animals: List[AnimalCreate]) -> int:
+        return await self._call("create_animals_bulk", animals)
+
+    async def get_animal(self, animal_id: int) -> Animal:
+        return await self._call("get_animal", animal_id)
+
+    async def get_cached_animal(self, animal_id: int) -> Animal:
+        return await self._call("get_cached_animal", animal_id)
+
+    async def get_animal_validators(self, animal_id: int) -> Tuple[int, datetime]:
+        return await self._call("get_animal_validators", animal_id)
+
+    async def get_animals_watermark(self) -> Tuple[Optional[int], Optional[datetime]]:
+        return await self._call("get_animals_watermark")
+
+    async def get_animals(self, skip: int = 0, limit: int = 100, columns: Optional[Sequence[str]] = None) -> List[Animal]:
+        return await self._call("get_animals", skip, limit, columns)
+
+    async def get_animals_page(self, cursor: Optional[str] = None, limit: int = 100,
+                               columns: Optional[Sequence[str]] = None) -> Tuple[List[Animal], Optional[str]]:
+        return await self._call("get_animals_page", cursor, limit, columns)
+
+    async def update_animal(self, animal_id: int, animal_update: AnimalUpdate,
+                            expected_version: Optional[int] = None) -> Animal:
+        return await self._call("update_animal", animal_id, animal_update, expected_version)
+
+    async def delete_animal(self, animal_id: int) -> None:
+        return await self._call("delete_animal", animal_id)
+
+    async def search_animals(self, name: Optional[str] = None, animal_type: Optional[str] = None,
+                             breed: Optional[str] = None, is_adopted: Optional[bool] = None,
+                             skip: int = 0, limit: int = 100, q: Optional[str] = None,
+                             columns: Optional[Sequence[str]] = None) -> List[Animal]:
+        return await self._call("search_animals", name, animal_type, breed, is_adopted, skip, limit, q, columns)
+
+    async def mark_as_adopted(self, animal_id: int) -> Animal:
+        return await self._call("mark_as_adopted", animal_id)
+
@@ -0,0 +1,22 @@
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Any
+
+
+class AsyncServiceAdapter:
+    """
+    Run a synchronous service against an AsyncSession.
+
+    Each call goes through AsyncSession.run_sync, so the service logic is shared
+    with the sync path while every query is awaited on the async driver instead
+    of blocking the event loop.
+    """
+    service_class: Any = None
+
+    def __init__(self, session: AsyncSession, *service_args: Any):
+        self.session = session
+        self.service_args = service_args
+
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        return await self.session.run_sync(
+            lambda session: getattr(self.service_class(session, *self.service_args), method)(*args, **kwargs)
+        )
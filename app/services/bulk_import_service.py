@@ -0,0 +1,205 @@
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from zipfile import BadZipFile, ZipFile
+import anyio
+import codecs
+import csv
+import json
+import os
+
+from app.schemas.animal import AnimalCreate, BulkImportError, BulkImportResult
+from app.services.animal_service import AsyncAnimalService
+from app.services.image_storage import save_image_file
+
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", 1000))
+BULK_IMPORT_MAX_BATCH_SIZE = 10000
+BULK_IMPORT_MAX_BYTES = int(os.getenv("BULK_IMPORT_MAX_BYTES", 1024 * 1024 * 1024))
+BULK_IMPORT_FORMATS = ("csv", "ndjson")
+# Only the first errors are reported in full so the response stays bounded
+MAX_REPORTED_ERRORS = 1000
+
+# Row values that mean "not provided"
+_BLANK = ("", None)
+
+
+def detect_format(content_type: Optional[str], filename: Optional[str] = None) -> Optional[str]:
+    """Work out whether a body is CSV or NDJSON from its content type or file name"""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        return "ndjson"
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return None
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines without holding more than one chunk"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Parse a streamed CSV or NDJSON body into rows as they arrive.
+
+    Yields (row_number, data, error) where exactly one of data and error is
+    set. CSV records may span lines inside quoted fields; a record is complete
+    once it holds an even number of quote characters.
+    """
+    row_number = 0
+    if fmt == "ndjson":
+        async for line in _iter_lines(chunks):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield row_number, None, f"Invalid JSON: {exc.msg}"
+                continue
+            if not isinstance(data, dict):
+                yield row_number, None, "Each line must be a JSON object"
+                continue
+            yield row_number, data, None
+        return
+
+    header: Optional[List[str]] = None
+    record = ""
+    async for line in _iter_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record.rstrip("\r"), ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row_number, dict(zip(header, values)), None
+    if record:
+        yield row_number + 1, None, "Unterminated quoted field"
+
+
+def _error_messages(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors(include_url=False)
+    ]
+
+
+class AnimalBulkImporter:
+    """
+    Validate streamed rows against AnimalCreate and insert them in batches.
+
+    Invalid rows are skipped and reported; valid rows are inserted with one
+    multi-row INSERT and one commit per batch. Rows may name an image in the
+    accompanying zip archive through an `image` column.
+    """
+    def __init__(self, service: AsyncAnimalService, batch_size: int = BULK_IMPORT_BATCH_SIZE,
+                 images: Optional[ZipFile] = None):
+        self.service = service
+        self.batch_size = max(1, min(batch_size, BULK_IMPORT_MAX_BATCH_SIZE))
+        self.images = images
+        self.image_index = {}
+        if images is not None:
+            self.image_index = {
+                os.path.basename(info.filename): info for info in images.infolist() if not info.is_dir()
+            }
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[BulkImportError] = []
+
+    async def run(self, rows: AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]) -> BulkImportResult:
+        batch: List[Tuple[int, AnimalCreate, Optional[str]]] = []
+        async for row_number, data, error in rows:
+            if error is not None:
+                self._fail(row_number, [error])
+                continue
+            try:
+                animal, image_name = self._validate(data)
+            except ValidationError as exc:
+                self._fail(row_number, _error_messages(exc))
+                continue
+            batch.append((row_number, animal, image_name))
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        await self._flush(batch)
+
+        return BulkImportResult(
+            inserted=self.inserted,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors),
+        )
+
+    def _fail(self, row_number: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(BulkImportError(row=row_number, errors=messages))
+
+    def _validate(self, data: Dict) -> Tuple[AnimalCreate, Optional[str]]:
+        cleaned = {
+            key.strip(): (value.strip() if isinstance(value, str) else value)
+            for key, value in data.items() if key
+        }
+        image_name = cleaned.pop("image", None) or None
+        # Stored paths are only ever produced by the server
+        cleaned.pop("image_path", None)
+        cleaned = {key: value for key, value in cleaned.items() if value not in _BLANK}
+        return AnimalCreate(**cleaned), image_name
+
+    def _store_images(self, batch: List[Tuple[int, AnimalCreate, Optional[str]]]) -> Dict[int, str]:
+        """Store the batch's images from the archive; runs in a worker thread"""
+        failures = {}
+        for row_number, animal, image_name in batch:
+            if not image_name:
+                continue
+            info = self.image_index.get(os.path.basename(image_name))
+            if info is None:
+                failures[row_number] = f"image: {image_name} not found in the images archive"
+                continue
+            try:
+                with self.images.open(info) as member:
+                    animal.image_path = save_image_file(member)
+            except (ValueError, BadZipFile) as exc:
+                failures[row_number] = f"image: {exc}"
+        return failures
+
+    async def _flush(self, batch: List[Tuple[int, AnimalCreate, Optional[str]]]) -> None:
+        if not batch:
+            return
+
+        if any(image_name for _, _, image_name in batch):
+            failures = await anyio.to_thread.run_sync(self._store_images, batch)
+            for row_number, message in failures.items():
+                self._fail(row_number, [message])
+            batch = [row for row in batch if row[0] not in failures]
+
+        animals = [animal for _, animal, _ in batch]
+        try:
+            self.inserted += await self.service.create_animals_bulk(animals)
+        except SQLAlchemyError as exc:
+            await self.service.session.rollback()
+            for row_number, _, _ in batch:
+                self._fail(row_number, [f"database: {exc.__class__.__name__}"])
+            return
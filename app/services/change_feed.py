@@ -0,0 +1,465 @@
+from fastapi import HTTPException
+from sqlalchemy import event, func, insert, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, delete, select
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Collection, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import anyio
+import asyncio
+import logging
+import orjson
+import os
+import select as io_select
+import threading
+import time
+
+from app.schemas.change_event import ChangeEvent
+from app.services.metrics import CHANGE_FEED_EVENTS, CHANGE_FEED_OVERFLOWS, CHANGE_FEED_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# How workers learn about each other's commits: postgres (LISTEN/NOTIFY), memory (this process only,
+# other processes are picked up by polling) or auto, which uses postgres on a PostgreSQL database
+CHANGE_FEED_BROKER = os.getenv("CHANGE_FEED_BROKER", "auto")
+CHANGE_FEED_CHANNEL = "change_events"
+# The table is read this often even without a notification, as a safety net
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", 5))
+# Events buffered per client; a client that falls further behind catches up from the table instead
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", 256))
+CHANGE_FEED_MAX_SUBSCRIBERS = int(os.getenv("CHANGE_FEED_MAX_SUBSCRIBERS", 1000))
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", 15))
+# Streams are closed after this long and the client reconnects with Last-Event-ID,
+# which spreads long-lived connections across workers and lets deploys drain
+CHANGE_FEED_MAX_STREAM_SECONDS = float(os.getenv("CHANGE_FEED_MAX_STREAM_SECONDS", 300))
+CHANGE_FEED_RETRY_MILLISECONDS = 3000
+CHANGE_EVENT_RETENTION_HOURS = int(os.getenv("CHANGE_EVENT_RETENTION_HOURS", 24))
+
+ANIMAL = "animal"
+ADOPTION = "adoption"
+
+CREATED = "created"
+UPDATED = "updated"
+ADOPTED = "adopted"
+DELETED = "deleted"
+APPROVED = "approved"
+REJECTED = "rejected"
+
+_BATCH_SIZE = 500
+# Ids skipped by the feed may belong to transactions that commit late; they are looked for this long
+_GAP_SECONDS = 30
+_MAX_GAPS = 1000
+_RECENT_IDS = 2048
+_PRUNE_INTERVAL_SECONDS = 3600
+
+ChangeListener = Callable[[List[Tuple[str, int]]], None]
+_listeners: List[ChangeListener] = []
+
+
+class FeedEvent(NamedTuple):
+    """A change event as delivered to subscribers"""
+    id: int
+    entity: str
+    entity_id: int
+    action: str
+    created_at: datetime
+
+
+def record_change(session: Session, entity: str, entity_id: int, action: str) -> None:
+    """Record one change event as part of the caller's transaction"""
+    record_changes(session, [(entity, entity_id, action)])
+
+
+def record_changes(session: Session, changes: Iterable[Tuple[str, int, str]]) -> None:
+    """
+    Record (entity, entity_id, action) change events with one INSERT in the caller's transaction.
+
+    Events are committed together with the change they describe, or not at
+    all, and are streamed to clients once that commit has happened.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "action": action, "created_at": now}
+        for entity, entity_id, action in changes
+    ]
+    if not rows:
+        return
+    session.execute(insert(ChangeEvent), rows)
+    if "recorded_changes" not in session.info and _uses_postgres_broker(session.get_bind()):
+        # Delivered to every listening worker when, and only if, the transaction commits
+        session.execute(text("SELECT pg_notify(:channel, '')"), {"channel": CHANGE_FEED_CHANNEL})
+    session.info.setdefault("recorded_changes", []).extend((row["entity"], row["entity_id"]) for row in rows)
+
+
+def on_change(listener: ChangeListener) -> ChangeListener:
+    """
+    Call listener with the (entity, entity_id) pairs of every committed change.
+
+    Changes made in this process are passed right after their commit;
+    those of other workers once the feed has read them, so listeners may
+    see a change twice. Only changes committed while the feed runs are
+    seen from other workers. Usable as a decorator.
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def _notify_listeners(changes: List[Tuple[str, int]]) -> None:
+    for listener in _listeners:
+        try:
+            listener(changes)
+        except Exception:
+            # A failing listener must not fail the commit or stop the feed
+            logger.exception("Change listener %r failed", listener)
+
+
+def _uses_postgres_broker(engine: Engine) -> bool:
+    if CHANGE_FEED_BROKER == "auto":
+        return engine.dialect.name == "postgresql"
+    return CHANGE_FEED_BROKER == "postgres"
+
+
+def read_changes(engine: Engine, after_id: int, limit: int = _BATCH_SIZE,
+                 entities: Optional[Collection[str]] = None) -> List[FeedEvent]:
+    """Committed change events after an id, oldest first"""
+    query = select(*ChangeEvent.__table__.columns).where(ChangeEvent.id > after_id)
+    if entities:
+        query = query.where(ChangeEvent.entity.in_(entities))
+    with Session(engine) as session:
+        rows = session.execute(query.order_by(ChangeEvent.id).limit(limit)).all()
+    return [FeedEvent(*row) for row in rows]
+
+
+def resume_position(engine: Engine, last_event_id: int) -> Tuple[int, bool]:
+    """
+    Where a client reconnecting with Last-Event-ID picks up, and whether it must reload everything.
+
+    A client that was gone for longer than the retention period has missed
+    pruned events, so it is told to reset and continues from the oldest
+    event still kept.
+    """
+    with Session(engine) as session:
+        oldest, newest = session.exec(select(func.min(ChangeEvent.id), func.max(ChangeEvent.id))).one()
+    if newest is None:
+        return 0, last_event_id > 0
+    if last_event_id > newest:
+        # Ids from another database, such as before a restore
+        return newest, True
+    if oldest > last_event_id + 1:
+        return oldest - 1, True
+    return last_event_id, False
+
+
+def prune_change_events(session: Session, retention_hours: int = CHANGE_EVENT_RETENTION_HOURS) -> int:
+    """Delete change events older than the retention period; returns how many"""
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    # The newest event always stays: list ETags are built on it, and it keeps ids from being reused
+    latest = select(func.max(ChangeEvent.id)).scalar_subquery()
+    result = session.execute(delete(ChangeEvent).where(ChangeEvent.created_at < cutoff, ChangeEvent.id < latest))
+    session.commit()
+    return result.rowcount
+
+
+class Subscription:
+    """
+    One client's view of the feed: a bounded queue filled from the feed thread.
+
+    When the queue overflows it is emptied and the subscription marked
+    lagging; the client then reads what it missed from the table at its own
+    pace, so a slow client never holds more than queue_size events in memory
+    or slows anyone else down.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int, position: int = 0):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[FeedEvent]]" = asyncio.Queue(queue_size)
+        self.lagging = False
+        # The last event id the client has been sent, or skipped past
+        self.position = position
+
+    def offer(self, events: List[FeedEvent]) -> None:
+        """Queue events from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, events)
+        except RuntimeError:
+            # The client's event loop has already closed
+            pass
+
+    def _put(self, events: List[FeedEvent]) -> None:
+        if self.lagging:
+            return
+        for feed_event in events:
+            if self.queue.full():
+                self.fall_behind()
+                return
+            self.queue.put_nowait(feed_event)
+
+    def fall_behind(self) -> None:
+        """Drop the queued events; the client catches up from the table instead"""
+        self.lagging = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # Wakes the client if it is waiting on the queue
+        self.queue.put_nowait(None)
+        CHANGE_FEED_OVERFLOWS.inc()
+
+    def catch_up(self) -> None:
+        """Start queueing live events again; the caller then reads the gap from the table"""
+        self.lagging = False
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class ChangeFeed:
+    """
+    Publishes committed change events to this process's subscribers.
+
+    A single thread per process reads events past the last one it has seen
+    whenever it is woken: by a commit in this process, by a NOTIFY from
+    another worker when the Postgres broker is used, or by its poll timer.
+    Every worker reads the shared table, so each client sees every change
+    whichever worker it is connected to.
+    """
+    def __init__(self, engine: Engine, poll_seconds: float = CHANGE_FEED_POLL_SECONDS,
+                 queue_size: int = CHANGE_FEED_QUEUE_SIZE, max_subscribers: int = CHANGE_FEED_MAX_SUBSCRIBERS):
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.last_id = 0
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._woken = False
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Ids skipped so far, with the monotonic time until which they are looked for
+        self._gaps: Dict[int, float] = {}
+        self._next_prune = 0.0
+
+    def start(self) -> None:
+        with Session(self.engine) as session:
+            self.last_id = session.exec(select(func.max(ChangeEvent.id))).one() or 0
+        targets = [("change-feed", self._run)]
+        if _uses_postgres_broker(self.engine):
+            targets.append(("change-feed-listener", self._listen))
+        for name, target in targets:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        self.wake()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def wake(self) -> None:
+        """Have the feed read new events now instead of at its next poll"""
+        with self._wake:
+            self._woken = True
+            self._wake.notify()
+
+    def subscribe(self) -> Subscription:
+        """Register a client from its event loop; raises 503 when the worker is at capacity"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise HTTPException(status_code=503, detail="Too many change feed clients, try again later")
+            # Every event after last_id is published to the subscribers registered from here on
+            subscription = Subscription(asyncio.get_running_loop(), self.queue_size, self.last_id)
+            self._subscribers.add(subscription)
+        CHANGE_FEED_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers.discard(subscription)
+        CHANGE_FEED_SUBSCRIBERS.dec()
+
+    def poll(self) -> int:
+        """Publish the events committed since the last poll; returns how many"""
+        published = 0
+        while True:
+            now = time.monotonic()
+            self._gaps = {gap: until for gap, until in self._gaps.items() if until > now}
+            condition = ChangeEvent.id > self.last_id
+            if self._gaps:
+                condition = or_(condition, ChangeEvent.id.in_(list(self._gaps)))
+            with Session(self.engine) as session:
+                rows = session.execute(
+                    select(*ChangeEvent.__table__.columns).where(condition).order_by(ChangeEvent.id).limit(_BATCH_SIZE)
+                ).all()
+            events = [FeedEvent(*row) for row in rows]
+            for feed_event in events:
+                if self._gaps.pop(feed_event.id, None) is not None or feed_event.id <= self.last_id:
+                    continue
+                # A lower id may still commit after this one; sequences are not commit-ordered
+                for missing in range(self.last_id + 1, feed_event.id):
+                    if len(self._gaps) >= _MAX_GAPS:
+                        break
+                    self._gaps[missing] = now + _GAP_SECONDS
+                self.last_id = feed_event.id
+            if events:
+                _notify_listeners([(feed_event.entity, feed_event.entity_id) for feed_event in events])
+                with self._lock:
+                    subscribers = list(self._subscribers)
+                for subscription in subscribers:
+                    subscription.offer(events)
+                published += len(events)
+            if len(events) < _BATCH_SIZE:
+                return published
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.poll()
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + _PRUNE_INTERVAL_SECONDS
+                    with Session(self.engine) as session:
+                        prune_change_events(session)
+            except Exception:
+                # A database outage must not stop the feed
+                logger.exception("Change feed failed to read new events")
+            with self._wake:
+                if not self._woken and not self._stopping.is_set():
+                    self._wake.wait(self.poll_seconds)
+                self._woken = False
+
+    def _listen(self) -> None:
+        """Wake the feed on NOTIFY from any worker, holding one dedicated connection"""
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                driver_connection = connection.driver_connection
+                driver_connection.autocommit = True
+                with driver_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANGE_FEED_CHANNEL}")
+                # Events committed while the listener was down
+                self.wake()
+                while not self._stopping.is_set():
+                    if io_select.select([driver_connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    driver_connection.poll()
+                    if driver_connection.notifies:
+                        driver_connection.notifies.clear()
+                        self.wake()
+            except Exception:
+                logger.exception("Change feed lost its LISTEN connection; polling until it reconnects")
+                self._stopping.wait(self.poll_seconds)
+            finally:
+                if connection is not None:
+                    # A connection in LISTEN mode must not go back to the pool
+                    connection.invalidate()
+
+
+def format_event(feed_event: FeedEvent) -> str:
+    """A change event as an SSE message"""
+    data = orjson.dumps(feed_event._asdict()).decode()
+    return f"id: {feed_event.id}\ndata: {data}\n\n"
+
+
+async def stream_changes(feed: ChangeFeed, subscription: Subscription, last_event_id: Optional[int] = None,
+                         entities: Optional[Collection[str]] = None,
+                         heartbeat_seconds: float = CHANGE_FEED_HEARTBEAT_SECONDS,
+                         max_stream_seconds: float = CHANGE_FEED_MAX_STREAM_SECONDS) -> AsyncIterator[str]:
+    """
+    SSE messages for one client until it disconnects or the stream reaches its maximum age.
+
+    With a Last-Event-ID the client first catches up from the table, then
+    continues with live events. Events that arrive both ways are sent once;
+    a client whose position was pruned gets a `reset` event and should reload.
+    """
+    delivered: "OrderedDict[int, None]" = OrderedDict()
+
+    def deliver(feed_event: FeedEvent) -> Optional[str]:
+        subscription.position = max(subscription.position, feed_event.id)
+        if feed_event.id in delivered or (entities and feed_event.entity not in entities):
+            return None
+        delivered[feed_event.id] = None
+        while len(delivered) > _RECENT_IDS:
+            delivered.popitem(last=False)
+        CHANGE_FEED_EVENTS.inc()
+        return format_event(feed_event)
+
+    deadline = time.monotonic() + max_stream_seconds
+    try:
+        yield f"retry: {CHANGE_FEED_RETRY_MILLISECONDS}\n\n"
+        if last_event_id is not None:
+            position, reset = await anyio.to_thread.run_sync(resume_position, feed.engine, last_event_id)
+            if reset:
+                yield f"event: reset\ndata: {orjson.dumps({'last_event_id': position}).decode()}\n\n"
+            subscription.position = position
+            subscription.lagging = True
+
+        while True:
+            if subscription.lagging:
+                subscription.catch_up()
+                while True:
+                    events = await anyio.to_thread.run_sync(
+                        read_changes, feed.engine, subscription.position, _BATCH_SIZE, entities,
+                    )
+                    for feed_event in events:
+                        message = deliver(feed_event)
+                        if message is not None:
+                            yield message
+                    if len(events) < _BATCH_SIZE:
+                        break
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                feed_event = await asyncio.wait_for(subscription.queue.get(), min(heartbeat_seconds, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            # None only wakes the stream after an overflow
+            message = deliver(feed_event) if feed_event is not None else None
+            if message is not None:
+                yield message
+    finally:
+        feed.unsubscribe(subscription)
+
+
+_feed: Optional[ChangeFeed] = None
+
+
+def start_change_feed(engine: Engine) -> ChangeFeed:
+    global _feed
+    if _feed is None:
+        _feed = ChangeFeed(engine)
+        _feed.start()
+    return _feed
+
+
+def stop_change_feed() -> None:
+    global _feed
+    if _feed is not None:
+        _feed.stop()
+        _feed = None
+
+
+def get_change_feed() -> ChangeFeed:
+    """The running feed of this process; 503 before the application has started it"""
+    if _feed is None:
+        raise HTTPException(status_code=503, detail="The change feed is not running")
+    return _feed
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _wake_feed(session: OrmSession) -> None:
+    changes = session.info.pop("recorded_changes", None)
+    if changes:
+        _notify_listeners(changes)
+        if _feed is not None:
+            _feed.wake()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_changes(session: OrmSession) -> None:
+    session.info.pop("recorded_changes", None)
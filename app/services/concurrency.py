@@ -0,0 +1,44 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import Session
+from typing import Callable, Optional
+
+
+def check_version(resource: str, current: int, expected: Optional[int]) -> None:
+    """Reject a write made against a version of the resource that is no longer current"""
+    if expected is not None and current != expected:
+        raise HTTPException(
+            status_code=412,
+            detail=f"{resource} is at version {current}, not {expected}; fetch it again and retry",
+        )
+
+
+def commit_versioned(session: Session, resource: str, expected: Optional[int] = None) -> None:
+    """
+    Commit ORM changes to versioned rows, reporting a lost race as a conflict.
+
+    The ORM only updates rows still at the version it loaded, so a concurrent
+    writer makes the commit fail instead of being silently overwritten. That
+    is a failed precondition when the client named a version, 409 otherwise.
+    A write that breaks a unique constraint is a conflict as well.
+    """
+    _write_versioned(session.commit, session, resource, expected)
+
+
+def flush_versioned(session: Session, resource: str, expected: Optional[int] = None) -> None:
+    """Flush ORM changes to versioned rows mid-transaction, with the same errors as commit_versioned"""
+    _write_versioned(session.flush, session, resource, expected)
+
+
+def _write_versioned(write: Callable[[], None], session: Session, resource: str, expected: Optional[int]) -> None:
+    try:
+        write()
+    except StaleDataError:
+        session.rollback()
+        if expected is not None:
+            raise HTTPException(status_code=412, detail=f"{resource} changed since version {expected}; fetch it again and retry")
+        raise HTTPException(status_code=409, detail=f"{resource} was changed by another request; retry")
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail=f"{resource} conflicts with another record; fetch it again and retry")
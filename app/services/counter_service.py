@@ -0,0 +1,173 @@
+from sqlmodel import Session, select, func, delete
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from datetime import date, datetime
+from typing import Dict, Iterable, Tuple
+
+from app.schemas.animal import Animal
+from app.schemas.adoption import Adoption
+from app.schemas.counter import ShelterCounter
+
+# Counter keys. Keys ending in ":" are prefixes for one counter per value.
+ANIMALS_TOTAL = "animals.total"
+ANIMALS_ADOPTED = "animals.adopted"
+ANIMALS_BY_TYPE = "animals.type:"
+ANIMALS_BY_INTAKE_DAY = "animals.intake:"
+ADOPTIONS_TOTAL = "adoptions.total"
+ADOPTIONS_BY_STATUS = "adoptions.status:"
+
+_UPSERT_DIALECTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def prefix_range(prefix: str) -> Tuple[str, str]:
+    """Lower and upper key bounds that cover every counter under a prefix"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def merge_counts(*counts: Dict[str, int]) -> Dict[str, int]:
+    """Add several sets of counter deltas together"""
+    merged: Dict[str, int] = {}
+    for count in counts:
+        for key, value in count.items():
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def animal_counts(animal: Animal, sign: int = 1) -> Dict[str, int]:
+    """Counters an animal contributes to; pass sign=-1 to take them away"""
+    created_on = (animal.created_at or datetime.utcnow()).date()
+    return {
+        ANIMALS_TOTAL: sign,
+        ANIMALS_ADOPTED: sign if animal.is_adopted else 0,
+        ANIMALS_BY_TYPE + animal.type: sign,
+        ANIMALS_BY_INTAKE_DAY + created_on.isoformat(): sign,
+    }
+
+
+def adoption_counts(adoption: Adoption, sign: int = 1) -> Dict[str, int]:
+    """Counters an adoption application contributes to; pass sign=-1 to take them away"""
+    return {
+        ADOPTIONS_TOTAL: sign,
+        ADOPTIONS_BY_STATUS + adoption.status: sign,
+    }
+
+
+def adopted_counts(count: int = 1) -> Dict[str, int]:
+    """Counters that change when animals are marked adopted; pass a negative count when they are released"""
+    return {ANIMALS_ADOPTED: count}
+
+
+def status_change_counts(previous_status: str, status: str, count: int = 1) -> Dict[str, int]:
+    """Counters that change when adoption applications move between statuses"""
+    return merge_counts({ADOPTIONS_BY_STATUS + previous_status: -count}, {ADOPTIONS_BY_STATUS + status: count})
+
+
+class CounterService:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def increment(self, deltas: Dict[str, int]) -> None:
+        """
+        Apply counter deltas as part of the caller's transaction.
+
+        The caller commits, so counters change atomically with the rows they
+        describe. Keys are written in sorted order so concurrent writers take
+        row locks in the same order.
+        """
+        deltas = {key: value for key, value in sorted(deltas.items()) if value}
+        if not deltas:
+            return
+
+        insert = _UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        if insert is not None:
+            statement = insert(ShelterCounter).values(
+                [{"key": key, "value": value} for key, value in deltas.items()]
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=["key"],
+                set_={"value": ShelterCounter.value + statement.excluded.value},
+            )
+            self.session.execute(statement)
+            return
+
+        # Backends without an upsert statement fall back to read-modify-write
+        for key, value in deltas.items():
+            counter = self.session.get(ShelterCounter, key) or ShelterCounter(key=key)
+            counter.value += value
+            self.session.add(counter)
+
+    def get_values(self, keys: Iterable[str] = (), prefixes: Iterable[Tuple[str, str]] = ()) -> Dict[str, int]:
+        """Read counters by exact key or by (lower, upper) key range in one query"""
+        conditions = []
+        keys = list(keys)
+        if keys:
+            conditions.append(ShelterCounter.key.in_(keys))
+        for lower, upper in prefixes:
+            conditions.append((ShelterCounter.key >= lower) & (ShelterCounter.key < upper))
+
+        query = select(ShelterCounter.key, ShelterCounter.value)
+        if conditions:
+            query = query.where(or_(*conditions))
+        return {key: value for key, value in self.session.exec(query).all()}
+
+    def compute_from_tables(self) -> Dict[str, int]:
+        """Recompute every counter from the animal and adoption tables"""
+        expected: Dict[str, int] = {}
+
+        total_animals, adopted_animals = self.session.exec(
+            select(func.count(Animal.id), func.count(Animal.id).filter(Animal.is_adopted == True))
+        ).one()
+        expected[ANIMALS_TOTAL] = total_animals
+        expected[ANIMALS_ADOPTED] = adopted_animals
+
+        for animal_type, count in self.session.exec(
+            select(Animal.type, func.count(Animal.id)).group_by(Animal.type)
+        ).all():
+            expected[ANIMALS_BY_TYPE + animal_type] = count
+
+        intake_day = func.date(Animal.created_at)
+        for day, count in self.session.exec(
+            select(intake_day, func.count(Animal.id)).group_by(intake_day)
+        ).all():
+            day = day.isoformat() if isinstance(day, date) else str(day)
+            expected[ANIMALS_BY_INTAKE_DAY + day] = count
+
+        expected[ADOPTIONS_TOTAL] = self.session.exec(select(func.count(Adoption.id))).one()
+        for status, count in self.session.exec(
+            select(Adoption.status, func.count(Adoption.id)).group_by(Adoption.status)
+        ).all():
+            expected[ADOPTIONS_BY_STATUS + status] = count
+
+        return expected
+
+    def rebuild(self, dry_run: bool = False) -> Dict[str, Tuple[int, int]]:
+        """
+        Recompute all counters from scratch and replace the stored values.
+
+        Returns the drift that was found as {key: (stored, expected)}.
+        """
+        expected = self.compute_from_tables()
+        stored = self.get_values()
+
+        drift = {
+            key: (stored.get(key, 0), expected.get(key, 0))
+            for key in sorted(set(stored) | set(expected))
+            if stored.get(key, 0) != expected.get(key, 0)
+        }
+
+        if not dry_run:
+            self.session.execute(delete(ShelterCounter))
+            self.session.add_all(
+                ShelterCounter(key=key, value=value) for key, value in expected.items() if value
+            )
+            self.session.commit()
+        return drift
+
+
+def ensure_counters(engine: Engine) -> None:
+    """Populate the counters table on first start against an existing database"""
+    with Session(engine) as session:
+        if session.exec(select(ShelterCounter.key).limit(1)).first() is None:
+            CounterService(session).rebuild()
@@ -0,0 +1,188 @@
+from sqlmodel import Session, select, func, delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from app.schemas.adoption import Adoption
+from app.schemas.animal import Animal
+from app.schemas.daily_stat import DailyStat
+
+# Activity counted per day and animal type
+DAILY_METRICS = ("intakes", "applications", "approvals", "rejections")
+_DECISION_METRICS = {"Approved": "approvals", "Rejected": "rejections"}
+
+_UPSERT_DIALECTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+# {(day, animal_type): {metric: delta}}
+StatDeltas = Dict[Tuple[date, str], Dict[str, int]]
+
+
+def merge_stats(*stats: StatDeltas) -> StatDeltas:
+    """Add several sets of daily statistic deltas together"""
+    merged: StatDeltas = {}
+    for stat in stats:
+        for key, metrics in stat.items():
+            target = merged.setdefault(key, {})
+            for metric, value in metrics.items():
+                target[metric] = target.get(metric, 0) + value
+    return merged
+
+
+def intake_stats(animal: Animal, sign: int = 1) -> StatDeltas:
+    """Daily statistics an animal contributes to; pass sign=-1 to take them away"""
+    created_on = (animal.created_at or datetime.utcnow()).date()
+    return {(created_on, animal.type): {"intakes": sign}}
+
+
+def decision_stats(status: str, animal_type: str, count: int = 1, decided_at: Optional[datetime] = None) -> StatDeltas:
+    """Daily statistics that change when applications reach a status, today unless decided_at is given"""
+    metric = _DECISION_METRICS.get(status)
+    if metric is None:
+        return {}
+    return {((decided_at or datetime.utcnow()).date(), animal_type): {metric: count}}
+
+
+def application_stats(adoption: Adoption, animal_type: str, sign: int = 1) -> StatDeltas:
+    """Daily statistics an adoption application contributes to, including its decision if it has one"""
+    stats = {((adoption.created_at or datetime.utcnow()).date(), animal_type): {"applications": sign}}
+    if adoption.decided_at is not None:
+        stats = merge_stats(stats, decision_stats(adoption.status, animal_type, sign, adoption.decided_at))
+    return stats
+
+
+def _as_date(value) -> date:
+    # SQLite returns DATE() results as text
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+class DailyStatService:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def increment(self, deltas: StatDeltas) -> None:
+        """
+        Apply daily statistic deltas as part of the caller's transaction.
+
+        Like the shelter counters, rows change atomically with the animals and
+        applications they describe, and are written in key order so
+        concurrent writers lock them in the same order.
+        """
+        rows = [
+            {"day": day, "animal_type": animal_type, **{metric: metrics.get(metric, 0) for metric in DAILY_METRICS}}
+            for (day, animal_type), metrics in sorted(deltas.items())
+            if any(metrics.values())
+        ]
+        if not rows:
+            return
+
+        insert = _UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        if insert is not None:
+            statement = insert(DailyStat).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["day", "animal_type"],
+                set_={
+                    metric: getattr(DailyStat, metric) + getattr(statement.excluded, metric)
+                    for metric in DAILY_METRICS
+                },
+            )
+            self.session.execute(statement)
+            return
+
+        # Backends without an upsert statement fall back to read-modify-write
+        for row in rows:
+            stat = self.session.get(DailyStat, (row["day"], row["animal_type"])) or DailyStat(
+                day=row["day"], animal_type=row["animal_type"],
+            )
+            for metric in DAILY_METRICS:
+                setattr(stat, metric, getattr(stat, metric) + row[metric])
+            self.session.add(stat)
+
+    def compute_from_tables(self, start: Optional[date] = None, end: Optional[date] = None) -> StatDeltas:
+        """Recompute the daily statistics between two days, inclusive, from the animal and adoption tables"""
+        def in_range(column):
+            conditions = []
+            if start is not None:
+                conditions.append(column >= datetime.combine(start, datetime.min.time()))
+            if end is not None:
+                conditions.append(column < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+            return conditions
+
+        stats: StatDeltas = {}
+
+        def add(day, animal_type: str, **metrics: int) -> None:
+            target = stats.setdefault((_as_date(day), animal_type), {})
+            for metric, value in metrics.items():
+                target[metric] = target.get(metric, 0) + value
+
+        intake_day = func.date(Animal.created_at)
+        for day, animal_type, count in self.session.exec(
+            select(intake_day, Animal.type, func.count(Animal.id))
+            .where(*in_range(Animal.created_at))
+            .group_by(intake_day, Animal.type)
+        ).all():
+            add(day, animal_type, intakes=count)
+
+        application_day = func.date(Adoption.created_at)
+        for day, animal_type, count in self.session.exec(
+            select(application_day, Animal.type, func.count(Adoption.id))
+            .join(Animal, Animal.id == Adoption.animal_id)
+            .where(*in_range(Adoption.created_at))
+            .group_by(application_day, Animal.type)
+        ).all():
+            add(day, animal_type, applications=count)
+
+        decision_day = func.date(Adoption.decided_at)
+        for day, animal_type, approvals, rejections in self.session.exec(
+            select(
+                decision_day, Animal.type,
+                func.count(Adoption.id).filter(Adoption.status == "Approved"),
+                func.count(Adoption.id).filter(Adoption.status == "Rejected"),
+            )
+            .join(Animal, Animal.id == Adoption.animal_id)
+            .where(Adoption.decided_at.is_not(None), *in_range(Adoption.decided_at))
+            .group_by(decision_day, Animal.type)
+        ).all():
+            add(day, animal_type, approvals=approvals, rejections=rejections)
+
+        return stats
+
+    def backfill(self, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        """
+        Replace the daily statistics between two days, inclusive, with values recomputed from the tables.
+
+        History is attributed to each animal's current type. Returns the
+        number of rows written.
+        """
+        stats = {key: metrics for key, metrics in self.compute_from_tables(start, end).items() if any(metrics.values())}
+        statement = delete(DailyStat)
+        if start is not None:
+            statement = statement.where(DailyStat.day >= start)
+        if end is not None:
+            statement = statement.where(DailyStat.day <= end)
+        self.session.execute(statement)
+        self.session.add_all(
+            DailyStat(day=day, animal_type=animal_type, **metrics) for (day, animal_type), metrics in stats.items()
+        )
+        self.session.commit()
+        return len(stats)
+
+    def get_daily_totals(self, start: date, end: date, animal_type: Optional[str] = None) -> Dict[date, Dict[str, int]]:
+        """Metrics per day between two days, inclusive, summed over types unless one is given"""
+        query = select(DailyStat.day, *(func.sum(getattr(DailyStat, metric)) for metric in DAILY_METRICS)).where(
+            DailyStat.day >= start, DailyStat.day <= end,
+        )
+        if animal_type is not None:
+            query = query.where(DailyStat.animal_type == animal_type)
+        return {
+            _as_date(day): dict(zip(DAILY_METRICS, (int(value or 0) for value in values)))
+            for day, *values in self.session.exec(query.group_by(DailyStat.day)).all()
+        }
+
+
+def ensure_daily_stats(engine: Engine) -> None:
+    """Backfill the daily statistics on first start against an existing database"""
+    with Session(engine) as session:
+        if session.exec(select(DailyStat.day).limit(1)).first() is None:
+            DailyStatService(session).backfill()
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+import os
+import threading
+import time
+
+from app.db.database import READ_YOUR_WRITES_SECONDS, replicas
+from app.services.change_feed import ADOPTION, ANIMAL, on_change
+from app.services.metrics import ENTITY_CACHE_EVICTIONS, ENTITY_CACHE_INVALIDATIONS, ENTITY_CACHE_LOOKUPS
+
+# Entries per entity type; 0 disables the cache
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", 10000))
+# Upper bound on staleness should an invalidation ever be missed
+ENTITY_CACHE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", 60))
+
+# A load slower than this may refill an entry invalidated while it ran
+_MAX_LOAD_SECONDS = 30
+
+Snapshot = Dict[str, Any]
+
+
+class EntityCache:
+    """
+    Bounded LRU of row snapshots, each kept for at most ttl_seconds.
+
+    Snapshots are plain dicts of column values shared between threads, so
+    callers must not modify them. A load that started before the entry was
+    invalidated, or less than settle_seconds before, is not stored: it may
+    have read the row from before the change, possibly on a replica that has
+    not caught up yet.
+    """
+    def __init__(self, name: str, max_entries: int = ENTITY_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = ENTITY_CACHE_TTL_SECONDS, settle_seconds: float = 0.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.settle_seconds = settle_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Snapshot]]" = OrderedDict()
+        # Monotonic time of the latest invalidation of each recently changed key, oldest first
+        self._invalidated: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Snapshot]:
+        """The cached snapshot for a key, or None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        ENTITY_CACHE_LOOKUPS.labels(self.name, "hit" if entry is not None else "miss").inc()
+        return entry[1] if entry is not None else None
+
+    def load(self, key: Hashable, loader: Callable[[], Snapshot]) -> Snapshot:
+        """The cached snapshot for a key, calling loader and caching its result on a miss"""
+        if self.max_entries <= 0:
+            return loader()
+        snapshot = self.get(key)
+        if snapshot is None:
+            started = time.monotonic()
+            snapshot = loader()
+            self.put(key, snapshot, started)
+        return snapshot
+
+    def put(self, key: Hashable, snapshot: Snapshot, loaded_at: float) -> bool:
+        """Cache a snapshot read at loaded_at unless the key was invalidated since; returns whether it was"""
+        with self._lock:
+            invalidated = self._invalidated.get(key)
+            if invalidated is not None and invalidated >= loaded_at - self.settle_seconds:
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            ENTITY_CACHE_EVICTIONS.labels(self.name).inc(evicted)
+        return True
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Drop the snapshots of changed rows and refuse loads that may have read them before the change"""
+        now = time.monotonic()
+        count = 0
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._invalidated[key] = now
+                self._invalidated.move_to_end(key)
+                count += 1
+            horizon = now - self.settle_seconds - _MAX_LOAD_SECONDS
+            while self._invalidated and next(iter(self._invalidated.values())) < horizon:
+                self._invalidated.popitem(last=False)
+        ENTITY_CACHE_INVALIDATIONS.labels(self.name).inc(count)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._invalidated.clear()
+
+
+# Replicas may still return a row from before a change for as long as writers are pinned to the primary
+_SETTLE_SECONDS = READ_YOUR_WRITES_SECONDS if replicas else 0.0
+
+animal_cache = EntityCache(ANIMAL, settle_seconds=_SETTLE_SECONDS)
+adoption_cache = EntityCache(ADOPTION, settle_seconds=_SETTLE_SECONDS)
+ENTITY_CACHES = {ANIMAL: animal_cache, ADOPTION: adoption_cache}
+
+
+@on_change
+def _invalidate_changed(changes: Iterable[Tuple[str, int]]) -> None:
+    """Invalidate on every committed change: locally on commit, and in every worker through the change feed"""
+    keys: Dict[str, list] = {}
+    for entity, entity_id in changes:
+        keys.setdefault(entity, []).append(entity_id)
+    for entity, entity_ids in keys.items():
+        cache = ENTITY_CACHES.get(entity)
+        if cache is not None:
+            cache.invalidate(entity_ids)
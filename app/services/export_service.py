@@ -0,0 +1,49 @@
+from sqlmodel import SQLModel
+from typing import Any, Iterable, Iterator, Mapping, Type
+import csv
+import io
+import json
+import os
+
+# Media type of each export format
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Serialized rows are sent in chunks of roughly this many characters
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV cells are flat, so nested values are written as JSON"""
+    return json.dumps(value, separators=(",", ":")) if isinstance(value, (dict, list)) else value
+
+
+def serialize_rows(rows: Iterable[Mapping[str, Any]], read_model: Type[SQLModel], fmt: str) -> Iterator[str]:
+    """
+    Serialize database rows through a read schema as NDJSON or CSV text chunks.
+
+    Rows are consumed one at a time and written to a small buffer that is
+    flushed every EXPORT_CHUNK_SIZE characters, so memory use does not depend
+    on how many rows there are.
+    """
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        columns = list(read_model.model_fields) + list(read_model.model_computed_fields)
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+
+    for row in rows:
+        data = read_model.model_validate(dict(row)).model_dump(mode="json")
+        if writer is not None:
+            writer.writerow({key: _csv_value(value) for key, value in data.items()})
+        else:
+            buffer.write(json.dumps(data, separators=(",", ":")))
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
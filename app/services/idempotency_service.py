@@ -0,0 +1,64 @@
+from sqlmodel import Session, delete
+from datetime import datetime, timedelta
+from typing import Any, Mapping, Optional
+from fastapi import HTTPException
+import hashlib
+import json
+import os
+
+from app.schemas.idempotency import IdempotencyKey
+
+# A key can be replayed for this long; after that it may be reused for a new request
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
+
+def _expiry_cutoff(ttl_hours: int = IDEMPOTENCY_KEY_TTL_HOURS) -> datetime:
+    return datetime.utcnow() - timedelta(hours=ttl_hours)
+
+
+def prune_idempotency_keys(session: Session, ttl_hours: int = IDEMPOTENCY_KEY_TTL_HOURS) -> int:
+    """Delete keys that can no longer be replayed; returns how many"""
+    result = session.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < _expiry_cutoff(ttl_hours)))
+    session.commit()
+    return result.rowcount
+
+
+def request_fingerprint(payload: Mapping[str, Any]) -> str:
+    """Stable hash of a request body, so a reused key with a different body is caught"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Remember which resource each Idempotency-Key created.
+
+    The key row is inserted in the same transaction as the resource, so a
+    retry either finds the committed resource or, if the first attempt failed,
+    runs again from scratch. Concurrent requests with the same key collide on
+    the primary key instead of both creating a resource.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find(self, scope: str, key: str, fingerprint: str) -> Optional[IdempotencyKey]:
+        """The live record for a key, rejecting reuse of the key for a different request"""
+        record = self.session.get(IdempotencyKey, (scope, key))
+        if record is None:
+            return None
+        if record.created_at < _expiry_cutoff():
+            self.session.delete(record)
+            self.session.flush()
+            return None
+        if record.request_hash != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request body",
+            )
+        return record
+
+    def claim(self, scope: str, key: str, fingerprint: str) -> IdempotencyKey:
+        """Insert the key row; raises IntegrityError if another request holds the key"""
+        record = IdempotencyKey(scope=scope, key=key, request_hash=fingerprint)
+        self.session.add(record)
+        self.session.flush()
+        return record
@@ -0,0 +1,246 @@
+from fastapi import HTTPException, UploadFile
+from sqlmodel import Session, select, func, update
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+import anyio
+import hashlib
+import os
+import re
+import time
+
+from app.schemas.animal import Animal
+from app.services.change_feed import ANIMAL, UPDATED, record_changes
+from app.services.image_variants import remove_variants
+
+# Configuration for file uploads
+UPLOAD_DIRECTORY = Path("uploads/animals")
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", 10 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Recently written or re-uploaded files are never reclaimed, see release_image
+IMAGE_RELEASE_GRACE_SECONDS = int(os.getenv("IMAGE_RELEASE_GRACE_SECONDS", 300))
+
+# Magic bytes at the start of each accepted image format
+_IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+]
+
+_CONTENT_ADDRESSED_NAME = re.compile(r"[0-9a-f]{64}\.[a-z]+")
+
+
+def sniff_image_type(header: bytes) -> Optional[Tuple[str, str]]:
+    """Detect the image format from its leading bytes, returning (content_type, extension)"""
+    for signature, content_type, extension in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type, extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    return None
+
+
+def content_addressed_filename(digest: str, extension: str) -> str:
+    """Stored filename for an image with the given SHA-256 hex digest"""
+    return f"{digest}{extension}"
+
+
+def is_content_addressed(filename: str) -> bool:
+    """Whether a stored filename is named after its content hash"""
+    return bool(_CONTENT_ADDRESSED_NAME.fullmatch(filename))
+
+
+async def save_image_upload(image: UploadFile) -> str:
+    """
+    Store an uploaded image under its content hash and return its relative path.
+
+    The upload is first streamed through SHA-256 one chunk at a time, checking
+    the format from its magic bytes and abandoning it as soon as the size
+    limit is exceeded. If a file with that hash already exists the upload
+    costs nothing more than the hash; otherwise it is streamed to a temporary
+    file through non-blocking I/O and atomically renamed into place.
+    """
+    first_chunk = await image.read(UPLOAD_CHUNK_SIZE)
+    detected = sniff_image_type(first_chunk)
+    if detected is None:
+        raise HTTPException(status_code=415, detail="Unsupported image format, expected PNG, JPEG, GIF or WebP")
+    _, file_extension = detected
+
+    digest = hashlib.sha256()
+    size = 0
+    chunk = first_chunk
+    while chunk:
+        size += len(chunk)
+        if size > MAX_IMAGE_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image exceeds the maximum upload size of {MAX_IMAGE_UPLOAD_BYTES} bytes",
+            )
+        digest.update(chunk)
+        chunk = await image.read(UPLOAD_CHUNK_SIZE)
+
+    filename = content_addressed_filename(digest.hexdigest(), file_extension)
+    file_path = anyio.Path(UPLOAD_DIRECTORY / filename)
+
+    if await file_path.exists():
+        # Refresh the modification time so a concurrent release does not reclaim it
+        await anyio.to_thread.run_sync(os.utime, file_path)
+    else:
+        temp_path = anyio.Path(UPLOAD_DIRECTORY / f".{filename}.{os.urandom(4).hex()}.part")
+        try:
+            await image.seek(0)
+            async with await anyio.open_file(temp_path, "wb") as buffer:
+                while chunk := await image.read(UPLOAD_CHUNK_SIZE):
+                    await buffer.write(chunk)
+            # Identical concurrent uploads race harmlessly to the same final name
+            await temp_path.replace(file_path)
+        except BaseException:
+            # Never leave a partial file behind
+            await temp_path.unlink(missing_ok=True)
+            raise
+
+    # Store the relative path instead of full path
+    return f"uploads/animals/{filename}"
+
+
+def save_image_file(source: BinaryIO) -> str:
+    """
+    Blocking counterpart of save_image_upload for seekable file objects.
+
+    Used where images arrive outside a request upload, such as the members of
+    a bulk import archive; call it from a worker thread.
+    """
+    first_chunk = source.read(UPLOAD_CHUNK_SIZE)
+    detected = sniff_image_type(first_chunk)
+    if detected is None:
+        raise ValueError("Unsupported image format, expected PNG, JPEG, GIF or WebP")
+
+    digest = hashlib.sha256()
+    size = 0
+    chunk = first_chunk
+    while chunk:
+        size += len(chunk)
+        if size > MAX_IMAGE_UPLOAD_BYTES:
+            raise ValueError(f"Image exceeds the maximum upload size of {MAX_IMAGE_UPLOAD_BYTES} bytes")
+        digest.update(chunk)
+        chunk = source.read(UPLOAD_CHUNK_SIZE)
+
+    filename = content_addressed_filename(digest.hexdigest(), detected[1])
+    file_path = UPLOAD_DIRECTORY / filename
+    if file_path.exists():
+        os.utime(file_path)
+    else:
+        temp_path = UPLOAD_DIRECTORY / f".{filename}.{os.urandom(4).hex()}.part"
+        try:
+            source.seek(0)
+            with open(temp_path, "wb") as buffer:
+                while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                    buffer.write(chunk)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+    return f"uploads/animals/{filename}"
+
+
+def release_image(session: Session, image_path: Optional[str]) -> bool:
+    """
+    Delete a stored image once no animal references it any more.
+
+    Animal.image_path is the reference count, so this must run after the
+    change that dropped the reference has been committed. Files touched within
+    the grace period are kept because an upload of the same content may be
+    about to reference them. Returns whether the file was removed.
+    """
+    if not image_path or not image_path.startswith("uploads/animals/"):
+        return False
+
+    references = session.exec(
+        select(func.count(Animal.id)).where(Animal.image_path == image_path)
+    ).one()
+    if references:
+        return False
+
+    file_path = UPLOAD_DIRECTORY / Path(image_path).name
+    try:
+        if time.time() - file_path.stat().st_mtime < IMAGE_RELEASE_GRACE_SECONDS:
+            return False
+        file_path.unlink()
+    except FileNotFoundError:
+        return False
+    remove_variants(image_path)
+    return True
+
+
+def _hash_file(file_path: Path) -> Tuple[Optional[str], str]:
+    """Return (extension, sha256 hex digest) for a stored file, or (None, "") if it is not an image"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as source:
+        first_chunk = source.read(UPLOAD_CHUNK_SIZE)
+        detected = sniff_image_type(first_chunk)
+        if detected is None:
+            return None, ""
+        chunk = first_chunk
+        while chunk:
+            digest.update(chunk)
+            chunk = source.read(UPLOAD_CHUNK_SIZE)
+    return detected[1], digest.hexdigest()
+
+
+def deduplicate_images(session: Session, dry_run: bool = False, delete_orphans: bool = False) -> Dict[str, int]:
+    """
+    Move existing uploads to content-addressed names and drop duplicate copies.
+
+    Each file is linked to its content-addressed name first, animal rows are
+    repointed in one transaction, and only then are the old names removed, so
+    every committed image_path keeps resolving throughout. With
+    delete_orphans, images no animal references are removed as well.
+    """
+    report = {"files": 0, "renamed": 0, "duplicates": 0, "orphans": 0, "bytes_reclaimed": 0}
+    renames: Dict[str, str] = {}
+
+    for file_path in sorted(UPLOAD_DIRECTORY.iterdir()):
+        if not file_path.is_file() or file_path.name.startswith("."):
+            continue
+        report["files"] += 1
+        if is_content_addressed(file_path.name):
+            continue
+        extension, digest = _hash_file(file_path)
+        if extension is None:
+            continue
+
+        target = UPLOAD_DIRECTORY / content_addressed_filename(digest, extension)
+        if target.exists() or f"uploads/animals/{target.name}" in renames.values():
+            report["duplicates"] += 1
+            report["bytes_reclaimed"] += file_path.stat().st_size
+        else:
+            report["renamed"] += 1
+            if not dry_run:
+                os.link(file_path, target)
+        renames[f"uploads/animals/{file_path.name}"] = f"uploads/animals/{target.name}"
+
+    if dry_run:
+        return report
+
+    for old_path, new_path in renames.items():
+        animal_ids = session.exec(
+            update(Animal).where(Animal.image_path == old_path)
+            .values(image_path=new_path, updated_at=datetime.utcnow(), version=Animal.version + 1)
+            .returning(Animal.id)
+        ).scalars().all()
+        record_changes(session, [(ANIMAL, animal_id, UPDATED) for animal_id in animal_ids])
+    session.commit()
+    for old_path in renames:
+        (UPLOAD_DIRECTORY / Path(old_path).name).unlink(missing_ok=True)
+
+    if delete_orphans:
+        for file_path in sorted(UPLOAD_DIRECTORY.iterdir()):
+            if not file_path.is_file() or file_path.name.startswith("."):
+                continue
+            size = file_path.stat().st_size
+            if release_image(session, f"uploads/animals/{file_path.name}"):
+                report["orphans"] += 1
+                report["bytes_reclaimed"] += size
+    return report
+
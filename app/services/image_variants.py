@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import logging
+import os
+import threading
+
+from app.schemas.animal import IMAGE_VARIANTS, variant_paths
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))
+VARIANT_DIRECTORY = Path("uploads/animals/variants")
+
+_SAVE_OPTIONS = {
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 60},
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+# Several job worker threads may ask for the pool at once
+_executor_lock = threading.Lock()
+
+
+def generate_variants(image_path: str, force: bool = False) -> List[str]:
+    """
+    Write the resized variants of one stored image and return the new paths.
+
+    Runs inside a worker process. Variants that already exist are skipped
+    unless force is set; content-addressed sources never change, so an
+    existing variant is always current.
+    """
+    from PIL import Image, ImageOps
+
+    targets = [
+        (variant, fmt, Path(path))
+        for variant, paths in variant_paths(image_path).items()
+        for fmt, path in paths.items()
+        if force or not Path(path).exists()
+    ]
+    if not targets:
+        return []
+
+    VARIANT_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    written = []
+    with Image.open(image_path) as source:
+        # Animated images use their first frame
+        source.seek(0)
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        for variant, fmt, target in targets:
+            size = IMAGE_VARIANTS[variant]
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            temp_target = target.with_name(f".{target.name}.{os.getpid()}.part")
+            resized.save(temp_target, format=fmt.upper(), **_SAVE_OPTIONS.get(fmt, {}))
+            os.replace(temp_target, target)
+            written.append(str(target))
+    return written
+
+
+def remove_variants(image_path: str) -> None:
+    """Delete every variant of a stored image"""
+    for paths in variant_paths(image_path).values():
+        for path in paths.values():
+            Path(path).unlink(missing_ok=True)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS)
+        return _executor
+
+
+def generate_variants_in_pool(image_path: str, force: bool = False) -> List[str]:
+    """Generate the variants of one image in the process pool and wait for them"""
+    return _get_executor().submit(generate_variants, image_path, force).result()
+
+
+def backfill_variants(image_paths: Iterable[str], force: bool = False) -> Dict[str, int]:
+    """Generate variants for existing images across the process pool"""
+    report = {"images": 0, "variants": 0, "failed": 0}
+    image_paths = list(image_paths)
+    futures = [_get_executor().submit(generate_variants, path, force) for path in image_paths]
+    for image_path, future in zip(image_paths, futures):
+        report["images"] += 1
+        try:
+            report["variants"] += len(future.result())
+        except Exception:
+            logger.exception("Generating variants for %s failed", image_path)
+            report["failed"] += 1
+    return report
+
+
+def shutdown_variant_workers() -> None:
+    """Stop the process pool, waiting for queued variants to finish"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
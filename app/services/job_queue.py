@@ -0,0 +1,277 @@
+from sqlalchemy import and_, event, insert, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select, update
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from app.schemas.job import Job
+from app.services.metrics import BACKGROUND_JOB_DURATION, BACKGROUND_JOBS
+
+logger = logging.getLogger(__name__)
+
+# Worker threads started with the API; 0 leaves the queue to `manage.py run-jobs`
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# How long an idle worker sleeps before looking for due jobs again
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+# Retries wait JOB_RETRY_BASE_SECONDS, then twice as long each time, up to JOB_RETRY_MAX_SECONDS
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", 5))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", 3600))
+# A job still running after its lease is assumed lost with its worker and runs again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+
+QUEUED = "queued"
+RUNNING = "running"
+DEAD = "dead"
+
+_MAX_ERROR_LENGTH = 2000
+
+
+class ClaimedJob(NamedTuple):
+    """The fields of a job a worker needs to run it"""
+    id: int
+    kind: str
+    payload: str
+    attempts: int
+    max_attempts: int
+
+
+JobHandler = Callable[[Session, Dict[str, Any]], None]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register the function that runs jobs of a kind; it gets a fresh session and the payload"""
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+def _job_row(kind: str, payload: Mapping[str, Any], delay_seconds: float, max_attempts: Optional[int]) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    return {
+        "kind": kind,
+        "payload": json.dumps(payload, sort_keys=True),
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts or JOB_MAX_ATTEMPTS,
+        "run_at": now + timedelta(seconds=delay_seconds),
+        "created_at": now,
+    }
+
+
+def enqueue(session: Session, kind: str, payload: Mapping[str, Any], delay_seconds: float = 0,
+            max_attempts: Optional[int] = None) -> None:
+    """
+    Queue a job as part of the caller's transaction.
+
+    The job is committed together with the change that needs it, or not at
+    all, and workers only see it once that commit has happened.
+    """
+    enqueue_many(session, kind, [payload], delay_seconds, max_attempts)
+
+
+def enqueue_many(session: Session, kind: str, payloads: Iterable[Mapping[str, Any]], delay_seconds: float = 0,
+                 max_attempts: Optional[int] = None) -> None:
+    """Queue one job per payload with a single multi-row INSERT in the caller's transaction"""
+    rows = [_job_row(kind, payload, delay_seconds, max_attempts) for payload in payloads]
+    if not rows:
+        return
+    session.execute(insert(Job), rows)
+    session.info["jobs_enqueued"] = True
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt, doubling per failure with some jitter"""
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _due(now: datetime):
+    return or_(
+        and_(Job.status == QUEUED, Job.run_at <= now),
+        # A lost attempt counts like a failed one, so a job that keeps killing its worker still runs out
+        and_(Job.status == RUNNING, Job.locked_until < now, Job.attempts < Job.max_attempts),
+    )
+
+
+def _bury_lost_jobs(session: Session, now: datetime) -> None:
+    """Mark dead the jobs whose final attempt lost its worker"""
+    buried = session.execute(
+        update(Job)
+        .where(Job.status == RUNNING, Job.locked_until < now, Job.attempts >= Job.max_attempts)
+        .values(status=DEAD, locked_until=None, last_error="Worker lost during the final attempt; its lease expired")
+        .returning(Job.id, Job.kind)
+    ).all()
+    session.commit()
+    for job_id, kind in buried:
+        logger.error("Job %s (%s) lost its worker on its final attempt", job_id, kind)
+        BACKGROUND_JOBS.labels(kind, DEAD).inc()
+
+
+def claim_job(engine: Engine) -> Optional[ClaimedJob]:
+    """
+    Take the next due job, or None if there is none.
+
+    The claim is a conditional UPDATE of the job read a moment earlier, so
+    concurrent workers never run the same job; a worker that loses the race
+    just looks again.
+    """
+    with Session(engine) as session:
+        for _ in range(3):
+            now = datetime.utcnow()
+            candidate = session.exec(select(Job.id).where(_due(now)).order_by(Job.run_at).limit(1)).first()
+            if candidate is None:
+                # Only looked for when idle, so a busy queue never pays for it
+                _bury_lost_jobs(session, now)
+                return None
+            claimed = session.execute(
+                update(Job)
+                .where(Job.id == candidate, _due(now))
+                .values(status=RUNNING, attempts=Job.attempts + 1,
+                        locked_until=now + timedelta(seconds=JOB_LEASE_SECONDS))
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+            ).first()
+            session.commit()
+            if claimed is not None:
+                return ClaimedJob(*claimed)
+    return None
+
+
+def run_job(engine: Engine, job: ClaimedJob) -> str:
+    """Run a claimed job's handler and record the outcome: done, retried or dead"""
+    started = time.perf_counter()
+    try:
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}")
+        with Session(engine) as session:
+            handler(session, json.loads(job.payload))
+    except Exception as exc:
+        outcome = DEAD if job.attempts >= job.max_attempts else "retried"
+        error = f"{exc.__class__.__name__}: {exc}"[:_MAX_ERROR_LENGTH]
+        values = {"status": DEAD, "locked_until": None, "last_error": error}
+        if outcome != DEAD:
+            values.update(status=QUEUED, run_at=datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts)))
+        log = logger.error if outcome == DEAD else logger.warning
+        log("Job %s (%s) failed on attempt %d of %d: %s", job.id, job.kind, job.attempts, job.max_attempts, error)
+        statement = update(Job).where(Job.id == job.id, Job.attempts == job.attempts).values(**values)
+    else:
+        outcome = "done"
+        # Finished jobs are not kept; only dead ones stay for inspection
+        statement = Job.__table__.delete().where(Job.id == job.id, Job.attempts == job.attempts)
+    finally:
+        BACKGROUND_JOB_DURATION.labels(job.kind).observe(time.perf_counter() - started)
+
+    # Guarded by attempts, so a job reclaimed after its lease ran out is left to its new owner
+    with Session(engine) as session:
+        session.execute(statement)
+        session.commit()
+    BACKGROUND_JOBS.labels(job.kind, outcome).inc()
+    return outcome
+
+
+def run_pending_jobs(engine: Engine, limit: Optional[int] = None) -> Dict[str, int]:
+    """Run due jobs in the calling thread until none are left, or limit have run"""
+    report = {"done": 0, "retried": 0, DEAD: 0}
+    while limit is None or sum(report.values()) < limit:
+        job = claim_job(engine)
+        if job is None:
+            break
+        report[run_job(engine, job)] += 1
+    return report
+
+
+def retry_dead_jobs(session: Session, kind: Optional[str] = None) -> int:
+    """Queue dead jobs again with a fresh set of attempts; returns how many"""
+    statement = update(Job).where(Job.status == DEAD)
+    if kind is not None:
+        statement = statement.where(Job.kind == kind)
+    result = session.execute(statement.values(status=QUEUED, attempts=0, run_at=datetime.utcnow(), last_error=None))
+    session.commit()
+    return result.rowcount
+
+
+class JobWorkers:
+    """A pool of threads that claim and run due jobs until stopped"""
+    def __init__(self, engine: Engine, workers: int = JOB_WORKERS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.engine = engine
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._stopping = threading.Event()
+        self._wake = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs and wait for the ones in progress to finish"""
+        self._stopping.set()
+        self.wake()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def wake(self) -> None:
+        """Have idle workers look for due jobs now instead of at their next poll"""
+        with self._wake:
+            self._wake.notify_all()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = claim_job(self.engine)
+                if job is not None:
+                    run_job(self.engine, job)
+                    continue
+            except Exception:
+                # A database outage must not kill the worker
+                logger.exception("Job worker failed to claim or record a job")
+            with self._wake:
+                if not self._stopping.is_set():
+                    self._wake.wait(self.poll_seconds)
+
+
+_workers: Optional[JobWorkers] = None
+
+
+def start_job_workers(engine: Engine, workers: int = JOB_WORKERS) -> Optional[JobWorkers]:
+    global _workers
+    if workers <= 0 or _workers is not None:
+        return _workers
+    # Importing the handlers registers them
+    import app.services.jobs  # noqa: F401
+
+    _workers = JobWorkers(engine, workers)
+    _workers.start()
+    return _workers
+
+
+def stop_job_workers() -> None:
+    global _workers
+    if _workers is not None:
+        _workers.stop()
+        _workers = None
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _wake_workers(session: OrmSession) -> None:
+    if session.info.pop("jobs_enqueued", False) and _workers is not None:
+        _workers.wake()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_enqueued(session: OrmSession) -> None:
+    session.info.pop("jobs_enqueued", None)
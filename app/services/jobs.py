@@ -0,0 +1,88 @@
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from typing import Any, Dict
+import httpx
+import logging
+import os
+
+from app.schemas.adoption import Adoption
+from app.schemas.job import Job
+from app.services.idempotency_service import prune_idempotency_keys
+from app.services.image_storage import release_image
+from app.services.image_variants import generate_variants_in_pool
+from app.services.job_queue import QUEUED, enqueue, job_handler
+
+logger = logging.getLogger(__name__)
+
+# Job kinds
+GENERATE_IMAGE_VARIANTS = "images.generate_variants"
+RELEASE_IMAGE = "images.release"
+NOTIFY_APPLICANT = "adoptions.notify_applicant"
+PRUNE_IDEMPOTENCY_KEYS = "idempotency.prune_keys"
+
+# Decisions on adoption applications are POSTed here as JSON; without it they are only logged
+NOTIFICATION_WEBHOOK_URL = os.getenv("NOTIFICATION_WEBHOOK_URL")
+NOTIFICATION_TIMEOUT_SECONDS = float(os.getenv("NOTIFICATION_TIMEOUT_SECONDS", 10))
+# How often expired Idempotency-Keys are deleted
+IDEMPOTENCY_PRUNE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PRUNE_INTERVAL_SECONDS", 3600))
+
+
+@job_handler(GENERATE_IMAGE_VARIANTS)
+def generate_image_variants(session: Session, payload: Dict[str, Any]) -> None:
+    """Write the resized variants of an uploaded image; resizing runs in the process pool"""
+    generate_variants_in_pool(payload["image_path"])
+
+
+@job_handler(RELEASE_IMAGE)
+def release_stored_image(session: Session, payload: Dict[str, Any]) -> None:
+    """Delete a stored image and its variants if no animal references it any more"""
+    release_image(session, payload["image_path"])
+
+
+@job_handler(NOTIFY_APPLICANT)
+def notify_applicant(session: Session, payload: Dict[str, Any]) -> None:
+    """Tell an applicant their application was approved or rejected"""
+    adoption = session.get(Adoption, payload["adoption_id"])
+    if adoption is None:
+        # Deleted since the decision; there is nobody left to tell
+        return
+    message = {
+        "adoption_id": adoption.id,
+        "animal_id": adoption.animal_id,
+        "full_name": adoption.full_name,
+        "email": adoption.email,
+        "status": payload["status"],
+    }
+    if not NOTIFICATION_WEBHOOK_URL:
+        logger.info("Adoption application %s was %s; set NOTIFICATION_WEBHOOK_URL to notify %s",
+                    adoption.id, payload["status"], adoption.email)
+        return
+    # Failures raise, so the job is retried with backoff
+    response = httpx.post(NOTIFICATION_WEBHOOK_URL, json=message, timeout=NOTIFICATION_TIMEOUT_SECONDS)
+    response.raise_for_status()
+
+
+@job_handler(PRUNE_IDEMPOTENCY_KEYS)
+def prune_expired_idempotency_keys(session: Session, payload: Dict[str, Any]) -> None:
+    """Delete Idempotency-Keys past their replay window, then queue the next run"""
+    pruned = prune_idempotency_keys(session)
+    if pruned:
+        logger.info("Pruned %d expired idempotency keys", pruned)
+    schedule_idempotency_pruning(session, IDEMPOTENCY_PRUNE_INTERVAL_SECONDS)
+    session.commit()
+
+
+def schedule_idempotency_pruning(session: Session, delay_seconds: float = 0) -> None:
+    """Queue the pruning job in the caller's transaction unless one is already waiting"""
+    waiting = session.exec(
+        select(Job.id).where(Job.kind == PRUNE_IDEMPOTENCY_KEYS, Job.status == QUEUED).limit(1)
+    ).first()
+    if waiting is None:
+        enqueue(session, PRUNE_IDEMPOTENCY_KEYS, {}, delay_seconds)
+
+
+def ensure_idempotency_pruning(engine: Engine) -> None:
+    """Start the self-rescheduling pruning job; a no-op when one is already queued"""
+    with Session(engine) as session:
+        schedule_idempotency_pruning(session)
+        session.commit()
@@ -0,0 +1,86 @@
+from contextvars import ContextVar
+from prometheus_client import Counter, Gauge, Histogram
+from typing import List, Optional
+
+# Request latency buckets, in seconds, from cache hits to slow exports
+LATENCY_BUCKETS = (0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Time spent executing a single SQL statement",
+    ["engine"], buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    ["engine"], buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Connection checkouts that gave up waiting for the pool",
+    ["engine"],
+)
+
+BACKGROUND_JOBS = Counter(
+    "background_jobs_total", "Background job attempts, by outcome: done, retried or dead",
+    ["kind", "outcome"],
+)
+BACKGROUND_JOB_DURATION = Histogram(
+    "background_job_duration_seconds", "Time spent running a background job handler",
+    ["kind"], buckets=LATENCY_BUCKETS,
+)
+
+CHANGE_FEED_SUBSCRIBERS = Gauge("change_feed_subscribers", "Clients connected to the change event stream")
+CHANGE_FEED_EVENTS = Counter("change_feed_events_sent_total", "Change events sent to stream clients")
+CHANGE_FEED_OVERFLOWS = Counter(
+    "change_feed_overflows_total", "Times a slow stream client overflowed its queue and fell back to the table",
+)
+
+ENTITY_CACHE_LOOKUPS = Counter(
+    "entity_cache_lookups_total", "Entity cache lookups, by result: hit or miss",
+    ["cache", "result"],
+)
+ENTITY_CACHE_EVICTIONS = Counter(
+    "entity_cache_evictions_total", "Entries dropped to keep an entity cache within its size", ["cache"],
+)
+ENTITY_CACHE_INVALIDATIONS = Counter(
+    "entity_cache_invalidations_total", "Entries invalidated because their row changed", ["cache"],
+)
+
+
+class RequestStats:
+    """SQL work done on behalf of one request"""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Shared by reference with the threads and greenlets that run the request's queries
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request_stats() -> RequestStats:
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def record_query(engine_name: str, duration: float) -> None:
+    """Record one executed statement against the engine and the current request"""
+    DB_QUERY_DURATION.labels(engine_name).observe(duration)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += duration
@@ -0,0 +1,62 @@
+from sqlalchemy import and_, or_
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException
+import base64
+import json
+
+# Upper bound on rows returned by a single list or search request
+MAX_PAGE_SIZE = 100
+
+
+def page_size(limit: int) -> int:
+    """Clamp a requested page size to between 1 and MAX_PAGE_SIZE rows"""
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque, URL-safe cursor"""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def apply_keyset(query, model, cursor: Optional[str], limit: int):
+    """
+    Restrict a select to the page that follows the cursor position.
+
+    Rows are ordered by (created_at, id) so the predicate can seek straight to
+    the cursor instead of walking every skipped row like OFFSET does. New rows
+    always sort after existing ones, so they never shift a page a client is
+    already walking through.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > row_id),
+            )
+        )
+    # Fetch one extra row to find out whether there is a next page
+    return query.order_by(model.created_at, model.id).limit(limit + 1)
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page"""
+    if len(rows) <= limit:
+        return list(rows), None
+    items = list(rows[:limit])
+    if not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,39 @@
+from fastapi import HTTPException
+from sqlmodel import SQLModel, select
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Type
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """Validate a comma-separated `fields` parameter, returning the requested names in order"""
+    if fields is None:
+        return None
+    requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    if not requested:
+        raise HTTPException(status_code=400, detail="fields must name at least one field")
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(allowed)}",
+        )
+    return requested
+
+
+def source_columns(fields: Iterable[str], derived: Optional[Dict[str, str]] = None) -> Tuple[str, ...]:
+    """Table columns needed to build the given response fields"""
+    derived = derived or {}
+    return tuple(dict.fromkeys(derived.get(name, name) for name in fields))
+
+
+def select_columns(model: Type[SQLModel], columns: Optional[Sequence[str]] = None):
+    """
+    Select whole rows, or only the named columns when a projection is given.
+
+    Projected selects always include id and created_at so keyset pagination
+    and ordering keep working; the rows come back as lightweight tuples with
+    attribute access instead of ORM instances.
+    """
+    if columns is None:
+        return select(model)
+    names = dict.fromkeys(("id", "created_at", *columns))
+    return select(*(getattr(model, name) for name in names))
@@ -1,17 +1,207 @@
 from sqlmodel import Session, select, func
-from datetime import datetime, timedelta
-from typing import Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional
+from fastapi import HTTPException
+import os
 
 from app.schemas.animal import Animal
 from app.schemas.adoption import Adoption
+from app.services.async_adapter import AsyncServiceAdapter
+from app.services.counter_service import (
+    ADOPTIONS_BY_STATUS, ADOPTIONS_TOTAL, ANIMALS_ADOPTED, ANIMALS_BY_INTAKE_DAY,
+    ANIMALS_BY_TYPE, ANIMALS_TOTAL, CounterService, prefix_range,
+)
+from app.services.daily_stat_service import DAILY_METRICS, DailyStatService
+
+# "counters" reads the incrementally maintained shelter_counter table,
+# "aggregate" answers each endpoint with one grouped query per table,
+# "per_metric" keeps the original one-COUNT-per-metric path for benchmarking
+STATISTICS_STRATEGIES = ("counters", "aggregate", "per_metric")
+STATISTICS_STRATEGY = os.getenv("STATISTICS_STRATEGY", "counters")
+
+# Types that always appear in the distribution, even with a count of zero, next to "other"
+COMMON_ANIMAL_TYPES = ["Dog", "Cat", "Bird", "Rabbit"]
+
+TREND_GRANULARITIES = ("day", "week", "month")
+# Periods shown when a trend request gives no start
+DEFAULT_TREND_PERIODS = {"day": 30, "week": 26, "month": 12}
+MAX_TREND_DAYS = int(os.getenv("MAX_TREND_DAYS", 5 * 366))
+
+
+def period_start(day: date, granularity: str) -> date:
+    """First day of the day, ISO week or month a day falls in"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start: date, granularity: str) -> date:
+    """First day of the period after the one starting on start"""
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    if granularity == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def default_trend_start(end: date, granularity: str) -> date:
+    """Start of the default window ending on end"""
+    start = period_start(end, granularity)
+    for _ in range(DEFAULT_TREND_PERIODS[granularity] - 1):
+        start = period_start(start - timedelta(days=1), granularity)
+    return start
 
 
 class StatisticsService:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, strategy: Optional[str] = None):
         self.session = session
+        self.strategy = strategy or STATISTICS_STRATEGY
+        if self.strategy not in STATISTICS_STRATEGIES:
+            raise ValueError(f"Unknown statistics strategy: {self.strategy}")
 
     def get_summary_statistics(self) -> Dict[str, Any]:
         """Get summary statistics about the shelter operations"""
+        if self.strategy == "per_metric":
+            return self._get_summary_statistics_per_metric()
+
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        if self.strategy == "counters":
+            # Admissions are counted per intake day, so sum the days inside the window
+            _, intake_upper = prefix_range(ANIMALS_BY_INTAKE_DAY)
+            intake_lower = ANIMALS_BY_INTAKE_DAY + thirty_days_ago.date().isoformat()
+            counters = CounterService(self.session).get_values(
+                [ANIMALS_TOTAL, ANIMALS_ADOPTED], [(intake_lower, intake_upper)]
+            )
+            total_animals = counters.get(ANIMALS_TOTAL, 0)
+            return {
+                "total_animals": total_animals,
+                "adopted_animals": counters.get(ANIMALS_ADOPTED, 0),
+                "new_admissions": sum(
+                    value for key, value in counters.items() if key.startswith(ANIMALS_BY_INTAKE_DAY)
+                ),
+                "rescued_animals": total_animals // 2
+            }
+
+        total_animals, adopted_animals, new_admissions = self.session.exec(
+            select(
+                func.count(Animal.id),
+                func.count(Animal.id).filter(Animal.is_adopted == True),
+                func.count(Animal.id).filter(Animal.created_at >= thirty_days_ago),
+            )
+        ).one()
+
+        return {
+            "total_animals": total_animals,
+            "adopted_animals": adopted_animals,
+            "new_admissions": new_admissions,
+            "rescued_animals": total_animals // 2
+        }
+
+    def get_adoption_statistics(self) -> Dict[str, Any]:
+        """Get statistics about adoptions"""
+        if self.strategy == "per_metric":
+            return self._get_adoption_statistics_per_metric()
+
+        if self.strategy == "counters":
+            statuses = ["Pending", "Approved", "Rejected"]
+            counters = CounterService(self.session).get_values(
+                [ADOPTIONS_TOTAL, ANIMALS_TOTAL] + [ADOPTIONS_BY_STATUS + status for status in statuses]
+            )
+            total_adoptions = counters.get(ADOPTIONS_TOTAL, 0)
+            pending_adoptions, approved_adoptions, rejected_adoptions = (
+                counters.get(ADOPTIONS_BY_STATUS + status, 0) for status in statuses
+            )
+            total_animals = counters.get(ANIMALS_TOTAL, 0)
+        else:
+            # The animal total rides along as a scalar subquery to keep this to one round trip
+            total_adoptions, pending_adoptions, approved_adoptions, rejected_adoptions, total_animals = self.session.exec(
+                select(
+                    func.count(Adoption.id),
+                    func.count(Adoption.id).filter(Adoption.status == "Pending"),
+                    func.count(Adoption.id).filter(Adoption.status == "Approved"),
+                    func.count(Adoption.id).filter(Adoption.status == "Rejected"),
+                    select(func.count(Animal.id)).scalar_subquery(),
+                )
+            ).one()
+        adoption_rate = round((approved_adoptions / total_animals) * 100, 1) if total_animals > 0 else 0
+
+        return {
+            "total_adoptions": total_adoptions,
+            "pending_adoptions": pending_adoptions,
+            "approved_adoptions": approved_adoptions,
+            "rejected_adoptions": rejected_adoptions,
+            "adoption_rate": adoption_rate
+        }
+
+    def get_animal_type_distribution(self) -> Dict[str, Any]:
+        """Get distribution of animals by type"""
+        if self.strategy == "per_metric":
+            return self._get_animal_type_distribution_per_metric()
+
+        distribution = {animal_type.lower(): 0 for animal_type in COMMON_ANIMAL_TYPES}
+        distribution["other"] = 0
+        if self.strategy == "counters":
+            counters = CounterService(self.session).get_values(prefixes=[prefix_range(ANIMALS_BY_TYPE)])
+            rows = [
+                (key[len(ANIMALS_BY_TYPE):], count) for key, count in counters.items() if count
+            ]
+        else:
+            rows = self.session.exec(
+                select(Animal.type, func.count(Animal.id)).group_by(Animal.type)
+            ).all()
+        # Every stored type gets its own key, so new types show up without a code
+        # change; spellings that differ only in case are folded together
+        for animal_type, count in rows:
+            key = animal_type.lower()
+            distribution[key] = distribution.get(key, 0) + count
+
+        return {
+            "type_distribution": distribution
+        }
+
+    def get_trends(self, granularity: str = "day", start: Optional[date] = None, end: Optional[date] = None,
+                   animal_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get intakes, applications, approvals and rejections per day, week or month.
+
+        Read from the daily rollup, so a year of history is at most a few
+        hundred pre-aggregated rows whatever the size of the animal and
+        adoption tables. Periods without activity are reported as zeros.
+        """
+        if granularity not in TREND_GRANULARITIES:
+            raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(TREND_GRANULARITIES)}")
+        end = end or datetime.utcnow().date()
+        start = period_start(start, granularity) if start else default_trend_start(end, granularity)
+        if start > end:
+            raise HTTPException(status_code=400, detail="from must not be after to")
+        if (end - start).days >= MAX_TREND_DAYS:
+            raise HTTPException(status_code=400, detail=f"Trends cover at most {MAX_TREND_DAYS} days")
+
+        points: Dict[date, Dict[str, int]] = {}
+        bucket = start
+        while bucket <= end:
+            points[bucket] = dict.fromkeys(DAILY_METRICS, 0)
+            bucket = next_period(bucket, granularity)
+        totals = dict.fromkeys(DAILY_METRICS, 0)
+        for day, metrics in DailyStatService(self.session).get_daily_totals(start, end, animal_type).items():
+            point = points[period_start(day, granularity)]
+            for metric, value in metrics.items():
+                point[metric] += value
+                totals[metric] += value
+
+        return {
+            "granularity": granularity,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "animal_type": animal_type,
+            "totals": totals,
+            "series": [{"period": bucket.isoformat(), **point} for bucket, point in points.items()],
+        }
+
+    def _get_summary_statistics_per_metric(self) -> Dict[str, Any]:
+        """Summary statistics with one round trip per metric"""
         # Count total animals
         total_animals_query = select(func.count(Animal.id))
         total_animals = self.session.exec(total_animals_query).one()
@@ -35,8 +225,8 @@ class StatisticsService:
             "rescued_animals": rescued_animals
         }
     
-    def get_adoption_statistics(self) -> Dict[str, Any]:
-        """Get statistics about adoptions"""
+    def _get_adoption_statistics_per_metric(self) -> Dict[str, Any]:
+        """Adoption statistics with one round trip per metric"""
         # Count total adoptions
         total_adoptions_query = select(func.count(Adoption.id))
         total_adoptions = self.session.exec(total_adoptions_query).one()
@@ -66,8 +256,14 @@ class StatisticsService:
             "adoption_rate": adoption_rate
         }
     
-    def get_animal_type_distribution(self) -> Dict[str, Any]:
-        """Get distribution of animals by type"""
+    def _get_animal_type_distribution_per_metric(self) -> Dict[str, Any]:
+        """
+        Type distribution with one round trip per hard-coded type.
+
+        Kept as the original implementation for benchmarking: types outside
+        COMMON_ANIMAL_TYPES, or spelled in another case, are counted under
+        "other" instead of getting their own key.
+        """
         # Get count by animal type
         distribution = {}
         
@@ -87,4 +283,23 @@ class StatisticsService:
                 
         return {
             "type_distribution": distribution
-        }
\ No newline at end of file
+        }
+
+
+class AsyncStatisticsService(AsyncServiceAdapter):
+    """StatisticsService for `async def` routes using an AsyncSession"""
+    service_class = StatisticsService
+
+    async def get_summary_statistics(self) -> Dict[str, Any]:
+        return await self._call("get_summary_statistics")
+
+    async def get_adoption_statistics(self) -> Dict[str, Any]:
+        return await self._call("get_adoption_statistics")
+
+    async def get_animal_type_distribution(self) -> Dict[str, Any]:
+        return await self._call("get_animal_type_distribution")
+
+    async def get_trends(self, granularity: str = "day", start: Optional[date] = None, end: Optional[date] = None,
+                         animal_type: Optional[str] = None) -> Dict[str, Any]:
+        return await self._call("get_trends", granularity, start, end, animal_type)
+
@@ -0,0 +1,415 @@
+"""
+Drive every /api/v1 route with concurrent clients and record latency, throughput
+and queries per request.
+
+    python -m benchmarks.seed --scale 100k --database-url sqlite:///bench.db
+    python -m benchmarks.run --database-url sqlite:///bench.db --concurrency 16 --requests 500
+
+Requests go through the ASGI app in-process, so the numbers cover routing,
+validation, the database and serialization without network noise. Results are
+written to benchmarks/results/ as JSON; pass --compare with an earlier file to
+fail the run when a scenario regressed by more than --tolerance.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+RESULTS_DIRECTORY = Path(__file__).resolve().parent / "results"
+
+# Queries issued on behalf of the request currently being handled
+_query_count: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("query_count", default=None)
+
+
+class Scenario(NamedTuple):
+    """One benchmarked request shape; build returns (method, url, httpx request kwargs)"""
+    route: str
+    build: Callable[["Context"], tuple]
+    # Fresh rows the scenario consumes, targets_per_request per request, created before timing starts
+    targets: Optional[str] = None
+    targets_per_request: int = 1
+
+
+class Context:
+    def __init__(self, rng: random.Random, max_animal_id: int, max_adoption_id: int):
+        self.rng = rng
+        self.max_animal_id = max(max_animal_id, 1)
+        self.max_adoption_id = max(max_adoption_id, 1)
+        self.targets: Dict[str, List[int]] = {}
+
+    def animal_id(self) -> int:
+        return self.rng.randint(1, self.max_animal_id)
+
+    def adoption_id(self) -> int:
+        return self.rng.randint(1, self.max_adoption_id)
+
+    def take(self, kind: str) -> int:
+        return self.targets[kind].pop()
+
+
+_ANIMAL_FORM = {
+    "name": "Benchmark", "type": "Dog", "age": "3", "breed": "Mixed",
+    "health_status": "Healthy", "description": "Created by the benchmark suite",
+}
+_ADOPTION_JSON = {
+    "full_name": "Benchmark Applicant", "email": "bench@example.com", "phone": "555-0000",
+    "address": "1 Benchmark Street", "housing_situation": "House", "home_ownership": "Own",
+    "adoption_reason": "Benchmarking",
+}
+
+# Decisions per batch review request
+_BATCH_REVIEW_SIZE = 20
+
+
+def _bulk_body(rows: int) -> bytes:
+    return "".join(
+        json.dumps(dict(_ANIMAL_FORM, name=f"Bulk {i}", age=3)) + "\n" for i in range(rows)
+    ).encode()
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "animals.list": Scenario("GET /animals/", lambda ctx: ("GET", "/api/v1/animals/", {})),
+    "animals.list_offset": Scenario(
+        "GET /animals/", lambda ctx: ("GET", f"/api/v1/animals/?skip={ctx.rng.randrange(ctx.max_animal_id)}", {})
+    ),
+    "animals.list_cursor": Scenario("GET /animals/", lambda ctx: ("GET", "/api/v1/animals/?cursor=", {})),
+    "animals.list_fields": Scenario(
+        "GET /animals/", lambda ctx: ("GET", "/api/v1/animals/?fields=id,name,type,image_url", {})
+    ),
+    "animals.filter_type": Scenario(
+        "GET /animals/", lambda ctx: ("GET", f"/api/v1/animals/?type={ctx.rng.choice(['Dog', 'Cat', 'Bird'])}&is_adopted=false", {})
+    ),
+    "animals.search": Scenario(
+        "GET /animals/", lambda ctx: ("GET", f"/api/v1/animals/?q={ctx.rng.choice(['friendly', 'calm dog', 'lab', 'ma'])}", {})
+    ),
+    "animals.get": Scenario("GET /animals/{animal_id}", lambda ctx: ("GET", f"/api/v1/animals/{ctx.animal_id()}", {})),
+    "animals.create": Scenario("POST /animals/", lambda ctx: ("POST", "/api/v1/animals/", {"data": _ANIMAL_FORM})),
+    "animals.bulk": Scenario(
+        "POST /animals/bulk",
+        lambda ctx: ("POST", "/api/v1/animals/bulk", {
+            "content": _bulk_body(100), "headers": {"content-type": "application/x-ndjson"},
+        }),
+    ),
+    "animals.export": Scenario(
+        "GET /animals/export", lambda ctx: ("GET", "/api/v1/animals/export?type=Rabbit", {})
+    ),
+    "animals.update": Scenario(
+        "PUT /animals/{animal_id}",
+        lambda ctx: ("PUT", f"/api/v1/animals/{ctx.animal_id()}", {"data": {"health_status": "Checked"}}),
+    ),
+    "animals.adopt": Scenario(
+        "PATCH /animals/{animal_id}/adopt",
+        lambda ctx: ("PATCH", f"/api/v1/animals/{ctx.take('animal')}/adopt", {}), targets="animal",
+    ),
+    "animals.delete": Scenario(
+        "DELETE /animals/{animal_id}",
+        lambda ctx: ("DELETE", f"/api/v1/animals/{ctx.take('animal')}", {}), targets="animal",
+    ),
+    "adoptions.list": Scenario("GET /adoptions/", lambda ctx: ("GET", "/api/v1/adoptions/", {})),
+    "adoptions.list_status": Scenario(
+        "GET /adoptions/", lambda ctx: ("GET", "/api/v1/adoptions/?status=Pending", {})
+    ),
+    "adoptions.list_animal": Scenario(
+        "GET /adoptions/", lambda ctx: ("GET", f"/api/v1/adoptions/?animal_id={ctx.animal_id()}", {})
+    ),
+    "adoptions.get": Scenario(
+        "GET /adoptions/{adoption_id}", lambda ctx: ("GET", f"/api/v1/adoptions/{ctx.adoption_id()}", {})
+    ),
+    "adoptions.create": Scenario(
+        "POST /adoptions/",
+        lambda ctx: ("POST", "/api/v1/adoptions/", {"json": dict(_ADOPTION_JSON, animal_id=ctx.take("animal"))}),
+        targets="animal",
+    ),
+    "adoptions.export": Scenario(
+        "GET /adoptions/export", lambda ctx: ("GET", "/api/v1/adoptions/export?status=Rejected", {})
+    ),
+    "adoptions.update": Scenario(
+        "PUT /adoptions/{adoption_id}",
+        lambda ctx: ("PUT", f"/api/v1/adoptions/{ctx.take('adoption')}", {"json": {"phone": "555-1111"}}),
+        targets="adoption",
+    ),
+    "adoptions.approve": Scenario(
+        "PATCH /adoptions/{adoption_id}/approve",
+        lambda ctx: ("PATCH", f"/api/v1/adoptions/{ctx.take('adoption')}/approve", {}), targets="adoption",
+    ),
+    "adoptions.reject": Scenario(
+        "PATCH /adoptions/{adoption_id}/reject",
+        lambda ctx: ("PATCH", f"/api/v1/adoptions/{ctx.take('adoption')}/reject", {}), targets="adoption",
+    ),
+    "adoptions.batch_review": Scenario(
+        "POST /adoptions/batch-review",
+        lambda ctx: ("POST", "/api/v1/adoptions/batch-review", {"json": {"decisions": [
+            {"adoption_id": ctx.take("adoption"), "decision": "approve" if i % 2 else "reject"}
+            for i in range(_BATCH_REVIEW_SIZE)
+        ]}}),
+        targets="adoption", targets_per_request=_BATCH_REVIEW_SIZE,
+    ),
+    "adoptions.delete": Scenario(
+        "DELETE /adoptions/{adoption_id}",
+        lambda ctx: ("DELETE", f"/api/v1/adoptions/{ctx.take('adoption')}", {}), targets="adoption",
+    ),
+    "adoptions.housing_options": Scenario(
+        "GET /adoptions/housing-options", lambda ctx: ("GET", "/api/v1/adoptions/housing-options", {})
+    ),
+    "statistics.summary": Scenario("GET /statistics/", lambda ctx: ("GET", "/api/v1/statistics/", {})),
+    "statistics.adoptions": Scenario(
+        "GET /statistics/adoptions", lambda ctx: ("GET", "/api/v1/statistics/adoptions", {})
+    ),
+    "statistics.animal_types": Scenario(
+        "GET /statistics/animal-types", lambda ctx: ("GET", "/api/v1/statistics/animal-types", {})
+    ),
+    "statistics.trends": Scenario(
+        "GET /statistics/trends", lambda ctx: ("GET", "/api/v1/statistics/trends?granularity=week&from=" + (
+            datetime.utcnow() - timedelta(days=365)
+        ).date().isoformat(), {})
+    ),
+    "statistics.fallback": Scenario(
+        "GET /statistics/fallback", lambda ctx: ("GET", "/api/v1/statistics/fallback", {})
+    ),
+}
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _create_targets(engine, kind: str, count: int) -> List[int]:
+    """Insert rows a destructive scenario may consume, returning their ids"""
+    from sqlalchemy import insert
+    from sqlmodel import Session, select
+
+    from app.schemas.adoption import Adoption
+    from app.schemas.animal import Animal
+
+    marker = f"bench-{kind}-{time.time_ns()}"
+    with Session(engine) as session:
+        now = datetime.utcnow()
+        animal = dict(_ANIMAL_FORM, age=3, name=marker, created_at=now, updated_at=now, is_adopted=False)
+        session.execute(insert(Animal), [animal] * count)
+        ids = list(session.exec(select(Animal.id).where(Animal.name == marker)).all())
+        if kind == "adoption":
+            adoption = dict(_ADOPTION_JSON, housing_situation="HOUSE", home_ownership="OWN",
+                            created_at=now, status="Pending")
+            session.execute(insert(Adoption), [dict(adoption, animal_id=animal_id) for animal_id in ids])
+            ids = list(session.exec(select(Adoption.id).where(Adoption.animal_id.in_(ids))).all())
+        session.commit()
+    return ids
+
+
+async def run_scenario(client, ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    """Send `requests` requests through `concurrency` workers and summarize them"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    queries: List[int] = []
+    pending = iter(range(requests))
+
+    async def worker():
+        for _ in pending:
+            method, url, kwargs = scenario.build(ctx)
+            counter = [0]
+            token = _query_count.set(counter)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                await response.aread()
+                status = str(response.status_code)
+            except Exception as exc:
+                status = exc.__class__.__name__
+            finally:
+                latencies.append(time.perf_counter() - started)
+                _query_count.reset(token)
+            statuses[status] = statuses.get(status, 0) + 1
+            queries.append(counter[0])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "route": scenario.route,
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "queries_per_request": round(statistics.fmean(queries), 2) if queries else 0.0,
+        "status_codes": statuses,
+    }
+
+
+def uncovered_routes(app) -> List[str]:
+    """API routes that no scenario exercises"""
+    covered = {scenario.route for scenario in SCENARIOS.values()}
+    routes = []
+    for route in app.routes:
+        path = getattr(route, "path", "")
+        if not path.startswith("/api/v1"):
+            continue
+        for method in sorted(getattr(route, "methods", ()) - {"HEAD", "OPTIONS"}):
+            name = f"{method} {path[len('/api/v1'):]}"
+            if name not in covered:
+                routes.append(name)
+    return routes
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Scenarios whose p95 latency grew or throughput fell by more than tolerance"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        p95, previous_p95 = result["latency_ms"]["p95"], previous["latency_ms"]["p95"]
+        if previous_p95 and p95 > previous_p95 * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous_p95}ms -> {p95}ms")
+        rps, previous_rps = result["throughput_rps"], previous["throughput_rps"]
+        if previous_rps and rps < previous_rps * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous_rps}/s -> {rps}/s")
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmarks(args) -> dict:
+    import httpx
+    from sqlalchemy import event, func
+    from sqlmodel import Session, select
+
+    from app.db.database import async_engine, create_db_and_tables, engine
+    from app.schemas.adoption import Adoption
+    from app.schemas.animal import Animal
+    from app.services.counter_service import ensure_counters
+    from app.services.image_variants import shutdown_variant_workers
+    from main import app
+
+    # Statement logging would dominate every measurement
+    engine.echo = False
+    async_engine.echo = False
+    create_db_and_tables()
+    ensure_counters(engine)
+    event.listen(engine, "before_cursor_execute", _count_query)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count_query)
+
+    with Session(engine) as session:
+        max_animal_id = session.exec(select(func.max(Animal.id))).one() or 1
+        max_adoption_id = session.exec(select(func.max(Adoption.id))).one() or 1
+        animals = session.exec(select(func.count(Animal.id))).one()
+        adoptions = session.exec(select(func.count(Adoption.id))).one()
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", limits=limits) as client:
+            for name in names:
+                scenario = SCENARIOS[name]
+                ctx = Context(random.Random(args.seed), max_animal_id, max_adoption_id)
+                if scenario.targets:
+                    ctx.targets[scenario.targets] = _create_targets(
+                        engine, scenario.targets, args.requests * scenario.targets_per_request
+                    )
+                else:
+                    warmup = Context(random.Random(args.seed + 1), max_animal_id, max_adoption_id)
+                    for _ in range(args.warmup):
+                        method, url, kwargs = scenario.build(warmup)
+                        await client.request(method, url, **kwargs)
+                results[name] = await run_scenario(client, ctx, scenario, args.requests, args.concurrency)
+                summary = results[name]
+                print(f"{name:28} {summary['throughput_rps']:>9.1f} req/s  "
+                      f"p50 {summary['latency_ms']['p50']:>8.2f}ms  p95 {summary['latency_ms']['p95']:>8.2f}ms  "
+                      f"p99 {summary['latency_ms']['p99']:>8.2f}ms  {summary['queries_per_request']:>5.1f} q/req  "
+                      f"{summary['status_codes']}")
+    finally:
+        shutdown_variant_workers()
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "animals": animals,
+            "adoptions": adoptions,
+            "requests_per_scenario": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "uncovered_routes": uncovered_routes(app),
+        },
+        "scenarios": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every /api/v1 route with concurrent clients")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///benchmark.db"))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per read-only scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", dest="scenarios", action="append", choices=list(SCENARIOS),
+                        help="Run only this scenario; repeat for several")
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    # The application engines read DATABASE_URL on import
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    results = asyncio.run(run_benchmarks(args))
+
+    output = args.output or RESULTS_DIRECTORY / f"{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {output}")
+    if results["meta"]["uncovered_routes"]:
+        print(f"Routes without a scenario: {', '.join(results['meta']['uncovered_routes'])}")
+
+    if args.compare:
+        regressions = compare_results(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Seed a database with synthetic animals and adoption applications for benchmarking.
+
+    python -m benchmarks.seed --scale 100k --database-url sqlite:///bench.db
+
+The same --scale and --seed always produce the same rows, so runs against
+different releases compare like with like.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Named sizes accepted by --scale; any integer works too
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+# Adoption applications generated per animal
+ADOPTIONS_PER_ANIMAL = 0.5
+SEED_BATCH_SIZE = 5_000
+
+_TYPES = {
+    "Dog": (0.45, ["Labrador Retriever", "German Shepherd", "Beagle", "Poodle", "Mixed"]),
+    "Cat": (0.35, ["Domestic Shorthair", "Siamese", "Maine Coon", "Persian", "Mixed"]),
+    "Bird": (0.08, ["Budgerigar", "Cockatiel", "Canary"]),
+    "Rabbit": (0.07, ["Holland Lop", "Mini Rex", "Lionhead"]),
+    "Hamster": (0.03, ["Syrian", "Dwarf"]),
+    "Turtle": (0.02, ["Red-eared Slider", "Box Turtle"]),
+}
+_SYLLABLES = ["ba", "bel", "bu", "char", "co", "da", "dex", "lu", "ma", "max", "mil", "no", "pep", "ro", "sky", "zo"]
+_WORDS = [
+    "friendly", "playful", "calm", "shy", "energetic", "loves", "walks", "cuddles", "treats", "garden",
+    "children", "quiet", "home", "gentle", "curious", "trained", "indoor", "outdoor", "senior", "young",
+]
+_HEALTH = ["Healthy", "Healthy", "Healthy", "Vaccinated", "Needs medication", "Recovering"]
+_HOUSING = ["HOUSE", "APARTMENT", "CONDO", "MOBILE_HOME", "OTHER"]
+_OWNERSHIP = ["OWN", "RENT", "OTHER"]
+
+
+def parse_scale(value: str) -> int:
+    """Animal count for a named scale such as 100k, or a plain integer"""
+    value = value.strip().lower()
+    if value in SCALES:
+        return SCALES[value]
+    try:
+        return int(value.replace("_", ""))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected one of {', '.join(SCALES)} or an integer")
+
+
+def _animal_rows(rng: random.Random, count: int, now: datetime):
+    types = list(_TYPES)
+    weights = [weight for weight, _ in _TYPES.values()]
+    for _ in range(count):
+        animal_type = rng.choices(types, weights)[0]
+        created_at = now - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+        yield {
+            "name": "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize(),
+            "type": animal_type,
+            "age": round(rng.uniform(0.2, 15), 1),
+            "breed": rng.choice(_TYPES[animal_type][1]),
+            "gender": rng.choice(["Male", "Female", None]),
+            "health_status": rng.choice(_HEALTH),
+            "description": " ".join(rng.choices(_WORDS, k=rng.randint(8, 30))).capitalize() + ".",
+            "image_path": None,
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+            "is_adopted": False,
+        }
+
+
+def _adoption_row(rng: random.Random, animal_id: int, status: str, created_at: datetime, now: datetime):
+    decided_at = None
+    if status != "Pending":
+        decided_at = min(created_at + timedelta(seconds=rng.randrange(14 * 24 * 3600)), now)
+    return {
+        "full_name": f"Applicant {rng.randrange(10 ** 6)}",
+        "email": f"applicant{rng.randrange(10 ** 6)}@example.com",
+        "phone": f"555-{rng.randrange(10 ** 4):04d}",
+        "address": f"{rng.randint(1, 9999)} {rng.choice(_WORDS).capitalize()} Street",
+        "housing_situation": rng.choice(_HOUSING),
+        "home_ownership": rng.choice(_OWNERSHIP),
+        "has_other_pets": rng.choice([True, False, None]),
+        "previous_pet_experience": rng.choice([None, " ".join(rng.choices(_WORDS, k=8))]),
+        "adoption_reason": " ".join(rng.choices(_WORDS, k=rng.randint(5, 20))),
+        "animal_id": animal_id,
+        "created_at": created_at,
+        "status": status,
+        "decided_at": decided_at,
+    }
+
+
+def seed_database(engine, animals: int, seed: int = 42, adoptions_per_animal: float = ADOPTIONS_PER_ANIMAL) -> dict:
+    """
+    Replace the animals and adoptions in the database with synthetic rows.
+
+    Roughly adoptions_per_animal applications are generated per animal; an
+    approved application marks its animal adopted. Counters and daily
+    statistics are rebuilt afterwards so the statistics endpoints see the
+    new data.
+    """
+    from sqlalchemy import delete, insert
+    from sqlmodel import Session
+
+    from app.db.database import run_migrations
+    from app.db.search import create_search_indexes
+    from app.schemas.adoption import Adoption
+    from app.schemas.animal import Animal
+    from app.services.counter_service import CounterService
+    from app.services.daily_stat_service import DailyStatService
+
+    run_migrations(engine)
+    create_search_indexes(engine)
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    report = {"animals": 0, "adoptions": 0}
+
+    with Session(engine) as session:
+        session.execute(delete(Adoption))
+        session.execute(delete(Animal))
+        session.commit()
+
+        next_id = 1
+        rows = _animal_rows(rng, animals, now)
+        while report["animals"] < animals:
+            batch = [row for _, row in zip(range(SEED_BATCH_SIZE), rows)]
+            adoptions = []
+            for offset, row in enumerate(batch):
+                if rng.random() >= adoptions_per_animal:
+                    continue
+                status = rng.choices(["Pending", "Approved", "Rejected"], [0.4, 0.35, 0.25])[0]
+                row["is_adopted"] = status == "Approved"
+                applied_at = row["created_at"] + timedelta(seconds=rng.randrange(60 * 24 * 3600))
+                adoptions.append(_adoption_row(rng, next_id + offset, status, min(applied_at, now), now))
+            session.execute(insert(Animal), [dict(row, id=next_id + offset) for offset, row in enumerate(batch)])
+            if adoptions:
+                session.execute(insert(Adoption), adoptions)
+            session.commit()
+            next_id += len(batch)
+            report["animals"] += len(batch)
+            report["adoptions"] += len(adoptions)
+
+        CounterService(session).rebuild()
+        DailyStatService(session).backfill()
+
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            # Explicit ids leave the sequence behind
+            connection.exec_driver_sql(
+                "SELECT setval(pg_get_serial_sequence('animal', 'id'), (SELECT max(id) FROM animal))"
+            )
+        # Fresh planner statistics, as a long-running database would have
+        connection.exec_driver_sql("ANALYZE")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a benchmark database with synthetic shelter data")
+    parser.add_argument("--scale", type=parse_scale, default=SCALES["1k"], help="1k, 100k, 1m or a number of animals")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed yields the same rows")
+    parser.add_argument("--adoptions-per-animal", type=float, default=ADOPTIONS_PER_ANIMAL)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///benchmark.db"))
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from sqlalchemy import create_engine
+
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    report = seed_database(engine, args.scale, args.seed, args.adoptions_per_animal)
+    print(f"Seeded {report['animals']} animal(s) and {report['adoptions']} adoption(s) "
+          f"in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
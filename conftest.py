@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+# The application engine reads DATABASE_URL on import; tests use their own SQLite databases
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "summer_shelter_test.db"))
+
+from sqlmodel import create_engine
+import pytest
+
+from app.db.database import run_migrations
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A freshly migrated SQLite database for one test; files override it to seed their own rows"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'shelter.db'}", connect_args={"check_same_thread": False})
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
@@ -1,11 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 import os
 from pathlib import Path
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
+from app.api.images import ImageFiles
+from app.api.middleware import (
+    MetricsMiddleware, QueryDiagnosticsMiddleware, ReadYourWritesMiddleware, UploadSizeLimitMiddleware,
+)
 from app.api.v1.router import api_router
-from app.db.database import create_db_and_tables
+from app.db.database import PRIMARY_READ_COOKIE, READ_YOUR_WRITES_SECONDS, create_db_and_tables, engine, replicas
+from app.services.bulk_import_service import BULK_IMPORT_MAX_BYTES
+from app.services.change_feed import start_change_feed, stop_change_feed
+from app.services.counter_service import ensure_counters
+from app.services.daily_stat_service import ensure_daily_stats
+from app.services.image_storage import MAX_IMAGE_UPLOAD_BYTES
+from app.services.image_variants import shutdown_variant_workers
+from app.services.job_queue import start_job_workers, stop_job_workers
+from app.services.jobs import ensure_idempotency_pruning
 
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = Path("uploads")
@@ -17,6 +30,7 @@ app = FastAPI(
     title="Summer Shelter API",
     description="API for managing animal shelter data",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -34,8 +48,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for accessing uploaded images
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Reject oversized uploads early; the extra room covers the other form fields
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=MAX_IMAGE_UPLOAD_BYTES + 256 * 1024,
+    path_limits={"/api/v1/animals/bulk": BULK_IMPORT_MAX_BYTES},
+)
+
+# Clients that just wrote read from the primary until the replicas catch up
+if replicas:
+    app.add_middleware(ReadYourWritesMiddleware, cookie_name=PRIMARY_READ_COOKIE, max_age=READ_YOUR_WRITES_SECONDS)
+
+# Slow-query and N+1 logging for requests that send a valid diagnostics token
+app.add_middleware(QueryDiagnosticsMiddleware)
+
+# Outermost, so the recorded latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
+# Mount uploaded images with ETag, Range and long-lived cache headers
+app.mount("/uploads", ImageFiles(directory="uploads"), name="uploads")
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
@@ -44,6 +75,25 @@ app.include_router(api_router, prefix="/api/v1")
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    ensure_counters(engine)
+    ensure_daily_stats(engine)
+    ensure_idempotency_pruning(engine)
+    start_job_workers(engine)
+    start_change_feed(engine)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_change_feed()
+    # Jobs in progress may still be using the variant process pool
+    stop_job_workers()
+    shutdown_variant_workers()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics for requests, queries and the connection pools"""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/")
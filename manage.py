@@ -0,0 +1,161 @@
+import argparse
+import sys
+import time
+from datetime import date
+
+from sqlmodel import Session
+
+from app.db.database import create_db_and_tables, engine, run_migrations
+
+
+def migrate(args):
+    """Upgrade the database schema to the latest migration, or to --revision"""
+    run_migrations(engine, args.revision)
+    print(f"✅ Database migrated to {args.revision}")
+    return 0
+
+
+def rebuild_counters(args):
+    """Recompute the statistics counters from scratch and report any drift"""
+    from app.services.counter_service import CounterService
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        drift = CounterService(session).rebuild(dry_run=args.dry_run)
+
+    if not drift:
+        print("✅ Counters match the animal and adoption tables")
+        return 0
+
+    print(f"{'Would correct' if args.dry_run else 'Corrected'} {len(drift)} counter(s):")
+    for key, (stored, expected) in drift.items():
+        print(f"  {key}: stored={stored} expected={expected} drift={stored - expected:+d}")
+    return 1 if args.dry_run else 0
+
+
+def backfill_daily_stats(args):
+    """Recompute the daily statistics rollup from the animal and adoption tables"""
+    from app.services.daily_stat_service import DailyStatService
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        rows = DailyStatService(session).backfill(args.start, args.end)
+    span = f"{args.start or 'the beginning'} to {args.end or 'today'}"
+    print(f"✅ Rebuilt {rows} daily statistics row(s) from {span}")
+    return 0
+
+
+def dedupe_images(args):
+    """Rename stored images to content-addressed names and remove duplicate copies"""
+    from app.services.image_storage import deduplicate_images
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        report = deduplicate_images(session, dry_run=args.dry_run, delete_orphans=args.delete_orphans)
+
+    print(f"Scanned {report['files']} file(s): {report['renamed']} renamed, "
+          f"{report['duplicates']} duplicate(s), {report['orphans']} orphan(s) removed")
+    print(f"{'Would reclaim' if args.dry_run else 'Reclaimed'} {report['bytes_reclaimed']} bytes")
+    return 0
+
+
+def generate_image_variants(args):
+    """Generate thumbnail, card and full variants for images already on disk"""
+    from app.services.image_variants import backfill_variants, shutdown_variant_workers
+    from app.services.image_storage import UPLOAD_DIRECTORY
+
+    image_paths = [
+        f"uploads/animals/{file_path.name}"
+        for file_path in sorted(UPLOAD_DIRECTORY.iterdir())
+        if file_path.is_file() and not file_path.name.startswith(".")
+    ]
+    try:
+        report = backfill_variants(image_paths, force=args.force)
+    finally:
+        shutdown_variant_workers()
+
+    print(f"Processed {report['images']} image(s): {report['variants']} variant(s) written, "
+          f"{report['failed']} failed")
+    return 1 if report["failed"] else 0
+
+
+def run_jobs(args):
+    """Run background jobs until interrupted, or drain the due ones with --once"""
+    import app.services.jobs  # noqa: F401
+    from app.services.image_variants import shutdown_variant_workers
+    from app.services.job_queue import JobWorkers, run_pending_jobs
+
+    create_db_and_tables()
+    try:
+        if args.once:
+            report = run_pending_jobs(engine)
+            print(f"Ran {sum(report.values())} job(s): {report['done']} done, "
+                  f"{report['retried']} to retry, {report['dead']} dead")
+            return 1 if report["dead"] else 0
+
+        workers = JobWorkers(engine, args.workers)
+        workers.start()
+        print(f"Running background jobs with {args.workers} worker(s); press Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            workers.stop()
+        return 0
+    finally:
+        shutdown_variant_workers()
+
+
+def retry_dead_jobs(args):
+    """Queue background jobs that ran out of attempts for another round"""
+    from app.services.job_queue import retry_dead_jobs as retry
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        retried = retry(session, args.kind)
+    print(f"Queued {retried} dead job(s) again")
+    return 0
+
+
+def main(argv=None):
+    """Administrative commands for the Summer Shelter backend"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help=migrate.__doc__)
+    migrate_parser.add_argument("--revision", default="head", help="Target Alembic revision (default: head)")
+    migrate_parser.set_defaults(handler=migrate)
+
+    rebuild = commands.add_parser("rebuild-counters", help=rebuild_counters.__doc__)
+    rebuild.add_argument("--dry-run", action="store_true", help="Only report drift, do not rewrite the counters")
+    rebuild.set_defaults(handler=rebuild_counters)
+
+    daily_stats = commands.add_parser("backfill-daily-stats", help=backfill_daily_stats.__doc__)
+    daily_stats.add_argument("--from", dest="start", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD)")
+    daily_stats.add_argument("--to", dest="end", type=date.fromisoformat, help="Last day to rebuild (YYYY-MM-DD)")
+    daily_stats.set_defaults(handler=backfill_daily_stats)
+
+    dedupe = commands.add_parser("dedupe-images", help=dedupe_images.__doc__)
+    dedupe.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    dedupe.add_argument("--delete-orphans", action="store_true", help="Also remove images no animal references")
+    dedupe.set_defaults(handler=dedupe_images)
+
+    variants = commands.add_parser("generate-image-variants", help=generate_image_variants.__doc__)
+    variants.add_argument("--force", action="store_true", help="Regenerate variants that already exist")
+    variants.set_defaults(handler=generate_image_variants)
+
+    jobs = commands.add_parser("run-jobs", help=run_jobs.__doc__)
+    jobs.add_argument("--workers", type=int, default=2, help="Worker threads (default: 2)")
+    jobs.add_argument("--once", action="store_true", help="Run the jobs that are due now, then exit")
+    jobs.set_defaults(handler=run_jobs)
+
+    retry_dead = commands.add_parser("retry-dead-jobs", help=retry_dead_jobs.__doc__)
+    retry_dead.add_argument("--kind", help="Only retry jobs of this kind, e.g. images.generate_variants")
+    retry_dead.set_defaults(handler=retry_dead_jobs)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlmodel import SQLModel
+
+# Import every table so autogenerate sees the full schema
+import app.schemas.adoption  # noqa: F401
+import app.schemas.animal  # noqa: F401
+import app.schemas.change_event  # noqa: F401
+import app.schemas.counter  # noqa: F401
+import app.schemas.daily_stat  # noqa: F401
+import app.schemas.idempotency  # noqa: F401
+import app.schemas.job  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = SQLModel.metadata
+
+
+def run_migrations_offline():
+    """Emit the migration SQL for DATABASE_URL without connecting"""
+    from app.db.database import DATABASE_URL
+
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations on the connection handed over by run_migrations, or a new one"""
+    connection = config.attributes.get("connection")
+    if connection is None:
+        from app.db.database import engine
+
+        with engine.connect() as connection:
+            _run(connection)
+    else:
+        _run(connection)
+
+
+def _run(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite can only alter tables by copying them
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,61 @@
+"""Baseline schema as created by create_all before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "animal",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("age", sa.Float(), nullable=False),
+        sa.Column("breed", sa.String(), nullable=False),
+        sa.Column("gender", sa.String(), nullable=True),
+        sa.Column("health_status", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("image_path", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_adopted", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "adoption",
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("phone", sa.String(), nullable=False),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.Column(
+            "housing_situation",
+            sa.Enum("HOUSE", "APARTMENT", "CONDO", "MOBILE_HOME", "OTHER", name="housingsituation"),
+            nullable=False,
+        ),
+        sa.Column("home_ownership", sa.Enum("OWN", "RENT", "OTHER", name="homeownership"), nullable=False),
+        sa.Column("has_other_pets", sa.Boolean(), nullable=True),
+        sa.Column("previous_pet_experience", sa.String(), nullable=True),
+        sa.Column("adoption_reason", sa.String(), nullable=False),
+        sa.Column("animal_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["animal_id"], ["animal.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("adoption")
+    op.drop_table("animal")
+    sa.Enum(name="homeownership").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="housingsituation").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""Indexes for the list, search, adoption lookup and statistics queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    # Keyset pagination and the default search ordering, new admissions count
+    ("ix_animal_created_at_id", "animal", ["created_at", "id"]),
+    # Type filters, alone or with is_adopted, in list order; type distribution
+    ("ix_animal_type_is_adopted_created_at", "animal", ["type", "is_adopted", "created_at", "id"]),
+    # is_adopted filter in list order; adopted count
+    ("ix_animal_is_adopted_created_at", "animal", ["is_adopted", "created_at", "id"]),
+    # Reference counting of stored images
+    ("ix_animal_image_path", "animal", ["image_path"]),
+    # Applications for an animal, optionally by status
+    ("ix_adoption_animal_id_status", "adoption", ["animal_id", "status"]),
+    # Applications by status; status counts
+    ("ix_adoption_status_created_at", "adoption", ["status", "created_at", "id"]),
+    # Keyset pagination of applications
+    ("ix_adoption_created_at_id", "adoption", ["created_at", "id"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,20 @@
+"""Index animal.updated_at for the conditional GET watermark
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_animal_updated_at", "animal", ["updated_at"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_animal_updated_at", table_name="animal", if_exists=True)
@@ -0,0 +1,43 @@
+"""Row versions, one approved application per animal and idempotency keys
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+APPROVED = sa.text("status = 'Approved'")
+
+
+def upgrade():
+    for table in ("animal", "adoption"):
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    # A second concurrent approval for the same animal fails instead of both committing
+    op.create_index(
+        "uq_adoption_animal_id_approved", "adoption", ["animal_id"], unique=True,
+        postgresql_where=APPROVED, sqlite_where=APPROVED, if_not_exists=True,
+    )
+    op.create_table(
+        "idempotency_key",
+        sa.Column("scope", sa.String(length=64), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("resource_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", "key"),
+    )
+
+
+def downgrade():
+    op.drop_table("idempotency_key")
+    op.drop_index("uq_adoption_animal_id_approved", table_name="adoption", if_exists=True)
+    for table in ("adoption", "animal"):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("version")
@@ -0,0 +1,39 @@
+"""Daily statistics rollup and adoption decision times
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+Applications decided before this revision have no recorded decision time;
+they are given their application time, the closest value available, so the
+rollup backfill still counts them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("adoption") as batch:
+        batch.add_column(sa.Column("decided_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE adoption SET decided_at = created_at WHERE status IN ('Approved', 'Rejected')")
+    op.create_table(
+        "daily_stat",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("animal_type", sa.String(), nullable=False),
+        sa.Column("intakes", sa.Integer(), nullable=False),
+        sa.Column("applications", sa.Integer(), nullable=False),
+        sa.Column("approvals", sa.Integer(), nullable=False),
+        sa.Column("rejections", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "animal_type"),
+    )
+
+
+def downgrade():
+    op.drop_table("daily_stat")
+    with op.batch_alter_table("adoption") as batch:
+        batch.drop_column("decided_at")
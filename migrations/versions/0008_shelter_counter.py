@@ -0,0 +1,31 @@
+"""Shelter counters
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+The counters table predates migrations, so databases created by create_all
+after it was added already have it, while older ones stamped as the
+baseline do not.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "shelter_counter",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table("shelter_counter")
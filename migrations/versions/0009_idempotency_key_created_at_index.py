@@ -0,0 +1,20 @@
+"""Index idempotency_key.created_at for pruning expired keys
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_idempotency_key_created_at", "idempotency_key", ["created_at"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_key_created_at", table_name="idempotency_key", if_exists=True)
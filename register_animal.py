@@ -1,3 +1,4 @@
+import argparse
 import requests
 import os
 
@@ -54,5 +55,53 @@ def register_animal():
         files["image"][1].close()  # Close the file if it was opened
 
 
+def register_animals_bulk(rows_path, images_path=None, batch_size=1000):
+    """
+    Register many animals at once from a CSV or NDJSON file.
+    
+    The file is streamed to the bulk import endpoint rather than read into
+    memory. CSV files need a header row with the same fields as the single
+    registration form; NDJSON files hold one JSON object per line. Rows can
+    name an image inside the zip given as images_path through an `image` column.
+    """
+    url = "http://localhost:8000/api/v1/animals/bulk"
+    params = {"batch_size": batch_size}
+    content_type = "text/csv" if rows_path.lower().endswith(".csv") else "application/x-ndjson"
+    
+    try:
+        with open(rows_path, "rb") as rows_file:
+            if images_path:
+                with open(images_path, "rb") as images_file:
+                    files = {
+                        "file": (os.path.basename(rows_path), rows_file, content_type),
+                        "images": (os.path.basename(images_path), images_file, "application/zip"),
+                    }
+                    response = requests.post(url, params=params, files=files)
+            else:
+                response = requests.post(url, params=params, data=rows_file, headers={"Content-Type": content_type})
+        
+        if response.status_code == 200:
+            result = response.json()
+            print(f"✅ Imported {result['inserted']} animal(s), {result['failed']} row(s) failed")
+            for error in result["errors"]:
+                print(f"  Row {error['row']}: {'; '.join(error['errors'])}")
+            if result.get("errors_truncated"):
+                print("  ... more errors not shown")
+        else:
+            print(f"❌ Error: Status code {response.status_code}")
+            print(response.json())
+    except Exception as e:
+        print(f"❌ An error occurred: {str(e)}")
+
+
 if __name__ == "__main__":
-    register_animal()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Register animals through the Summer Shelter API")
+    parser.add_argument("--bulk", metavar="FILE", help="CSV or NDJSON file of animals to import in one request")
+    parser.add_argument("--images", metavar="ZIP", help="Zip of images referenced by the rows' image column")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per database batch")
+    args = parser.parse_args()
+    
+    if args.bulk:
+        register_animals_bulk(args.bulk, args.images, args.batch_size)
+    else:
+        register_animal()
\ No newline at end of file
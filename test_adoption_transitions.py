@@ -0,0 +1,203 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlmodel import Session, select, update
+import pytest
+
+from app.schemas.adoption import Adoption, AdoptionCreate, AdoptionReviewItem, AdoptionUpdate
+from app.schemas.animal import Animal, AnimalCreate, AnimalUpdate
+from app.schemas.idempotency import IdempotencyKey
+from app.schemas.job import Job
+from app.services.adoption_service import AdoptionService
+from app.services.animal_service import AnimalService
+from app.services.counter_service import CounterService
+from app.services.idempotency_service import IDEMPOTENCY_KEY_TTL_HOURS
+from app.services.job_queue import run_pending_jobs
+from app.services.jobs import PRUNE_IDEMPOTENCY_KEYS, ensure_idempotency_pruning
+
+APPLICATION = dict(
+    full_name="Applicant", email="a@example.com", phone="555", address="Street",
+    housing_situation="House", home_ownership="Own", adoption_reason="Love",
+)
+
+
+@pytest.fixture
+def engine(engine):
+    with Session(engine) as session:
+        AnimalService(session).create_animal(AnimalCreate(
+            name="Rex", type="Dog", age=2, breed="Mixed", health_status="Healthy", description="Friendly",
+        ))
+    return engine
+
+
+def outcome(call):
+    try:
+        return call().id
+    except HTTPException as error:
+        return error.status_code
+
+
+def test_concurrent_applications_reserve_the_animal_once(engine):
+    def apply(_):
+        with Session(engine) as session:
+            return outcome(lambda: AdoptionService(session).create_adoption(AdoptionCreate(animal_id=1, **APPLICATION)))
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(apply, range(16)))
+    assert results.count(400) == 15
+    assert len(results) == 16
+    with Session(engine) as session:
+        assert CounterService(session).rebuild(dry_run=True) == {}
+
+
+def test_only_one_application_per_animal_is_approved(engine):
+    with Session(engine) as session:
+        # Two pending applications for one animal, as left by data from before reservations
+        session.add_all([Adoption(animal_id=1, **APPLICATION), Adoption(animal_id=1, **APPLICATION)])
+        session.commit()
+
+    def approve(adoption_id):
+        with Session(engine) as session:
+            return outcome(lambda: AdoptionService(session).approve_adoption(adoption_id))
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(approve, [1, 2]))
+    # The loser was either rejected by the winner's approval or lost the race for the animal
+    assert sorted(results) in ([1, 400], [2, 400], [1, 409], [2, 409])
+
+
+def test_rejection_releases_the_animal(engine):
+    with Session(engine) as session:
+        service = AdoptionService(session)
+        adoption = service.create_adoption(AdoptionCreate(animal_id=1, **APPLICATION))
+        assert session.get(Animal, 1).is_adopted
+        service.reject_adoption(adoption.id)
+        assert not session.get(Animal, 1).is_adopted
+        assert CounterService(session).rebuild(dry_run=True) == {}
+
+
+def test_update_cannot_approve_for_an_adopted_animal(engine):
+    with Session(engine) as session:
+        animals, service = AnimalService(session), AdoptionService(session)
+        animals.create_animal(AnimalCreate(name="Ivy", type="Cat", age=1, breed="Mixed", health_status="Healthy", description="Calm"))
+        service.approve_adoption(service.create_adoption(AdoptionCreate(animal_id=1, **APPLICATION)).id)
+        other = service.create_adoption(AdoptionCreate(animal_id=2, **APPLICATION)).id
+        with pytest.raises(HTTPException) as error:
+            service.update_adoption(other, AdoptionUpdate(animal_id=1, status="Approved"))
+        assert error.value.status_code == 400
+        assert (service.get_adoption(other).animal_id, session.get(Animal, 2).is_adopted) == (2, True)
+
+        # Two holders of one animal, as left by data from before reservations, hit the unique index instead
+        session.add_all([Adoption(animal_id=2, status="Approved", **APPLICATION)])
+        session.commit()
+        with pytest.raises(HTTPException) as error:
+            service.update_adoption(other, AdoptionUpdate(status="Approved"))
+        assert error.value.status_code == 409
+
+
+def test_update_moves_and_releases_reservations(engine):
+    with Session(engine) as session:
+        AnimalService(session).create_animal(AnimalCreate(
+            name="Ivy", type="Cat", age=1, breed="Mixed", health_status="Healthy", description="Calm",
+        ))
+        service = AdoptionService(session)
+        adoption = service.create_adoption(AdoptionCreate(animal_id=1, **APPLICATION))
+        service.update_adoption(adoption.id, AdoptionUpdate(animal_id=2))
+        assert [session.get(Animal, i).is_adopted for i in (1, 2)] == [False, True]
+        service.update_adoption(adoption.id, AdoptionUpdate(status="Rejected"))
+        assert [session.get(Animal, i).is_adopted for i in (1, 2)] == [False, False]
+        service.update_adoption(adoption.id, AdoptionUpdate(status="Approved", animal_id=1))
+        assert [session.get(Animal, i).is_adopted for i in (1, 2)] == [True, False]
+        assert CounterService(session).rebuild(dry_run=True) == {}
+
+
+def test_idempotency_key_replays_the_application(engine):
+    with Session(engine) as session:
+        service = AdoptionService(session)
+        first = service.create_adoption(AdoptionCreate(animal_id=1, **APPLICATION), "key-1")
+        assert service.create_adoption(AdoptionCreate(animal_id=1, **APPLICATION), "key-1").id == first.id
+        with pytest.raises(HTTPException) as error:
+            service.create_adoption(AdoptionCreate(animal_id=1, **dict(APPLICATION, full_name="Other")), "key-1")
+        assert error.value.status_code == 422
+
+
+def test_expired_idempotency_keys_stop_replaying_and_are_pruned(engine):
+    def age_keys(*keys):
+        expired = datetime.utcnow() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS, minutes=1)
+        with Session(engine) as session:
+            session.exec(update(IdempotencyKey).where(IdempotencyKey.key.in_(keys)).values(created_at=expired))
+            session.commit()
+
+    with Session(engine) as session:
+        for name in ("Bo", "Max"):
+            AnimalService(session).create_animal(AnimalCreate(
+                name=name, type="Cat", age=1, breed="Mixed", health_status="Healthy", description="Calm",
+            ))
+        service = AdoptionService(session)
+        first_id = service.create_adoption(AdoptionCreate(animal_id=1, **APPLICATION), "key-1").id
+        service.create_adoption(AdoptionCreate(animal_id=2, **APPLICATION), "key-2")
+    age_keys("key-1", "key-2")
+
+    # Past the window the key is new again, even with a different body
+    with Session(engine) as session:
+        again = AdoptionService(session).create_adoption(
+            AdoptionCreate(animal_id=3, **APPLICATION), "key-1",
+        )
+        assert again.animal_id == 3 and again.id != first_id
+
+    # Keys nobody sends again are deleted by the pruning job, which queues its next run
+    ensure_idempotency_pruning(engine)
+    ensure_idempotency_pruning(engine)
+    assert run_pending_jobs(engine)["done"] == 1
+    with Session(engine) as session:
+        assert session.exec(select(IdempotencyKey.key)).all() == ["key-1"]
+        assert len(session.exec(select(Job).where(Job.kind == PRUNE_IDEMPOTENCY_KEYS)).all()) == 1
+
+
+def test_update_with_stale_version_is_rejected(engine):
+    with Session(engine) as session:
+        service = AnimalService(session)
+        assert service.update_animal(1, AnimalUpdate(name="Max"), expected_version=1).version == 2
+        with pytest.raises(HTTPException) as error:
+            service.update_animal(1, AnimalUpdate(name="Bo"), expected_version=1)
+        assert error.value.status_code == 412
+
+
+def test_batch_review_uses_a_fixed_number_of_statements(engine):
+    with Session(engine) as session:
+        animals = AnimalService(session)
+        for name in ("Max", "Bo", "Ivy"):
+            animals.create_animal(AnimalCreate(
+                name=name, type="Cat", age=1, breed="Mixed", health_status="Healthy", description="Calm",
+            ))
+        service = AdoptionService(session)
+        approve, reject = [service.create_adoption(AdoptionCreate(animal_id=animal_id, **APPLICATION)).id for animal_id in (1, 2)]
+        # A second pending application for animal 1, as left by data from before reservations
+        rival = Adoption(animal_id=1, **APPLICATION)
+        session.add(rival)
+        session.commit()
+        rival_id = rival.id
+        extra_ids = [service.create_adoption(AdoptionCreate(animal_id=animal_id, **APPLICATION)).id for animal_id in (3, 4)]
+
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    with Session(engine) as session:
+        result = AdoptionService(session).review_adoptions([
+            AdoptionReviewItem(adoption_id=approve, decision="approve"),
+            AdoptionReviewItem(adoption_id=reject, decision="reject"),
+            AdoptionReviewItem(adoption_id=404, decision="approve"),
+            *(AdoptionReviewItem(adoption_id=adoption_id, decision="reject") for adoption_id in extra_ids),
+        ])
+    event.remove(engine, "before_cursor_execute", capture)
+
+    outcomes = {item.adoption_id: item.outcome for item in result.items}
+    assert outcomes == {approve: "approved", reject: "rejected", 404: "not_found", **{i: "rejected" for i in extra_ids}}
+    assert result.auto_rejected == [rival_id]
+    assert len([statement for statement in statements if not statement.startswith(("BEGIN", "COMMIT"))]) <= 9
+    with Session(engine) as session:
+        assert [session.get(Animal, i).is_adopted for i in (1, 2, 3, 4)] == [True, False, False, False]
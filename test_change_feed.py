@@ -0,0 +1,111 @@
+from sqlmodel import Session, select
+import asyncio
+import json
+import pytest
+
+from app.schemas.adoption import AdoptionCreate
+from app.schemas.animal import AnimalCreate
+from app.schemas.change_event import ChangeEvent
+from app.services.adoption_service import AdoptionService
+from app.services.animal_service import AnimalService
+from app.services.change_feed import ANIMAL, UPDATED, ChangeFeed, record_changes, stream_changes
+
+ANIMAL_DATA = dict(name="Rex", type="Dog", age=2, breed="Mixed", health_status="Healthy", description="Friendly")
+APPLICATION = dict(
+    full_name="Applicant", email="a@example.com", phone="555", address="Street",
+    housing_situation="House", home_ownership="Own", adoption_reason="Love",
+)
+
+
+def record(engine, count, commit=True):
+    with Session(engine) as session:
+        record_changes(session, [(ANIMAL, animal_id, UPDATED) for animal_id in range(1, count + 1)])
+        session.commit() if commit else session.rollback()
+
+
+async def take(stream, count):
+    """The ids of the next count events, skipping the retry hint and heartbeats"""
+    ids = []
+    async for message in stream:
+        if message.startswith("id: "):
+            ids.append(json.loads(message.split("data: ", 1)[1])["id"])
+            if len(ids) == count:
+                return ids
+    return ids
+
+
+def test_mutations_record_events_only_when_they_commit(engine):
+    with Session(engine) as session:
+        animal = AnimalService(session).create_animal(AnimalCreate(**ANIMAL_DATA))
+        AnimalService(session).create_animals_bulk([AnimalCreate(**ANIMAL_DATA)] * 2)
+        adoption = AdoptionService(session).create_adoption(AdoptionCreate(animal_id=animal.id, **APPLICATION))
+        AdoptionService(session).approve_adoption(adoption.id)
+    record(engine, 5, commit=False)
+
+    with Session(engine) as session:
+        events = [(e.entity, e.entity_id, e.action) for e in session.exec(select(ChangeEvent).order_by(ChangeEvent.id))]
+    assert events == [
+        ("animal", 1, "created"), ("animal", 2, "created"), ("animal", 3, "created"),
+        ("adoption", 1, "created"), ("animal", 1, "adopted"), ("adoption", 1, "approved"),
+    ]
+
+
+def test_stream_resumes_after_last_event_id_then_goes_live(engine):
+    record(engine, 3)
+
+    async def scenario():
+        feed = ChangeFeed(engine)
+        feed.start()
+        try:
+            stream = stream_changes(feed, feed.subscribe(), last_event_id=1, heartbeat_seconds=0.05)
+            replayed = await take(stream, 2)
+            await asyncio.to_thread(record, engine, 2)
+            feed.wake()
+            live = await take(stream, 2)
+            await stream.aclose()
+            return replayed, live
+        finally:
+            feed.stop()
+
+    assert asyncio.run(scenario()) == ([2, 3], [4, 5])
+
+
+def test_slow_clients_catch_up_from_the_table(engine):
+    async def scenario():
+        # Polled by hand rather than started, so the overflow happens at a known point
+        feed = ChangeFeed(engine, queue_size=4)
+        subscription = feed.subscribe()
+        stream = stream_changes(feed, subscription, heartbeat_seconds=0.05)
+        await asyncio.to_thread(record, engine, 50)
+        await asyncio.to_thread(feed.poll)
+        await asyncio.sleep(0)
+        assert subscription.lagging and subscription.queue.qsize() == 1
+        ids = await take(stream, 50)
+        await stream.aclose()
+        return ids
+
+    assert asyncio.run(scenario()) == list(range(1, 51))
+
+
+def test_stale_last_event_id_gets_a_reset(engine):
+    record(engine, 3)
+    with Session(engine) as session:
+        session.delete(session.get(ChangeEvent, 1))
+        session.delete(session.get(ChangeEvent, 2))
+        session.commit()
+
+    async def scenario():
+        feed = ChangeFeed(engine)
+        feed.start()
+        try:
+            stream = stream_changes(feed, feed.subscribe(), last_event_id=0)
+            messages = [await stream.__anext__() for _ in range(3)]
+            await stream.aclose()
+            return messages
+        finally:
+            feed.stop()
+
+    retry, reset, replayed = asyncio.run(scenario())
+    assert retry.startswith("retry: ")
+    assert reset.startswith("event: reset")
+    assert replayed.startswith("id: 3\n")
@@ -0,0 +1,82 @@
+from datetime import date, datetime, timedelta
+from sqlmodel import Session, select
+import pytest
+
+from app.schemas.adoption import AdoptionCreate, AdoptionReviewItem, AdoptionUpdate
+from app.schemas.animal import AnimalCreate, AnimalUpdate
+from app.schemas.daily_stat import DailyStat
+from app.services.adoption_service import AdoptionService
+from app.services.animal_service import AnimalService
+from app.services.daily_stat_service import DailyStatService
+from app.services.statistics_service import StatisticsService
+
+APPLICATION = dict(
+    full_name="Applicant", email="a@example.com", phone="555", address="Street",
+    housing_situation="House", home_ownership="Own", adoption_reason="Love",
+)
+
+
+def animal(animal_type="Dog"):
+    return AnimalCreate(name="Rex", type=animal_type, age=2, breed="Mixed", health_status="Healthy", description="Friendly")
+
+
+def stored(session):
+    return {
+        (stat.day, stat.animal_type): {metric: getattr(stat, metric) for metric in ("intakes", "applications", "approvals", "rejections")}
+        for stat in session.exec(select(DailyStat)).all()
+        if stat.intakes or stat.applications or stat.approvals or stat.rejections
+    }
+
+
+def test_incremental_rollup_matches_a_backfill(engine):
+    with Session(engine) as session:
+        animals, adoptions = AnimalService(session), AdoptionService(session)
+        dog, cat, bird = (animals.create_animal(animal(animal_type)) for animal_type in ("Dog", "Cat", "Bird"))
+        animals.create_animals_bulk([animal("Cat"), animal("Rabbit")])
+        animals.update_animal(bird.id, AnimalUpdate(type="Parrot"))
+        first = adoptions.create_adoption(AdoptionCreate(animal_id=dog.id, **APPLICATION))
+        second = adoptions.create_adoption(AdoptionCreate(animal_id=cat.id, **APPLICATION))
+        third = adoptions.create_adoption(AdoptionCreate(animal_id=bird.id, **APPLICATION))
+        adoptions.approve_adoption(first.id)
+        adoptions.review_adoptions([AdoptionReviewItem(adoption_id=second.id, decision="reject")])
+        adoptions.update_adoption(third.id, AdoptionUpdate(status="Approved"))
+        adoptions.reject_adoption(third.id)
+        adoptions.delete_adoption(second.id)
+        animals.delete_animal(cat.id)
+        # Changes of type take the animal's applications and decisions along
+        animals.update_animal(dog.id, AnimalUpdate(type="Wolf"))
+        animals.update_animal(bird.id, AnimalUpdate(type="Macaw", name="Polly"))
+
+        incremental = stored(session)
+        DailyStatService(session).backfill()
+        assert stored(session) == incremental
+
+    today = datetime.utcnow().date()
+    assert incremental == {
+        (today, "Wolf"): {"intakes": 1, "applications": 1, "approvals": 1, "rejections": 0},
+        (today, "Cat"): {"intakes": 1, "applications": 0, "approvals": 0, "rejections": 0},
+        (today, "Rabbit"): {"intakes": 1, "applications": 0, "approvals": 0, "rejections": 0},
+        (today, "Macaw"): {"intakes": 1, "applications": 1, "approvals": 0, "rejections": 1},
+    }
+
+
+def test_trends_bucket_the_rollup_and_fill_empty_periods(engine):
+    with Session(engine) as session:
+        session.add_all([
+            DailyStat(day=date(2026, 1, 5), animal_type="Dog", intakes=2),
+            DailyStat(day=date(2026, 1, 11), animal_type="Cat", intakes=1, applications=3),
+            DailyStat(day=date(2026, 1, 26), animal_type="Dog", approvals=1),
+            DailyStat(day=date(2026, 2, 2), animal_type="Dog", rejections=4),
+        ])
+        session.commit()
+
+        statistics = StatisticsService(session)
+        weekly = statistics.get_trends("week", date(2026, 1, 7), date(2026, 2, 1))
+        assert weekly["from"] == "2026-01-05"
+        assert [(point["period"], point["intakes"], point["applications"], point["approvals"]) for point in weekly["series"]] == [
+            ("2026-01-05", 3, 3, 0), ("2026-01-12", 0, 0, 0), ("2026-01-19", 0, 0, 0), ("2026-01-26", 0, 0, 1),
+        ]
+        monthly = statistics.get_trends("month", date(2026, 1, 1), date(2026, 2, 28), animal_type="Dog")
+        assert monthly["totals"] == {"intakes": 2, "applications": 0, "approvals": 1, "rejections": 4}
+        assert [point["period"] for point in monthly["series"]] == ["2026-01-01", "2026-02-01"]
+        assert len(statistics.get_trends("day", end=date(2026, 2, 2))["series"]) == 30
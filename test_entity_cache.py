@@ -0,0 +1,92 @@
+from sqlalchemy import insert
+from sqlmodel import Session
+from datetime import datetime
+import time
+import pytest
+
+from app.schemas.adoption import AdoptionCreate
+from app.schemas.animal import AnimalCreate, AnimalUpdate
+from app.schemas.change_event import ChangeEvent
+from app.services.adoption_service import AdoptionService
+from app.services.animal_service import AnimalService
+from app.services.change_feed import ChangeFeed
+from app.services.entity_cache import ENTITY_CACHES, EntityCache, adoption_cache, animal_cache
+
+ANIMAL_DATA = dict(name="Rex", type="Dog", age=2, breed="Mixed", health_status="Healthy", description="Friendly")
+APPLICATION = dict(
+    full_name="Applicant", email="a@example.com", phone="555", address="Street",
+    housing_situation="House", home_ownership="Own", adoption_reason="Love",
+)
+
+
+@pytest.fixture
+def engine(engine):
+    for cache in ENTITY_CACHES.values():
+        cache.clear()
+    return engine
+
+
+def test_reads_are_cached_until_a_mutation_commits(engine):
+    with Session(engine) as session:
+        animal_id = AnimalService(session).create_animal(AnimalCreate(**ANIMAL_DATA)).id
+        adoption_id = AdoptionService(session).create_adoption(AdoptionCreate(animal_id=animal_id, **APPLICATION)).id
+
+    with Session(engine) as session:
+        assert AnimalService(session).get_cached_animal(animal_id).name == "Rex"
+        assert AdoptionService(session).get_cached_adoption(adoption_id).status == "Pending"
+    assert animal_cache.get(animal_id)["name"] == "Rex"
+    assert adoption_cache.get(adoption_id)["status"] == "Pending"
+
+    with Session(engine) as session:
+        AnimalService(session).update_animal(animal_id, AnimalUpdate(name="Max"))
+        AdoptionService(session).approve_adoption(adoption_id)
+    assert animal_cache.get(animal_id) is None
+    assert adoption_cache.get(adoption_id) is None
+
+    with Session(engine) as session:
+        animal = AnimalService(session).get_cached_animal(animal_id)
+        assert (animal.name, animal.is_adopted) == ("Max", True)
+        assert AdoptionService(session).get_cached_adoption(adoption_id).status == "Approved"
+
+
+def test_changes_from_other_workers_invalidate_through_the_feed(engine):
+    with Session(engine) as session:
+        animal_id = AnimalService(session).create_animal(AnimalCreate(**ANIMAL_DATA)).id
+        AnimalService(session).get_cached_animal(animal_id)
+    feed = ChangeFeed(engine)
+    feed.last_id = 1
+
+    # Another worker's commit: the event is in the table but this process never saw the transaction
+    with Session(engine) as session:
+        session.execute(insert(ChangeEvent), [
+            {"entity": "animal", "entity_id": animal_id, "action": "updated", "created_at": datetime.utcnow()},
+        ])
+        session.commit()
+    assert animal_cache.get(animal_id) is not None
+    feed.poll()
+    assert animal_cache.get(animal_id) is None
+
+
+def test_fills_that_raced_an_invalidation_are_refused():
+    cache = EntityCache("test", max_entries=10, ttl_seconds=60, settle_seconds=0.5)
+    loaded_at = time.monotonic()
+    cache.invalidate([1])
+    assert not cache.put(1, {"version": 1}, loaded_at)
+    # Reads started within settle_seconds of the change may come from a lagging replica
+    assert not cache.put(1, {"version": 2}, time.monotonic())
+    assert cache.put(1, {"version": 2}, time.monotonic() + 1)
+    assert cache.get(1) == {"version": 2}
+
+
+def test_entries_are_bounded_by_size_and_age():
+    cache = EntityCache("test", max_entries=2, ttl_seconds=60)
+    for key in (1, 2):
+        cache.load(key, lambda: {"id": key})
+    cache.get(1)
+    cache.load(3, lambda: {"id": 3})
+    assert (cache.get(1), cache.get(2), len(cache)) == ({"id": 1}, None, 2)
+
+    expiring = EntityCache("test", max_entries=2, ttl_seconds=0.01)
+    expiring.load(1, lambda: {"id": 1})
+    time.sleep(0.02)
+    assert expiring.get(1) is None
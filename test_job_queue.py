@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlmodel import Session, select
+import pytest
+
+from app.schemas.job import Job
+from app.services import job_queue
+from app.services.job_queue import DEAD, QUEUED, claim_job, enqueue, enqueue_many, run_pending_jobs
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    calls = []
+
+    def record(session, payload):
+        calls.append(payload["n"])
+
+    def fail(session, payload):
+        raise RuntimeError("unavailable")
+
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "test.record", record)
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "test.fail", fail)
+    return calls
+
+
+def jobs(engine):
+    with Session(engine) as session:
+        return session.exec(select(Job)).all()
+
+
+def test_jobs_only_exist_once_the_transaction_commits(engine, handlers):
+    with Session(engine) as session:
+        enqueue(session, "test.record", {"n": 1})
+        session.rollback()
+        enqueue_many(session, "test.record", [{"n": 2}, {"n": 3}])
+        session.commit()
+    assert run_pending_jobs(engine) == {"done": 2, "retried": 0, "dead": 0}
+    assert sorted(handlers) == [2, 3]
+    assert jobs(engine) == []
+
+
+def test_each_job_is_claimed_by_one_worker(engine, handlers):
+    with Session(engine) as session:
+        enqueue_many(session, "test.record", [{"n": n} for n in range(20)])
+        session.commit()
+
+    def drain(_):
+        claimed = []
+        while (job := claim_job(engine)) is not None:
+            claimed.append(job.id)
+        return claimed
+
+    with ThreadPoolExecutor(4) as pool:
+        claimed = [job_id for batch in pool.map(drain, range(4)) for job_id in batch]
+    assert sorted(claimed) == sorted(set(claimed)) and len(claimed) == 20
+
+
+def test_failed_jobs_back_off_then_go_dead(engine, handlers, monkeypatch):
+    with Session(engine) as session:
+        enqueue(session, "test.fail", {}, max_attempts=2)
+        session.commit()
+
+    assert run_pending_jobs(engine) == {"done": 0, "retried": 1, "dead": 0}
+    [job] = jobs(engine)
+    assert job.status == QUEUED and job.run_at > datetime.utcnow() and job.last_error == "RuntimeError: unavailable"
+    # Not due yet
+    assert run_pending_jobs(engine) == {"done": 0, "retried": 0, "dead": 0}
+
+    with Session(engine) as session:
+        session.get(Job, job.id).run_at = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+    assert run_pending_jobs(engine) == {"done": 0, "retried": 0, "dead": 1}
+    assert jobs(engine)[0].status == DEAD
+
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "test.fail", lambda session, payload: None)
+    with Session(engine) as session:
+        assert job_queue.retry_dead_jobs(session) == 1
+    assert run_pending_jobs(engine) == {"done": 1, "retried": 0, "dead": 0}
+
+
+def test_abandoned_jobs_are_claimed_again_after_their_lease(engine, handlers):
+    with Session(engine) as session:
+        enqueue(session, "test.record", {"n": 1})
+        session.commit()
+    assert claim_job(engine) is not None
+    assert claim_job(engine) is None
+
+    with Session(engine) as session:
+        session.exec(select(Job)).one().locked_until = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+    assert run_pending_jobs(engine) == {"done": 1, "retried": 0, "dead": 0}
+    assert handlers == [1]
+
+
+def test_jobs_that_keep_losing_their_worker_go_dead(engine, handlers):
+    with Session(engine) as session:
+        enqueue(session, "test.record", {"n": 1}, max_attempts=2)
+        session.commit()
+
+    for _ in range(2):
+        # Claimed, then the worker dies before recording an outcome
+        assert claim_job(engine) is not None
+        with Session(engine) as session:
+            session.exec(select(Job)).one().locked_until = datetime.utcnow() - timedelta(seconds=1)
+            session.commit()
+    assert claim_job(engine) is None
+    [job] = jobs(engine)
+    assert (job.status, job.attempts, job.locked_until) == (DEAD, 2, None)
+    assert handlers == []
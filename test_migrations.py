@@ -0,0 +1,70 @@
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, MetaData, String, Table, inspect
+from sqlmodel import Session, create_engine, insert
+
+from app.db.database import run_migrations
+from app.services.counter_service import ANIMALS_TOTAL, CounterService, ensure_counters
+from app.services.daily_stat_service import ensure_daily_stats
+from app.services.statistics_service import StatisticsService
+
+# The schema the original create_all produced, before migrations existed
+baseline = MetaData()
+baseline_animal = Table(
+    "animal", baseline,
+    Column("name", String, nullable=False),
+    Column("type", String, nullable=False),
+    Column("age", Float, nullable=False),
+    Column("breed", String, nullable=False),
+    Column("gender", String),
+    Column("health_status", String, nullable=False),
+    Column("description", String, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("image_path", String),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("is_adopted", Boolean, nullable=False),
+)
+baseline_adoption = Table(
+    "adoption", baseline,
+    Column("full_name", String, nullable=False),
+    Column("email", String, nullable=False),
+    Column("phone", String, nullable=False),
+    Column("address", String, nullable=False),
+    Column("housing_situation", Enum("HOUSE", "APARTMENT", "CONDO", "MOBILE_HOME", "OTHER", name="housingsituation"),
+           nullable=False),
+    Column("home_ownership", Enum("OWN", "RENT", "OTHER", name="homeownership"), nullable=False),
+    Column("has_other_pets", Boolean),
+    Column("previous_pet_experience", String),
+    Column("adoption_reason", String, nullable=False),
+    Column("animal_id", Integer, ForeignKey("animal.id"), nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("status", String, nullable=False),
+)
+
+
+def test_baseline_database_migrates_and_starts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    baseline.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(baseline_animal).values(
+            name="Rex", type="Dog", age=2, breed="Mixed", health_status="Healthy", description="Friendly",
+            created_at=now, updated_at=now, is_adopted=True,
+        ))
+        connection.execute(insert(baseline_adoption).values(
+            full_name="Applicant", email="a@example.com", phone="555", address="Street",
+            housing_situation="HOUSE", home_ownership="OWN", adoption_reason="Love",
+            animal_id=1, created_at=now, status="Approved",
+        ))
+
+    run_migrations(engine)
+    # The same steps the application runs on startup
+    ensure_counters(engine)
+    ensure_daily_stats(engine)
+
+    assert "shelter_counter" in inspect(engine).get_table_names()
+    with Session(engine) as session:
+        assert CounterService(session).get_values([ANIMALS_TOTAL]) == {ANIMALS_TOTAL: 1}
+        assert StatisticsService(session).get_adoption_statistics()["approved_adoptions"] == 1
+    engine.dispose()
@@ -0,0 +1,86 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+import pytest
+
+from app.db.database import get_read_session
+from app.schemas.animal import Animal, AnimalCreate
+from app.services.animal_service import AnimalService
+from app.services.pagination import MAX_PAGE_SIZE, split_page
+from main import app
+
+
+@pytest.fixture
+def engine(engine):
+    with Session(engine) as session:
+        # Shared timestamps make the id tie-breaker decide the order
+        created_at = datetime(2024, 1, 1)
+        session.add_all(
+            Animal(name=f"Animal {i}", type="Dog", age=1, breed="Mixed", health_status="Healthy",
+                   description="Friendly", created_at=created_at)
+            for i in range(MAX_PAGE_SIZE + 25)
+        )
+        session.commit()
+    return engine
+
+
+def test_cursor_pages_cover_every_row_once(engine):
+    with Session(engine) as session:
+        service = AnimalService(session)
+        seen, cursor, pages = [], None, 0
+        while True:
+            items, cursor = service.get_animals_page(cursor, 40)
+            seen.extend(animal.id for animal in items)
+            pages += 1
+            if cursor is None:
+                break
+        assert seen == list(range(1, MAX_PAGE_SIZE + 26))
+        assert pages == 4
+
+        # Oversized pages are clamped like search results
+        items, cursor = service.get_animals_page(None, 10 * MAX_PAGE_SIZE)
+        assert len(items) == MAX_PAGE_SIZE and cursor is not None
+        assert len(service.get_animals(0, -1)) == 1
+
+
+def test_empty_pages_have_no_next_cursor():
+    assert split_page([], 10) == ([], None)
+    assert split_page([object()], 0) == ([], None)
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_SIZE + 1])
+def test_out_of_range_limits_are_rejected(limit):
+    client = TestClient(app)
+    for path in ("/api/v1/animals/", "/api/v1/adoptions/"):
+        assert client.get(path, params={"cursor": "", "limit": limit}).status_code == 422
+
+
+def test_list_validators_do_not_aggregate_the_table(engine):
+    def read_session():
+        with Session(engine) as session:
+            yield session
+
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement.lower())
+
+    app.dependency_overrides[get_read_session] = read_session
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        client = TestClient(app)
+        first = client.get("/api/v1/animals/", params={"cursor": "", "type": "Dog"})
+        assert not [statement for statement in statements if "count(" in statement or "max(" in statement]
+        assert client.get("/api/v1/animals/", params={"cursor": "", "type": "Dog"},
+                          headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+        with Session(engine) as session:
+            AnimalService(session).create_animal(AnimalCreate(
+                name="New", type="Dog", age=1, breed="Mixed", health_status="Healthy", description="Friendly",
+            ))
+        assert client.get("/api/v1/animals/", params={"cursor": "", "type": "Dog"},
+                          headers={"If-None-Match": first.headers["etag"]}).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        app.dependency_overrides.clear()
@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+from sqlmodel import Session
+import pytest
+
+from app.schemas.adoption import Adoption
+from app.schemas.animal import Animal
+from app.services.adoption_service import AdoptionService
+from app.services.animal_service import AnimalService
+from app.services.counter_service import CounterService
+from app.services.statistics_service import StatisticsService
+
+
+@pytest.fixture
+def engine(engine):
+    with Session(engine) as session:
+        now = datetime.utcnow()
+        for i in range(50):
+            session.add(Animal(
+                name=f"Animal {i}", type=["Dog", "Cat", "Bird"][i % 3], age=1, breed="Mixed",
+                health_status="Healthy", description="Friendly", is_adopted=i % 4 == 0,
+                created_at=now - timedelta(days=i),
+            ))
+        session.flush()
+        for i in range(20):
+            session.add(Adoption(
+                full_name="Applicant", email="a@example.com", phone="555", address="Street",
+                housing_situation="House", home_ownership="Own", adoption_reason="Love",
+                animal_id=i + 1, status=["Pending", "Approved", "Rejected"][i % 3],
+            ))
+        session.commit()
+    return engine
+
+
+@contextmanager
+def query_plans(engine):
+    """Collect the SQLite query plan of every SELECT run inside the block"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    plans = []
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans.append((statement, " | ".join(row[-1] for row in rows)))
+
+
+def assert_uses_index(plans, index_name):
+    """Filtered and grouped queries must use the index; no query may scan a whole table"""
+    assert plans, "no queries were captured"
+    for statement, plan in plans:
+        for step in plan.split(" | "):
+            assert not step.startswith("SCAN") or "INDEX" in step, f"table scan {plan!r} for {statement!r}"
+        if "WHERE" in statement or "GROUP BY" in statement:
+            assert index_name in plan, f"expected {index_name} in plan {plan!r} for {statement!r}"
+
+
+def test_migrations_create_indexes(engine):
+    inspector = inspect(engine)
+    animal_indexes = {index["name"] for index in inspector.get_indexes("animal")}
+    adoption_indexes = {index["name"] for index in inspector.get_indexes("adoption")}
+    assert {"ix_animal_created_at_id", "ix_animal_type_is_adopted_created_at",
+            "ix_animal_is_adopted_created_at", "ix_animal_image_path"} <= animal_indexes
+    assert {"ix_adoption_animal_id_status", "ix_adoption_status_created_at",
+            "ix_adoption_created_at_id"} <= adoption_indexes
+
+
+@pytest.mark.parametrize("filters, index_name", [
+    ({"animal_type": "Dog"}, "ix_animal_type_is_adopted_created_at"),
+    ({"animal_type": "Dog", "is_adopted": False}, "ix_animal_type_is_adopted_created_at"),
+    ({"is_adopted": True}, "ix_animal_is_adopted_created_at"),
+])
+def test_search_animals_uses_index(engine, filters, index_name):
+    with Session(engine) as session, query_plans(engine) as plans:
+        AnimalService(session).search_animals(**filters)
+    assert_uses_index(plans, index_name)
+
+
+def test_animal_keyset_page_uses_index(engine):
+    with Session(engine) as session:
+        _, cursor = AnimalService(session).get_animals_page(None, 10)
+        with query_plans(engine) as plans:
+            AnimalService(session).get_animals_page(cursor, 10)
+    assert_uses_index(plans, "ix_animal_created_at_id")
+
+
+def test_adoption_lookups_use_indexes(engine):
+    with Session(engine) as session:
+        service = AdoptionService(session)
+        with query_plans(engine) as plans:
+            service.get_adoptions_by_animal(1)
+        assert_uses_index(plans, "ix_adoption_animal_id_status")
+        with query_plans(engine) as plans:
+            service.get_adoptions_by_status("Pending")
+        assert_uses_index(plans, "ix_adoption_status_created_at")
+        _, cursor = service.get_adoptions_page(None, 5)
+        with query_plans(engine) as plans:
+            service.get_adoptions_page(cursor, 5)
+        assert_uses_index(plans, "ix_adoption_created_at_id")
+
+
+def test_per_metric_statistics_use_indexes(engine):
+    with Session(engine) as session:
+        service = StatisticsService(session, strategy="per_metric")
+        with query_plans(engine) as plans:
+            service.get_adoption_statistics()
+        assert_uses_index(plans, "ix_adoption_status_created_at")
+        with query_plans(engine) as plans:
+            service.get_animal_type_distribution()
+        assert_uses_index(plans, "ix_animal_type_is_adopted_created_at")
+
+
+def test_grouped_type_distribution_lists_every_type(engine):
+    with Session(engine) as session:
+        session.add_all(
+            Animal(name="Odd", type=animal_type, age=1, breed="Mixed", health_status="Healthy", description="Friendly")
+            for animal_type in ("Hamster", "dog", "Other")
+        )
+        session.commit()
+        CounterService(session).rebuild()
+        counters, aggregate, per_metric = (
+            StatisticsService(session, strategy=strategy).get_animal_type_distribution()
+            for strategy in ("counters", "aggregate", "per_metric")
+        )
+    assert counters == aggregate == {
+        "type_distribution": {"dog": 18, "cat": 17, "bird": 16, "rabbit": 0, "other": 1, "hamster": 1},
+    }
+    # The original per-type queries fold unknown types and other spellings into "other"
+    assert per_metric == {
+        "type_distribution": {"dog": 17, "cat": 17, "bird": 16, "rabbit": 0, "other": 3},
+    }
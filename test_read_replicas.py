@@ -0,0 +1,61 @@
+import time
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine
+from starlette.requests import Request
+import pytest
+
+from app.db import database
+from app.db.replicas import Replica, ReplicaSet
+
+
+def make_replica(name, path):
+    return Replica(name, create_engine(f"sqlite:///{path}"), create_async_engine(f"sqlite+aiosqlite:///{path}"))
+
+
+def make_request(headers=()):
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [
+        (name.encode(), value.encode()) for name, value in headers
+    ]})
+
+
+def session_url(request):
+    sessions = database.get_read_session(request)
+    session = next(sessions)
+    try:
+        return str(session.get_bind().url)
+    finally:
+        sessions.close()
+
+
+@pytest.fixture
+def replica_set(tmp_path, monkeypatch):
+    replica_set = ReplicaSet([make_replica("replica1", tmp_path / "one.db"), make_replica("replica2", tmp_path / "two.db")])
+    monkeypatch.setattr(database, "replicas", replica_set)
+    return replica_set
+
+
+def test_reads_rotate_across_replicas(replica_set):
+    urls = [session_url(make_request()) for _ in range(4)]
+    assert [url.rsplit("/", 1)[-1] for url in urls] == ["one.db", "two.db", "one.db", "two.db"]
+
+
+def test_unreachable_replica_is_skipped(tmp_path, monkeypatch):
+    broken = make_replica("replica1", tmp_path / "missing" / "replica.db")
+    healthy = make_replica("replica2", tmp_path / "two.db")
+    monkeypatch.setattr(database, "replicas", ReplicaSet([broken, healthy]))
+    assert all(session_url(make_request()).endswith("two.db") for _ in range(3))
+    assert not broken.healthy
+
+
+def test_falls_back_to_primary_without_healthy_replicas(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "replicas", ReplicaSet([make_replica("replica1", tmp_path / "missing" / "replica.db")]))
+    assert session_url(make_request()) == str(database.engine.url)
+
+
+def test_recent_writers_and_strong_reads_use_primary(replica_set):
+    pinned = make_request([("cookie", f"{database.PRIMARY_READ_COOKIE}={time.time() + 60}")])
+    expired = make_request([("cookie", f"{database.PRIMARY_READ_COOKIE}={time.time() - 60}")])
+    strong = make_request([(database.PRIMARY_READ_HEADER, "strong")])
+    assert session_url(pinned) == str(database.engine.url)
+    assert session_url(strong) == str(database.engine.url)
+    assert session_url(expired).endswith(("one.db", "two.db"))